@@ -0,0 +1,232 @@
+import json
+import platform
+import random
+import subprocess
+from contextlib import nullcontext
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from benchmarks import seed as seeding
+from benchmarks.runner import SERVERS, drive, server_process
+from benchmarks.scenarios import SCENARIOS, Fixture
+from events.models import Event
+from event_registrations.models import EventRegistration
+
+
+def comma_separated_ints(value):
+    return [int(part) for part in value.split(",") if part]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark data, drive every API endpoint at the given concurrency "
+        "levels and write throughput, latency percentiles, queries and server "
+        "CPU time per request to a JSON file. Run it against a dedicated "
+        "database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--events", type=int, default=10000)
+        parser.add_argument("--registrations", type=int, default=50000)
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for data and requests."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=comma_separated_ints,
+            default=[1, 8, 32],
+            help="Comma-separated client concurrency levels, e.g. 1,8,32.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Timed requests per endpoint and concurrency level.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=20,
+            help="Untimed requests per endpoint before measuring.",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Only benchmark this endpoint. Can be repeated.",
+        )
+        parser.add_argument(
+            "--server",
+            action="append",
+            choices=sorted(SERVERS),
+            help=(
+                "How to serve the project (default: wsgi). Repeat to run the "
+                "same load against several servers and compare them, e.g. "
+                "--server uvicorn-wsgi --server asgi."
+            ),
+        )
+        parser.add_argument(
+            "--url",
+            help=(
+                "Benchmark an already running server instead of starting "
+                "one. It must share this database and SECRET_KEY, and needs "
+                "SQL_INSTRUMENTATION=True to report queries per request."
+            ),
+        )
+        parser.add_argument(
+            "--output",
+            help="Result file. Defaults to benchmarks/results/<time>-<commit>.json.",
+        )
+        parser.add_argument(
+            "--baseline", help="Earlier result file to compare this run against."
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        if seeding.is_seeded():
+            self.stdout.write("Reusing existing benchmark data.")
+        else:
+            seeding.seed(
+                options["users"],
+                options["events"],
+                options["registrations"],
+                random_seed=options["seed"],
+                log=self.stdout.write,
+            )
+        try:
+            fixture = Fixture(rng)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["url"]:
+            servers = {options["url"]: nullcontext(options["url"])}
+        else:
+            servers = {
+                name: server_process(name) for name in options["server"] or ["wsgi"]
+            }
+        names = options["endpoint"] or list(SCENARIOS)
+        results = []
+        for server_name, server in servers.items():
+            with server as base_url:
+                for name in names:
+                    results.extend(
+                        self.run_scenario(server_name, base_url, name, fixture, options)
+                    )
+
+        report = {
+            "commit": self.git("rev-parse", "HEAD"),
+            "dirty": bool(self.git("status", "--porcelain", "--untracked-files=no")),
+            "started_at": timezone.now().isoformat(),
+            "servers": list(servers),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "postgres": connection.pg_version,
+            "volumes": {
+                "users": seeding.bench_users().count(),
+                "events": Event.objects.count(),
+                "registrations": EventRegistration.objects.count(),
+            },
+            "results": results,
+        }
+        path = Path(options["output"] or self.default_output(report))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+        if options["baseline"]:
+            self.compare(json.loads(Path(options["baseline"]).read_text()), report)
+        if len(servers) > 1:
+            self.compare_servers(report)
+
+    def run_scenario(self, server, base_url, name, fixture, options):
+        scenario = SCENARIOS[name]
+        if options["warmup"]:
+            warmup = scenario.prepare(fixture, options["warmup"])
+            drive(base_url, scenario.method, warmup, 1)
+        results = []
+        for concurrency in options["concurrency"]:
+            requests = scenario.prepare(fixture, options["requests"])
+            result = {
+                "server": server,
+                "endpoint": name,
+                "method": scenario.method,
+                "concurrency": concurrency,
+                **drive(base_url, scenario.method, requests, concurrency),
+            }
+            results.append(result)
+            self.report(result)
+        return results
+
+    def report(self, result):
+        latency = result["latency_ms"]
+        line = (
+            f"{result['server']:<13} {result['endpoint']:<26} "
+            f"c={result['concurrency']:<4} {result['throughput_rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>8.1f}  p95 {latency['p95']:>8.1f}  "
+            f"p99 {latency['p99']:>8.1f} ms  "
+            f"queries {result['queries_per_request']}"
+        )
+        if result.get("cpu_ms_per_request") is not None:
+            line += f"  cpu {result['cpu_ms_per_request']:.1f} ms"
+        if result["errors"]:
+            self.stdout.write(self.style.ERROR(f"{line}  errors {result['errors']}"))
+        else:
+            self.stdout.write(line)
+
+    def compare(self, baseline, report):
+        self.stdout.write(f"Compared with {baseline['commit'] or 'baseline'}:")
+        before = {self.result_key(result): result for result in baseline["results"]}
+        for result in report["results"]:
+            old = before.get(self.result_key(result))
+            if old is not None:
+                self.report_delta(result["server"], old, result)
+
+    def compare_servers(self, report):
+        first, *others = report["servers"]
+        self.stdout.write(f"Compared with {first}:")
+        before = {
+            (result["endpoint"], result["concurrency"]): result
+            for result in report["results"]
+            if result["server"] == first
+        }
+        for result in report["results"]:
+            old = before.get((result["endpoint"], result["concurrency"]))
+            if result["server"] in others and old is not None:
+                self.report_delta(result["server"], old, result)
+
+    def report_delta(self, label, old, new):
+        throughput = new["throughput_rps"] / old["throughput_rps"] - 1
+        p95 = new["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1
+        self.stdout.write(
+            f"{label:<13} {new['endpoint']:<26} c={new['concurrency']:<4} "
+            f"throughput {throughput:+.1%}  p95 {p95:+.1%}"
+        )
+
+    @staticmethod
+    def result_key(result):
+        return result.get("server"), result["endpoint"], result["concurrency"]
+
+    def default_output(self, report):
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        commit = (report["commit"] or "unknown")[:10]
+        return (
+            Path(settings.BASE_DIR)
+            / "benchmarks"
+            / "results"
+            / f"{stamp}-{commit}.json"
+        )
+
+    @staticmethod
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,88 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+from events.models import Event
+from events.serializers import EventCreateSerializer, EventRowSerializer
+
+
+def comma_separated_ints(value):
+    return [int(part) for part in value.split(",") if part]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rendering /api/events/ pages and parsing bulk event payloads "
+        "with DRF's stdlib JSON classes and the orjson ones, in process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=comma_separated_ints,
+            default=[50, 200],
+            help="Comma-separated events per rendered page.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=1.0,
+            help="Seconds to spend on each measurement.",
+        )
+
+    def handle(self, *args, **options):
+        largest = max(options["page_size"])
+        rows = list(
+            Event.objects.order_by("event_date", "id").values_list(
+                *EventRowSerializer().columns()
+            )[:largest]
+        )
+        if len(rows) < largest:
+            raise CommandError(f"Seed at least {largest} events first.")
+        events = EventRowSerializer().to_representation(rows)
+        duration = options["duration"]
+
+        self.stdout.write(f"{'payload':<28} {'stdlib json':>14} {'orjson':>14}")
+        for size in options["page_size"]:
+            page = {"next": "http://testserver/api/events/?cursor=x", "previous": None}
+            page["results"] = events[:size]
+            self.compare(
+                f"render page of {size}",
+                lambda renderer: renderer.render(page, "application/json"),
+                (JSONRenderer(), ORJSONRenderer()),
+                duration,
+            )
+
+            fields = EventCreateSerializer.Meta.fields
+            body = JSONRenderer().render(
+                [{name: event[name] for name in fields} for event in events[:size]]
+            )
+            self.compare(
+                f"parse {size} new events",
+                lambda parser: parser.parse(io.BytesIO(body)),
+                (JSONParser(), ORJSONParser()),
+                duration,
+            )
+
+    def compare(self, label, run, candidates, duration):
+        stdlib, fast = (self.rate(lambda: run(c), duration) for c in candidates)
+        self.stdout.write(
+            f"{label:<28} {stdlib:>10,.0f} op/s {fast:>10,.0f} op/s"
+            f"  x{fast / stdlib:.1f}"
+        )
+
+    @staticmethod
+    def rate(run, duration):
+        """Calls of ``run`` per second over about ``duration`` seconds."""
+        calls = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            run()
+            calls += 1
+        return calls / (time.perf_counter() - started)
@@ -0,0 +1,104 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.models import Event
+from events.serializers import EVENT_FIELDS, EventRowSerializer, EventSerializer
+
+
+def comma_separated_fields(value):
+    fields = tuple(name for name in value.split(",") if name)
+    unknown = set(fields).difference(EVENT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure rows per second for fetching and serializing events with "
+        "EventSerializer over model instances and with EventRowSerializer "
+        "over values_list() rows, in process and without HTTP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per variant; the fastest one is reported.",
+        )
+        parser.add_argument(
+            "--fields",
+            type=comma_separated_fields,
+            action="append",
+            help=(
+                "Also measure a sparse fieldset, e.g. id,title,event_date. "
+                "Can be repeated."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        queryset = Event.objects.order_by("id")[:rows]
+        if queryset.count() < rows:
+            raise CommandError(f"Seed at least {rows} events first.")
+
+        variants = {
+            "model serializer": self.model_serializer(queryset),
+            "row serializer": self.row_serializer(queryset, EVENT_FIELDS),
+        }
+        for fields in options["fields"] or []:
+            label = f"row serializer ({','.join(fields)})"
+            variants[label] = self.row_serializer(queryset, fields)
+
+        self.stdout.write(
+            f"{'variant':<40} {'fetch+serialize':>18} {'serialize only':>18}"
+        )
+        baseline = None
+        for label, (fetch, serialize) in variants.items():
+            total, serialize_only = self.measure(fetch, serialize, options["repeat"])
+            line = (
+                f"{label:<40} {rows / total:>12,.0f} rows/s "
+                f"{rows / serialize_only:>12,.0f} rows/s"
+            )
+            if baseline is None:
+                baseline = total, serialize_only
+            else:
+                speedups = baseline[0] / total, baseline[1] / serialize_only
+                line += "  x{:.1f} / x{:.1f}".format(*speedups)
+            self.stdout.write(line)
+
+    @staticmethod
+    def model_serializer(queryset):
+        def fetch():
+            return list(queryset.defer("search_vector"))
+
+        def serialize(events):
+            return EventSerializer(events, many=True).data
+
+        return fetch, serialize
+
+    @staticmethod
+    def row_serializer(queryset, fields):
+        serializer = EventRowSerializer(fields)
+
+        def fetch():
+            return list(queryset.values_list(*serializer.columns()))
+
+        return fetch, serializer.to_representation
+
+    @staticmethod
+    def measure(fetch, serialize, repeat):
+        """Fastest ``(fetch + serialize, serialize)`` seconds of ``repeat`` runs."""
+        totals, serializes = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fetched = fetch()
+            serialize_started = time.perf_counter()
+            serialize(fetched)
+            finished = time.perf_counter()
+            totals.append(finished - started)
+            serializes.append(finished - serialize_started)
+        return min(totals), min(serializes)
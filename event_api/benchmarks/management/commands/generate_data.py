@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import seed as seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, events and registrations for load testing, "
+        "loaded with COPY in fixed-size chunks. The same --seed always "
+        "produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--events", type=int, default=1000000)
+        parser.add_argument(
+            "--registrations",
+            type=int,
+            default=10000000,
+            help="Approximate number of registrations.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--organizer-ratio",
+            type=float,
+            default=seeding.ORGANIZER_RATIO,
+            help="Share of users that are organizers.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=seeding.CHUNK_SIZE,
+            help="Rows per COPY statement; bounds memory use.",
+        )
+
+    def handle(self, *args, **options):
+        if seeding.is_seeded():
+            raise CommandError(
+                "The database already contains generated data. Use a fresh database."
+            )
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        seeding.seed(
+            options["users"],
+            options["events"],
+            options["registrations"],
+            random_seed=options["seed"],
+            organizer_ratio=options["organizer_ratio"],
+            chunk_size=options["chunk_size"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated."))
@@ -0,0 +1,152 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management import CommandError
+
+UVICORN = [sys.executable, "-m", "uvicorn", "--host", "{host}", "--port", "{port}"]
+SERVERS = {
+    "wsgi": [sys.executable, "manage.py", "runserver", "--noreload", "{host}:{port}"],
+    # The same server process model for both interfaces, so the comparison
+    # measures the sync WSGI views against the async views only.
+    "uvicorn-wsgi": [*UVICORN, "--interface", "wsgi", "config.wsgi:application"],
+    "asgi": [*UVICORN, "config.asgi:application"],
+    # The production worker pool, configured through GUNICORN_* variables.
+    "gunicorn": [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--config",
+        "config/gunicorn.py",
+        "--bind",
+        "{host}:{port}",
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server_process(name, timeout=30):
+    """
+    Run the project under the ``SERVERS[name]`` command in a separate process,
+    so the load generator does not compete with it for the GIL, and yield its
+    base URL once it accepts connections.
+    """
+    port = free_port()
+    command = [part.format(host="127.0.0.1", port=port) for part in SERVERS[name]]
+    env = {"ALLOWED_HOSTS": "127.0.0.1", **os.environ, "SQL_INSTRUMENTATION": "True"}
+    process = subprocess.Popen(
+        command,
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise CommandError(f"{name} server exited with {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f"{name} server did not start in {timeout}s")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def send(base_url, method, request):
+    """Issue one request and return ``(status, seconds, queries, cpu_ms)``."""
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+    headers = {"Accept": "application/json"}
+    body = None
+    if request.body is not None:
+        body = json.dumps(request.body)
+        headers["Content-Type"] = "application/json"
+    if request.token:
+        headers["Authorization"] = f"Bearer {request.token}"
+    started = time.perf_counter()
+    try:
+        conn.request(method, url.path.rstrip("/") + request.path, body, headers)
+        response = conn.getresponse()
+        response.read()
+    except (OSError, http.client.HTTPException):
+        return None, time.perf_counter() - started, None, None
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    queries = response.getheader("X-DB-Queries")
+    cpu_ms = response.getheader("X-CPU-Time-Ms")
+    return (
+        response.status,
+        elapsed,
+        int(queries) if queries is not None else None,
+        float(cpu_ms) if cpu_ms is not None else None,
+    )
+
+
+def drive(base_url, method, requests, concurrency):
+    """
+    Send ``requests`` from ``concurrency`` client threads and return the
+    measured throughput, latency percentiles, queries and server CPU time
+    per request.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(
+            pool.map(lambda request: send(base_url, method, request), requests)
+        )
+    wall = time.perf_counter() - started
+
+    statuses = Counter(str(status) for status, _, _, _ in samples)
+    latencies = sorted(elapsed * 1000 for _, elapsed, _, _ in samples)
+    queries = [count for _, _, count, _ in samples if count is not None]
+    cpu = [cpu_ms for _, _, _, cpu_ms in samples if cpu_ms is not None]
+    errors = sum(
+        count
+        for status, count in statuses.items()
+        if status == "None" or int(status) >= 500
+    )
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "statuses": dict(statuses),
+        "throughput_rps": round(len(samples) / wall, 2),
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "queries_per_request": (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+        "cpu_ms_per_request": round(sum(cpu) / len(cpu), 2) if cpu else None,
+    }
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, -(-len(ordered) * p // 100) - 1)
+    return round(ordered[int(index)], 2)
@@ -0,0 +1,353 @@
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.utils import timezone
+
+from events.models import Event
+from event_registrations.models import EventRegistration, WaitlistEntry
+from users.models import Role, User
+from users.tokens import AccessToken, RefreshToken
+
+from .seed import EMAIL_DOMAIN, PASSWORD, bench_users
+
+Scenario = namedtuple("Scenario", ["name", "method", "prepare"])
+Request = namedtuple("Request", ["path", "body", "token"])
+
+SCENARIOS = {}
+
+
+def scenario(name, method):
+    def register(prepare):
+        SCENARIOS[name] = Scenario(name, method, prepare)
+        return prepare
+
+    return register
+
+
+def token_for(user):
+    return str(AccessToken.for_user(user))
+
+
+class Fixture:
+    """
+    Users, tokens and sample events shared by all scenarios. Rows a scenario
+    consumes (deleted events, cancelled registrations, ...) are created
+    fresh by the scenario itself.
+    """
+
+    def __init__(self, rng, sample_size=200):
+        self.rng = rng
+        self.users = self._sample(Role.USER, sample_size)
+        self.organizers = self._sample(Role.ORGANIZER, sample_size)
+        if not self.users or not self.organizers:
+            raise ValueError("Seed at least one user and one organizer first.")
+        admin, _ = User.objects.get_or_create(
+            email=f"admin@{EMAIL_DOMAIN}",
+            defaults={"username": "admin", "is_staff": True, "is_superuser": True},
+        )
+        self.admin = (admin, token_for(admin))
+
+        bounds = Event.objects.order_by("id").values_list("id", flat=True)
+        first, last = bounds.first(), bounds.reverse().first()
+        if first is None:
+            raise ValueError("Seed at least one event first.")
+        candidates = {rng.randint(first, last) for _ in range(sample_size)}
+        self.event_ids = list(
+            Event.objects.filter(id__in=candidates).values_list("id", flat=True)
+        )
+
+    def _sample(self, role, size):
+        users = bench_users().filter(role=role, is_active=True).order_by("email")
+        return [(user, token_for(user)) for user in users[:size]]
+
+    def user(self, i):
+        return self.users[i % len(self.users)]
+
+    def organizer(self, i):
+        return self.organizers[i % len(self.organizers)]
+
+    def new_events(self, count, author=None, **fields):
+        now = timezone.now()
+        return Event.objects.bulk_create(
+            Event(
+                title=f"Benchmark fixture {i}",
+                event_date=now + timedelta(days=30),
+                location="Benchmark hall",
+                organizer="Benchmark",
+                author=author or self.organizer(i)[0],
+                **fields,
+            )
+            for i in range(count)
+        )
+
+
+def event_payload(i):
+    return {
+        "title": f"Benchmark event {i}",
+        "description": "Created by the benchmark suite.",
+        "event_date": (timezone.now() + timedelta(days=7)).isoformat(),
+        "location": "Benchmark hall",
+        "organizer": "Benchmark",
+    }
+
+
+# users.urls
+
+
+@scenario("auth-signup", "POST")
+def auth_signup(fixture, count):
+    return [
+        Request(
+            "/api/auth/signup_user",
+            {
+                "email": f"signup-{uuid.uuid4().hex}@{EMAIL_DOMAIN}",
+                "username": "signup",
+                "password": PASSWORD,
+            },
+            None,
+        )
+        for _ in range(count)
+    ]
+
+
+@scenario("auth-login", "POST")
+def auth_login(fixture, count):
+    return [
+        Request(
+            "/api/auth/login",
+            {"username": fixture.user(i)[0].email, "password": PASSWORD},
+            None,
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("auth-refresh", "POST")
+def auth_refresh(fixture, count):
+    # Every refresh token can be exchanged once.
+    return [
+        Request(
+            "/api/auth/refresh",
+            {"refresh_token": str(RefreshToken.for_user(fixture.user(i)[0]))},
+            None,
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("auth-logout", "GET")
+def auth_logout(fixture, count):
+    return [Request("/api/auth/logout", None, fixture.user(i)[1]) for i in range(count)]
+
+
+@scenario("users-me", "GET")
+def users_me(fixture, count):
+    return [Request("/api/users/me", None, fixture.user(i)[1]) for i in range(count)]
+
+
+@scenario("users-update", "PUT")
+def users_update(fixture, count):
+    requests = []
+    for i in range(count):
+        user, token = fixture.user(i)
+        requests.append(
+            Request(f"/api/users/{user.id}", {"username": f"renamed{i}"}, token)
+        )
+    return requests
+
+
+@scenario("users-delete", "DELETE")
+def users_delete(fixture, count):
+    password = fixture.user(0)[0].password
+    users = User.objects.bulk_create(
+        User(
+            email=f"doomed-{uuid.uuid4().hex}@{EMAIL_DOMAIN}",
+            username="doomed",
+            password=password,
+        )
+        for _ in range(count)
+    )
+    return [Request(f"/api/users/{user.id}", None, token_for(user)) for user in users]
+
+
+# events.urls
+
+EVENT_LIST_QUERIES = [
+    "",
+    "?ordering=-event_date",
+    "?ordering=-registration_count",
+    "?location_prefix=Venue%201",
+    "?organizer=Organizer%2042",
+    "?q=benchmark%20event",
+    "?page_size=200",
+]
+
+
+@scenario("events-list", "GET")
+def events_list(fixture, count):
+    return [
+        Request(
+            f"/api/events/{fixture.rng.choice(EVENT_LIST_QUERIES)}",
+            None,
+            fixture.user(i)[1],
+        )
+        for i in range(count)
+    ]
+
+
+EVENT_FIELDS_QUERIES = [
+    "?fields=id,title,event_date",
+    "?fields=id,title,event_date&page_size=200",
+    "?fields=id,title,location,capacity,registration_count&page_size=200",
+]
+
+
+@scenario("events-list-fields", "GET")
+def events_list_fields(fixture, count):
+    return [
+        Request(
+            f"/api/events/{fixture.rng.choice(EVENT_FIELDS_QUERIES)}",
+            None,
+            fixture.user(i)[1],
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("events-detail", "GET")
+def events_detail(fixture, count):
+    return [
+        Request(
+            f"/api/events/{fixture.rng.choice(fixture.event_ids)}/",
+            None,
+            fixture.user(i)[1],
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("events-create", "POST")
+def events_create(fixture, count):
+    return [
+        Request("/api/events/create/", event_payload(i), fixture.organizer(i)[1])
+        for i in range(count)
+    ]
+
+
+@scenario("events-bulk-create", "POST")
+def events_bulk_create(fixture, count):
+    return [
+        Request(
+            "/api/events/create/bulk/",
+            [event_payload(j) for j in range(10)],
+            fixture.organizer(i)[1],
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("events-update", "PUT")
+def events_update(fixture, count):
+    organizer, token = fixture.organizer(0)
+    return [
+        Request(f"/api/events/{event.id}/update/", event_payload(i), token)
+        for i, event in enumerate(fixture.new_events(count, author=organizer))
+    ]
+
+
+@scenario("events-delete", "DELETE")
+def events_delete(fixture, count):
+    organizer, token = fixture.organizer(0)
+    return [
+        Request(f"/api/events/{event.id}/delete/", None, token)
+        for event in fixture.new_events(count, author=organizer)
+    ]
+
+
+@scenario("events-cache-stats", "GET")
+def events_cache_stats(fixture, count):
+    return [Request("/api/events/cache/stats/", None, fixture.admin[1])] * count
+
+
+# event_registrations.urls
+
+
+@scenario("registrations-list", "GET")
+def registrations_list(fixture, count):
+    return [
+        Request(
+            "/api/registrations/" + ("?expand=event" if i % 2 else ""),
+            None,
+            fixture.user(i)[1],
+        )
+        for i in range(count)
+    ]
+
+
+@scenario("registrations-create", "POST")
+def registrations_create(fixture, count):
+    return [
+        Request("/api/registrations/create/", {"event": event.id}, fixture.user(i)[1])
+        for i, event in enumerate(fixture.new_events(count))
+    ]
+
+
+@scenario("registrations-bulk-create", "POST")
+def registrations_bulk_create(fixture, count):
+    # Each user gets its own group of fresh events, so no request is a no-op.
+    groups = -(-count // len(fixture.users))
+    event_ids = [event.id for event in fixture.new_events(groups * 10)]
+    requests = []
+    for i in range(count):
+        start = i // len(fixture.users) * 10
+        requests.append(
+            Request(
+                "/api/registrations/create/bulk/",
+                {"events": event_ids[start : start + 10]},
+                fixture.user(i)[1],
+            )
+        )
+    return requests
+
+
+@scenario("registrations-delete", "DELETE")
+def registrations_delete(fixture, count):
+    events = fixture.new_events(count, registration_count=1)
+    registrations = EventRegistration.objects.bulk_create(
+        EventRegistration(user=fixture.user(i)[0], event=event)
+        for i, event in enumerate(events)
+    )
+    return [
+        Request(f"/api/registrations/{registration.id}/", None, fixture.user(i)[1])
+        for i, registration in enumerate(registrations)
+    ]
+
+
+@scenario("waitlist-list", "GET")
+def waitlist_list(fixture, count):
+    return [
+        Request("/api/registrations/waitlist/", None, fixture.user(i)[1])
+        for i in range(count)
+    ]
+
+
+@scenario("waitlist-delete", "DELETE")
+def waitlist_delete(fixture, count):
+    events = fixture.new_events(count, capacity=0)
+    entries = WaitlistEntry.objects.bulk_create(
+        WaitlistEntry(user=fixture.user(i)[0], event=event)
+        for i, event in enumerate(events)
+    )
+    return [
+        Request(f"/api/registrations/waitlist/{entry.id}/", None, fixture.user(i)[1])
+        for i, entry in enumerate(entries)
+    ]
+
+
+# config.urls
+
+
+@scenario("db-pool-stats", "GET")
+def db_pool_stats(fixture, count):
+    return [Request("/api/db/pool/stats/", None, fixture.admin[1])] * count
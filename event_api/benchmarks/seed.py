@@ -0,0 +1,321 @@
+import hashlib
+import io
+import random
+import uuid
+from array import array
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from events import cache as event_cache
+from events.models import Event
+from events.partitions import add_months, create_partitions, month_start
+from event_registrations.models import EventRegistration
+from users.models import Role, User
+
+EMAIL_DOMAIN = "bench.example.com"
+PASSWORD = "benchmark-password"
+CHUNK_SIZE = 100000
+ORGANIZER_RATIO = 0.05
+VENUES = 500
+TOPICS = [
+    "Python",
+    "Django",
+    "Postgres",
+    "Jazz",
+    "Startup",
+    "Design",
+    "Data",
+    "Security",
+    "Cloud",
+    "Photography",
+    "Yoga",
+    "Cooking",
+    "Wine",
+    "Film",
+]
+FORMATS = [
+    "Meetup",
+    "Conference",
+    "Workshop",
+    "Concert",
+    "Summit",
+    "Hackathon",
+    "Festival",
+    "Webinar",
+    "Masterclass",
+    "Networking Night",
+]
+
+
+def bench_users():
+    return User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+
+
+def is_seeded():
+    return bench_users().exists()
+
+
+def seed(
+    users,
+    events,
+    registrations,
+    random_seed=0,
+    organizer_ratio=ORGANIZER_RATIO,
+    chunk_size=CHUNK_SIZE,
+    log=print,
+):
+    """
+    Generate ``users`` users, ``events`` events and about ``registrations``
+    registrations with ``COPY``, ``chunk_size`` rows per statement.
+
+    Distributions are skewed the way production data is: a few organizers
+    own most events, dates cluster around today, and event popularity and
+    user activity both follow a long tail. Every user shares ``PASSWORD``,
+    hashed once, and the same ``random_seed`` produces the same rows.
+    """
+    generator = DataGenerator(
+        users, events, registrations, random_seed, organizer_ratio, chunk_size, log
+    )
+    generator.run()
+
+
+class DataGenerator:
+    def __init__(
+        self,
+        users,
+        events,
+        registrations,
+        random_seed,
+        organizer_ratio,
+        chunk_size,
+        log,
+    ):
+        self.users = users
+        self.events = events
+        self.registrations = registrations
+        self.seed = random_seed
+        self.organizer_ratio = organizer_ratio
+        self.chunk_size = chunk_size
+        self.log = log
+        # Timestamps are anchored to today so reruns with the same seed
+        # produce the same rows for the whole day.
+        self.anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def rng(self, stream):
+        """Independent deterministic random stream per table."""
+        return random.Random(f"{self.seed}:{stream}")
+
+    def user_id(self, i):
+        digest = hashlib.md5(f"{self.seed}:user:{i}".encode()).digest()
+        return uuid.UUID(bytes=digest, version=4)
+
+    def run(self):
+        self.load_users()
+        self.load_events()
+        self.load_registrations()
+        self.update_counts()
+        event_cache.invalidate_list()
+
+    def load_users(self):
+        rng = self.rng("users")
+        password = make_password(PASSWORD, salt=f"bench{self.seed}")
+        self.organizers = array("l")
+        created_at = self.anchor - timedelta(days=365)
+
+        def rows():
+            for i in range(self.users):
+                organizer = i == 0 or rng.random() < self.organizer_ratio
+                if organizer:
+                    self.organizers.append(i)
+                joined = created_at + timedelta(seconds=rng.randrange(365 * 86400))
+                yield (
+                    password,
+                    False,
+                    self.user_id(i),
+                    f"user{i}@{EMAIL_DOMAIN}",
+                    f"user{i}",
+                    Role.ORGANIZER if organizer else Role.USER,
+                    True,
+                    False,
+                    joined,
+                    joined,
+                )
+
+        self.copy(
+            User,
+            [
+                "password",
+                "is_superuser",
+                "id",
+                "email",
+                "username",
+                "role",
+                "is_active",
+                "is_staff",
+                "created_at",
+                "updated_at",
+            ],
+            rows(),
+            "users",
+        )
+
+    def load_events(self):
+        rng = self.rng("events")
+        # Partitions for the months partition_events would keep, from a year
+        # back, where all but a few past dates fall.
+        this_month = month_start(self.anchor)
+        create_partitions(
+            add_months(this_month, -12),
+            add_months(this_month, settings.EVENTS_PARTITION_MONTHS_AHEAD),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT coalesce(max(id), 0) FROM {Event._meta.db_table}")
+            self.first_event = cursor.fetchone()[0] + 1
+        # A handful of organizers own most events.
+        organizer_weights = zipf_cumulative(len(self.organizers), 1.2)
+        venue_weights = zipf_cumulative(VENUES, 1.0)
+
+        def rows():
+            for i in range(self.events):
+                author = self.organizers[pick(rng, organizer_weights)]
+                topic, kind = rng.choice(TOPICS), rng.choice(FORMATS)
+                # Most events are upcoming and close to today; past ones
+                # thin out over a longer tail.
+                if rng.random() < 0.75:
+                    offset = timedelta(days=rng.expovariate(1 / 45))
+                else:
+                    offset = -timedelta(days=rng.expovariate(1 / 120))
+                event_date = self.anchor + offset
+                yield (
+                    self.first_event + i,
+                    f"{topic} {kind} #{i}",
+                    f"A {kind.lower()} about {topic.lower()} for the community.",
+                    event_date,
+                    f"Venue {pick(rng, venue_weights)}",
+                    f"Organizer {author}",
+                    self.user_id(author),
+                    0,
+                    min(event_date, self.anchor),
+                )
+
+        self.copy(
+            Event,
+            [
+                "id",
+                "title",
+                "description",
+                "event_date",
+                "location",
+                "organizer",
+                "author_id",
+                "registration_count",
+                "updated_at",
+            ],
+            rows(),
+            "events",
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)",
+                [Event._meta.db_table, self.first_event + self.events - 1],
+            )
+
+    def load_registrations(self):
+        rng = self.rng("registrations")
+        if not self.events or not self.users:
+            return
+        # Popularity rank -> event: rank 0 is the most popular event.
+        ranks = array("l", range(self.events))
+        rng.shuffle(ranks)
+        popularity = zipf_cumulative(self.events, 1.0)
+        # Per-user activity follows a log-normal distribution.
+        activity = array("d", (rng.lognormvariate(0, 1) for _ in range(self.users)))
+        scale = self.registrations / sum(activity)
+
+        def rows():
+            for i in range(self.users):
+                count = min(int(activity[i] * scale + rng.random()), self.events)
+                if count > self.events // 4:
+                    chosen = rng.sample(range(self.events), count)
+                else:
+                    chosen = set()
+                    while len(chosen) < count:
+                        chosen.add(ranks[pick(rng, popularity)])
+                user_id = self.user_id(i)
+                for offset in sorted(chosen):
+                    yield user_id, self.first_event + offset
+
+        self.copy(EventRegistration, ["user_id", "event_id"], rows(), "registrations")
+
+    def update_counts(self):
+        """
+        Store the denormalized registration counts and give every third
+        event a capacity, some of them fully booked.
+        """
+        events = Event._meta.db_table
+        last_event = self.first_event + self.events - 1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {events} AS event
+                SET registration_count = counts.total,
+                    capacity = CASE
+                        WHEN event.id %% 3 = 0 THEN counts.total + event.id %% 20
+                    END
+                FROM (
+                    SELECT event_id, count(*) AS total
+                    FROM {EventRegistration._meta.db_table}
+                    WHERE event_id BETWEEN %s AND %s
+                    GROUP BY event_id
+                ) AS counts
+                WHERE event.id = counts.event_id
+                """,
+                [self.first_event, last_event],
+            )
+            for model in (User, Event, EventRegistration):
+                cursor.execute(f"VACUUM ANALYZE {model._meta.db_table}")
+        self.log("counts: updated")
+
+    def copy(self, model, columns, rows, label):
+        """Stream ``rows`` into ``model``'s table, one COPY per chunk."""
+        sql = f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN"
+        total = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            buffer = io.StringIO()
+            for row in chunk:
+                buffer.write("\t".join(map(copy_value, row)))
+                buffer.write("\n")
+            with connection.cursor() as cursor, cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+            total += len(chunk)
+            self.log(f"{label}: {total}")
+
+
+def zipf_cumulative(size, exponent):
+    return array("d", accumulate(1 / (rank**exponent) for rank in range(1, size + 1)))
+
+
+def pick(rng, cumulative):
+    """Weighted index from a cumulative weight table, in O(log n)."""
+    return min(bisect(cumulative, rng.random() * cumulative[-1]), len(cumulative) - 1)
+
+
+def copy_value(value):
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
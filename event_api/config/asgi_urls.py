@@ -0,0 +1,29 @@
+"""
+URL configuration used under ASGI: the read endpoints that have async
+implementations are routed to them, everything else falls through to the
+regular (synchronous) URL configuration.
+"""
+
+from django.urls import path
+
+from event_registrations.views import AsyncRegistrationListView
+from events.views import AsyncEventDetailView, AsyncEventListView
+from users.views import AsyncMeView
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/events/", AsyncEventListView.as_view(), name="event-list"),
+    path(
+        "api/events/<int:event_id>/",
+        AsyncEventDetailView.as_view(),
+        name="event-detail",
+    ),
+    path("api/users/me", AsyncMeView.as_view()),
+    path(
+        "api/registrations/",
+        AsyncRegistrationListView.as_view(),
+        name="registration-list",
+    ),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users import cache as user_cache
+from users.authentication import ClaimsJWTAuthentication, has_claims
+from users.revocation import revoked_tokens
+
+from .renderers import ORJSONRenderer
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of DRF's ``APIView`` for read-only JSON endpoints.
+
+    DRF views are synchronous, so under ASGI every request would occupy a
+    worker thread. Subclasses implement ``async def get(self, request, ...)``
+    and use the async ORM. Authentication, permission checks and error
+    bodies match the synchronous views. Responses are always JSON.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authenticator = ClaimsJWTAuthentication()
+    renderer = ORJSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, authenticators=())
+        self.request = request
+        try:
+            request.user = await self.authenticate(request)
+            self.check_permissions(request)
+            handler = getattr(self, request.method.lower(), None)
+            if handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(response)
+
+    async def authenticate(self, request):
+        header = self.authenticator.get_header(request)
+        raw_token = header and self.authenticator.get_raw_token(header)
+        if raw_token is None:
+            return AnonymousUser()
+        validated_token = self.authenticator.get_validated_token(raw_token)
+        return await self.get_user(validated_token)
+
+    async def get_user(self, validated_token):
+        """Async version of ``ClaimsJWTAuthentication.get_user``."""
+        user_model = get_user_model()
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if await revoked_tokens.ais_revoked(validated_token):
+            raise self.authenticator.revoked()
+        if has_claims(validated_token):
+            state = await user_cache.aget_state(user_id)
+            return self.authenticator.claims_user(validated_token, state)
+        try:
+            user = await user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except user_model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+        return user
+
+    def check_permissions(self, request):
+        for permission in (permission() for permission in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, exc):
+        response = exception_handler(exc, {"view": self, "request": self.request})
+        if response is None:
+            raise exc
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            response["WWW-Authenticate"] = self.authenticator.authenticate_header(
+                self.request
+            )
+        return response
+
+    def finalize_response(self, response):
+        """Render DRF ``Response`` objects eagerly into plain JSON responses."""
+        if not isinstance(response, Response):
+            return response
+        rendered = HttpResponse(
+            self.renderer.render(response.data),
+            status=response.status_code,
+            content_type="application/json",
+        )
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                rendered[header] = value
+        return rendered
@@ -0,0 +1,83 @@
+"""
+Gunicorn settings for production serving.
+
+    gunicorn --config config/gunicorn.py
+
+Every setting can be overridden with a ``GUNICORN_*`` environment variable.
+To serve the async views, set ``GUNICORN_APP=config.asgi:application`` and
+``GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker``.
+Send ``SIGHUP`` to the master to replace the workers gracefully.
+"""
+
+import os
+
+
+def cpu_count():
+    """CPUs this process may run on, which respects container cpusets."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+wsgi_app = os.getenv("GUNICORN_APP", "config.wsgi:application")
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+
+# A process per core plus one, so a core is never idle while a worker waits
+# on the database. Threads let each worker overlap further I/O waits and
+# make keep-alive connections possible (sync workers close every connection).
+# Several processes need a shared cache (see users.checks), so until
+# CACHE_BACKEND names one the default is a single process.
+LOCAL_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+if os.getenv("CACHE_BACKEND", LOCAL_CACHE_BACKEND) == LOCAL_CACHE_BACKEND:
+    default_workers = 1
+else:
+    default_workers = cpu_count() * 2 + 1
+workers = int(os.getenv("GUNICORN_WORKERS", str(default_workers)))
+# For Django's system checks, see users.checks.
+os.environ["SERVER_PROCESSES"] = str(workers)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Import Django once in the master so workers share its memory
+# copy-on-write. New code is only picked up by a restart, not by SIGHUP.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Recycle workers after a bounded number of requests to cap slow memory
+# growth. The jitter keeps workers from restarting all at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Heartbeat files on tmpfs, a disk-backed /tmp can stall workers in Docker.
+worker_tmp_dir = os.getenv("GUNICORN_WORKER_TMP_DIR", "/dev/shm")
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "-")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def pre_fork(server, worker):
+    # A connection or pool opened while preloading would be inherited by
+    # every worker, and their queries would interleave on the same socket.
+    from django.db import connections
+
+    connections.close_all()
+    for connection in connections.all():
+        connection.close_pool()
+
+
+def on_starting(server):
+    # Django runs its system checks from manage.py only. Run them before the
+    # workers start, so settings that are unsafe with several workers stop
+    # the server.
+    import django
+    from django.core.management import call_command
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+    call_command("check")
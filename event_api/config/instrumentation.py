@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("config.sql")
+
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\"s\d+_x\d+\"|\b\d+\b")
+
+
+def fingerprint(sql):
+    """
+    Reduce a statement to its shape so repeats of the same query with
+    different parameters (the signature of an N+1) collapse together.
+    """
+    shape = _PLACEHOLDER_LIST.sub("(...)", sql)
+    shape = _LITERAL.sub("?", shape)
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that tallies queries, time and repeats."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.samples.setdefault(key, sql)
+
+    @property
+    def duplicates(self):
+        return {key: count for key, count in self.fingerprints.items() if count > 1}
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for connection in connections.all(initialized_only=True):
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Report the number of SQL queries, the time spent in the database and
+    repeated query shapes for every request, as ``X-DB-*`` response headers
+    and a log line. Synchronous requests also report the CPU time of the
+    thread that served them as ``X-CPU-Time-Ms``. Only active when
+    ``SQL_INSTRUMENTATION`` is enabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Open the default connection up front so its queries are recorded
+        # even when it is first used inside the view.
+        connections["default"].ensure_connection()
+        cpu_started = time.thread_time()
+        with QueryRecorder().record() as recorder:
+            response = self.get_response(request)
+        response["X-CPU-Time-Ms"] = f"{(time.thread_time() - cpu_started) * 1000:.2f}"
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        # The async ORM runs queries in the request's sync thread, which is
+        # where the connection wrappers have to be installed.
+        recorder = QueryRecorder()
+        stack = ExitStack()
+
+        def start():
+            connections["default"].ensure_connection()
+            stack.enter_context(recorder.record())
+
+        await sync_to_async(start)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        duration_ms = recorder.duration * 1000
+        duplicates = recorder.duplicates
+        response["X-DB-Queries"] = str(recorder.count)
+        response["X-DB-Time-Ms"] = f"{duration_ms:.2f}"
+        response["X-DB-Duplicate-Queries"] = str(sum(duplicates.values()))
+
+        logger.log(
+            logging.WARNING if duplicates else logging.INFO,
+            "%s %s queries=%d db_time_ms=%.2f duplicates=%s",
+            request.method,
+            request.path,
+            recorder.count,
+            duration_ms,
+            {recorder.samples[key]: count for key, count in duplicates.items()},
+        )
+        return response
@@ -0,0 +1,41 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` on orjson. Like the strict ``JSONParser``, it rejects NaN
+    and infinity. Falls back to ``JSONParser`` when orjson is not installed
+    or the body is not UTF-8, and to report parse errors.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not is_utf8(encoding):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Let the stdlib parser produce its familiar error message.
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,30 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def stats(alias=DEFAULT_DB_ALIAS):
+    """
+    Usage of this process's connection pool for ``alias``. Counters are
+    cumulative since the pool was opened.
+    """
+    pool = connections[alias].pool
+    if pool is None:
+        return {"enabled": False}
+    raw = pool.get_stats()
+    size, available = raw.get("pool_size", 0), raw.get("pool_available", 0)
+    queued, wait_ms = raw.get("requests_queued", 0), raw.get("requests_wait_ms", 0)
+    return {
+        "enabled": True,
+        "min_size": raw.get("pool_min", pool.min_size),
+        "max_size": raw.get("pool_max", pool.max_size),
+        "size": size,
+        "in_use": size - available,
+        "available": available,
+        "waiting": raw.get("requests_waiting", 0),
+        "requests": raw.get("requests_num", 0),
+        "requests_queued": queued,
+        "wait_ms": wait_ms,
+        "mean_wait_ms": wait_ms / queued if queued else 0.0,
+        "timeouts": raw.get("requests_errors", 0),
+        "connections_lost": raw.get("connections_lost", 0),
+        "bad_returns": raw.get("returns_bad", 0),
+    }
@@ -0,0 +1,155 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_KEY = "db:pinned:{}"
+
+
+class RoutingState:
+    """
+    Routing decisions for the current request. A mutable object rather than
+    separate context variables, so writes recorded by the router inside
+    ``sync_to_async`` threads are visible to the middleware.
+    """
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.replica = None
+        self.pinned = False
+        self.wrote = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+def is_pinned():
+    """
+    Whether the current request reads from the primary so that its user
+    sees their own recent writes.
+    """
+    state = _state.get()
+    return state is not None and state.pinned
+
+
+class ReplicaRouter:
+    """
+    Send reads of views marked ``read_replica = True`` to a replica chosen by
+    ``ReplicaRoutingMiddleware``; everything else, and every write, goes to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit, so objects read from a replica are still saved to the
+        # primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pick a replica for safe requests to read-only views, unless the
+    requesting user wrote within the last ``REPLICA_PIN_SECONDS``, and pin
+    users to the primary after requests that write.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.authenticator = JWTAuthentication()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(self.token_user_id(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and state.user_id is not None:
+            get_cache().set(
+                PIN_KEY.format(state.user_id), True, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState(self.token_user_id(request))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and state.user_id is not None:
+            await get_cache().aset(
+                PIN_KEY.format(state.user_id), True, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        view_class = getattr(view_func, "view_class", None)
+        if (
+            state is None
+            or request.method not in SAFE_METHODS
+            or not getattr(view_class, "read_replica", False)
+        ):
+            return None
+        pin_key = PIN_KEY.format(state.user_id)
+        if state.user_id is not None and get_cache().get(pin_key):
+            state.pinned = True
+        else:
+            state.replica = random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def token_user_id(self, request):
+        """
+        User id claim of a valid access token, without a database query.
+        Bad credentials are left for the view's authentication to reject.
+        """
+        header = self.authenticator.get_header(request)
+        try:
+            raw_token = header and self.authenticator.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.authenticator.get_validated_token(raw_token)
+        except AuthenticationFailed:
+            return None
+        return validated_token.get(api_settings.USER_ID_CLAIM)
+
+
+def get_cache():
+    return caches[settings.REPLICA_PIN_CACHE_ALIAS]
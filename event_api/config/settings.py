@@ -22,9 +22,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 SECRET_KEY = os.getenv("SECRET_KEY")
-DEBUG = os.getenv("DEBUG", "False")
+DEBUG = os.getenv("DEBUG", "False") == "True"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
 
 
 # Application definition
@@ -36,14 +36,19 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "events.apps.EventsConfig",
     "users.apps.UsersConfig",
     "event_registrations.apps.EventRegistrationsConfig",
+    "benchmarks.apps.BenchmarksConfig",
     "rest_framework",
+    "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
 ]
 
 MIDDLEWARE = [
+    "config.instrumentation.QueryInstrumentationMiddleware",
+    "config.replicas.ReplicaRoutingMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,7 +58,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = "config.urls"
+# config/asgi.py switches to config.asgi_urls, which routes the read
+# endpoints to their async implementations.
+ROOT_URLCONF = os.getenv("ROOT_URLCONF", "config.urls")
 
 TEMPLATES = [
     {
@@ -90,11 +97,42 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # orjson, falling back to DRF's stdlib json classes (see config/renderers.py).
+    "DEFAULT_RENDERER_CLASSES": (
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "config.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
+EVENTS_PAGE_SIZE = int(os.getenv("EVENTS_PAGE_SIZE", "50"))
+EVENTS_MAX_PAGE_SIZE = int(os.getenv("EVENTS_MAX_PAGE_SIZE", "200"))
+EVENTS_BULK_CREATE_MAX = int(os.getenv("EVENTS_BULK_CREATE_MAX", "10000"))
+EVENTS_BULK_CREATE_BATCH_SIZE = 1000
+# Rows per COPY write of the event import, and rejected rows it reports.
+EVENTS_IMPORT_CHUNK_SIZE = int(os.getenv("EVENTS_IMPORT_CHUNK_SIZE", "10000"))
+EVENTS_IMPORT_MAX_ERRORS = int(os.getenv("EVENTS_IMPORT_MAX_ERRORS", "1000"))
+# Monthly partitions of events_event kept ahead of the current month, the
+# schema archived partitions are moved to, and the registrations and
+# waitlist entries moved per transaction when archiving; see
+# events.partitions.
+EVENTS_PARTITION_MONTHS_AHEAD = int(os.getenv("EVENTS_PARTITION_MONTHS_AHEAD", "3"))
+EVENTS_ARCHIVE_SCHEMA = os.getenv("EVENTS_ARCHIVE_SCHEMA", "events_archive")
+EVENTS_ARCHIVE_CHUNK_SIZE = int(os.getenv("EVENTS_ARCHIVE_CHUNK_SIZE", "10000"))
+REGISTRATIONS_BULK_MAX = int(os.getenv("REGISTRATIONS_BULK_MAX", "500"))
+REGISTRATIONS_PAGE_SIZE = int(os.getenv("REGISTRATIONS_PAGE_SIZE", "50"))
+REGISTRATIONS_MAX_PAGE_SIZE = int(os.getenv("REGISTRATIONS_MAX_PAGE_SIZE", "200"))
+# Rows fetched per server-side cursor round trip and encoded per chunk of
+# the export endpoints.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -124,6 +162,89 @@ DATABASES = {
     }
 }
 
+# Connection reuse. The pool (psycopg 3) checks every connection before
+# handing it out, as CONN_HEALTH_CHECKS does for persistent connections. It
+# is per process: with gunicorn the server-side limit must cover workers x
+# POSTGRES_POOL_MAX_SIZE.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if os.getenv("POSTGRES_POOL", "True") == "True":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+            # Seconds a request waits for a free connection before failing.
+            "timeout": float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("POSTGRES_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.getenv("POSTGRES_POOL_MAX_LIFETIME", "3600")),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.getenv("POSTGRES_CONN_MAX_AGE", "60")
+    )
+
+# Read replicas, as comma-separated host[:port]. Read-only endpoints are
+# served from a replica unless the user wrote in the last
+# REPLICA_PIN_SECONDS (see config/replicas.py).
+DATABASE_REPLICAS = []
+replica_addresses = filter(None, os.getenv("POSTGRES_REPLICAS", "").split(","))
+for number, address in enumerate(replica_addresses, 1):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("POSTGRES_REPLICA_DB", DATABASES["default"]["NAME"]),
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.replicas.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("POSTGRES_REPLICA_PIN_SECONDS", "5"))
+REPLICA_PIN_CACHE_ALIAS = "default"
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Users are authenticated from their token claims. The full row, when a
+# view needs it, is kept in process for USERS_CACHE_TTL seconds; the shared
+# cache tells every process when a user changes, so it must not be local to
+# a process when SERVER_PROCESSES is above 1 (set by config/gunicorn.py).
+SERVER_PROCESSES = int(os.getenv("SERVER_PROCESSES", "1"))
+USERS_CACHE_ALIAS = "default"
+USERS_CACHE_TTL = int(os.getenv("USERS_CACHE_TTL", "60"))
+USERS_CACHE_MAX_SIZE = int(os.getenv("USERS_CACHE_MAX_SIZE", "10000"))
+
+# Access tokens revoked at logout. Each process checks tokens against an
+# in-memory Bloom filter of revoked token ids, refreshed from the database
+# every TOKEN_REVOCATION_SYNC_SECONDS and rebuilt without expired ids every
+# TOKEN_REVOCATION_REBUILD_SECONDS. Only filter hits query the database.
+TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+TOKEN_REVOCATION_REBUILD_SECONDS = int(
+    os.getenv("TOKEN_REVOCATION_REBUILD_SECONDS", "600")
+)
+TOKEN_REVOCATION_CAPACITY = int(os.getenv("TOKEN_REVOCATION_CAPACITY", "100000"))
+TOKEN_REVOCATION_ERROR_RATE = float(
+    os.getenv("TOKEN_REVOCATION_ERROR_RATE", "0.001")
+)
+
+EVENTS_CACHE_ALIAS = "default"
+EVENTS_CACHE_TIMEOUT = int(os.getenv("EVENTS_CACHE_TIMEOUT", "60"))
+
+# Per-request SQL query count, DB time and duplicate reporting. Adds X-DB-*
+# response headers, so keep it off in production.
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "False") == "True"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
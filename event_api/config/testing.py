@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+
+from users.revocation import revoked_tokens
+from users.tokens import AccessToken
+
+from .instrumentation import QueryRecorder
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin for pinning the number of SQL queries an endpoint may
+    issue, so N+1 regressions fail the build instead of reaching production.
+    """
+
+    def authenticate(self, client, user):
+        """Authenticate with a real access token, as issued at login."""
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    @contextmanager
+    def assertQueryBudget(self, budget, allow_duplicates=False):
+        # Sync the revocation list now, so its periodic query cannot land in
+        # the measured block.
+        revoked_tokens.sync()
+        recorder = QueryRecorder()
+        with recorder.record():
+            yield recorder
+
+        problems = []
+        if recorder.count > budget:
+            problems.append(f"{recorder.count} queries, budget is {budget}")
+        if recorder.duplicates and not allow_duplicates:
+            problems.append(f"{len(recorder.duplicates)} repeated query shapes")
+        if problems:
+            details = "\n".join(
+                f"  x{recorder.fingerprints[key]}: {sql}"
+                for key, sql in recorder.samples.items()
+            )
+            self.fail(f"{'; '.join(problems)}:\n{details}")
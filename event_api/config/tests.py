@@ -0,0 +1,229 @@
+import io
+import os
+import runpy
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from events.models import Event
+from events.views import EventCreateView, EventListView
+from users.models import User
+
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+from .replicas import PIN_KEY, ReplicaRoutingMiddleware
+from .testing import QueryBudgetMixin
+
+POOL_ENABLED = bool(connection.settings_dict.get("OPTIONS", {}).get("pool"))
+
+
+@skipUnless(POOL_ENABLED, "POSTGRES_POOL is off.")
+class DatabasePoolHealthCheckTest(TestCase):
+    def test_replaces_dead_connections(self):
+        # Close the pool's idle connections from the server side, as a
+        # database restart or an idle timeout would.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            for _ in range(100):
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                )
+                if not cursor.fetchone()[0]:
+                    break
+                time.sleep(0.01)
+
+        for _ in range(connection.pool.max_size):
+            with connection.pool.connection() as conn:
+                self.assertEqual(conn.execute("SELECT 1").fetchone(), (1,))
+
+
+class DatabasePoolStatsTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            email="admin@example.com", username="admin", is_staff=True
+        )
+        cls.user = User.objects.create(email="user@example.com", username="user")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @skipUnless(POOL_ENABLED, "POSTGRES_POOL is off.")
+    def test_stats(self):
+        self.authenticate(self.client, self.admin)
+
+        response = self.client.get("/api/db/pool/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["enabled"])
+        self.assertGreaterEqual(response.data["in_use"], 1)
+        self.assertEqual(
+            response.data["size"],
+            response.data["in_use"] + response.data["available"],
+        )
+        for key in ("waiting", "wait_ms", "mean_wait_ms", "timeouts"):
+            self.assertIn(key, response.data)
+
+    def test_requires_staff(self):
+        self.authenticate(self.client, self.user)
+
+        response = self.client.get("/api/db/pool/stats/")
+
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="user@example.com", username="user")
+        cls.other = User.objects.create(email="other@example.com", username="other")
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def request(self, view, method="get", user=None, write=False, token=None):
+        """
+        Run a request through the middleware and return the database alias
+        the router picks for reads inside the view.
+        """
+        headers = {}
+        if user is not None:
+            token = AccessToken.for_user(user)
+        if token is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        request = getattr(self.factory, method)("/", **headers)
+        view_func = view.as_view()
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view_func, (), {})
+            if write:
+                router.db_for_write(Event)
+            seen["read"] = router.db_for_read(Event)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(request)
+        return seen["read"]
+
+    def test_read_only_views_read_from_replica(self):
+        self.assertEqual(self.request(EventListView), "replica_1")
+        self.assertEqual(self.request(EventListView, user=self.user), "replica_1")
+
+    def test_invalid_token_reads_from_replica(self):
+        self.assertEqual(self.request(EventListView, token="invalid"), "replica_1")
+        self.assertEqual(self.request(EventListView, token=""), "replica_1")
+
+    def test_other_views_read_from_primary(self):
+        self.assertEqual(self.request(EventCreateView), "default")
+        self.assertEqual(self.request(EventListView, method="post"), "default")
+
+    def test_reads_after_write_stick_to_primary(self):
+        self.assertEqual(
+            self.request(EventCreateView, method="post", user=self.user, write=True),
+            "default",
+        )
+
+        self.assertEqual(self.request(EventListView, user=self.user), "default")
+        self.assertEqual(self.request(EventListView, user=self.other), "replica_1")
+        self.assertEqual(self.request(EventListView), "replica_1")
+
+    def test_pin_expires(self):
+        self.request(EventCreateView, method="post", user=self.user, write=True)
+
+        cache.delete(PIN_KEY.format(self.user.pk))
+
+        self.assertEqual(self.request(EventListView, user=self.user), "replica_1")
+
+
+class ORJSONTest(SimpleTestCase):
+    data = {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "utc": datetime(2025, 6, 1, 12, 30, 15, 250, tzinfo=timezone.utc),
+        "local": datetime(2025, 6, 1, 12, 30, tzinfo=ZoneInfo("Europe/Kyiv")),
+        "naive": datetime(2025, 6, 1, 12, 30),
+        "date": datetime(2025, 6, 1).date(),
+        "duration": timedelta(minutes=90),
+        "price": Decimal("12.50"),
+        "lazy": gettext_lazy("Not found."),
+        "text": "Kyiv \u2028 Київ",
+        "nested": [{1: None, "flag": True}, [], {}],
+    }
+
+    def assertSameRendering(self, accepted_media_type=None, data=None):
+        data = self.data if data is None else data
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_matches_json_renderer(self):
+        self.assertSameRendering()
+        self.assertSameRendering("application/json; indent=2")
+        self.assertSameRendering("application/json; indent=4")
+        self.assertSameRendering(data={"big": 2**70})
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_parser(self):
+        parse = ORJSONParser().parse
+
+        self.assertEqual(
+            parse(io.BytesIO('{"title": "Київ", "capacity": 10}'.encode())),
+            {"title": "Київ", "capacity": 10},
+        )
+        latin1 = io.BytesIO('{"title": "café"}'.encode("latin-1"))
+        self.assertEqual(
+            parse(latin1, None, {"encoding": "latin-1"}), {"title": "café"}
+        )
+        for body in (b'{"capacity": NaN}', b"{", b""):
+            with self.assertRaisesMessage(ParseError, "JSON parse error"):
+                parse(io.BytesIO(body))
+        self.assertIs(ORJSONParser.renderer_class, ORJSONRenderer)
+        self.assertTrue(issubclass(ORJSONParser, JSONParser))
+
+
+class GunicornConfigTest(SimpleTestCase):
+    path = Path(__file__).with_name("gunicorn.py")
+
+    def workers(self, **environ):
+        with mock.patch.dict(os.environ, environ):
+            os.environ.pop("GUNICORN_WORKERS", None)
+            if "CACHE_BACKEND" not in environ:
+                os.environ.pop("CACHE_BACKEND", None)
+            config = runpy.run_path(str(self.path))
+            self.assertEqual(os.environ["SERVER_PROCESSES"], str(config["workers"]))
+            return config["workers"]
+
+    def test_single_worker_without_shared_cache(self):
+        self.assertEqual(self.workers(), 1)
+        self.assertEqual(
+            self.workers(CACHE_BACKEND="django.core.cache.backends.locmem.LocMemCache"),
+            1,
+        )
+
+    def test_workers_with_shared_cache(self):
+        workers = self.workers(
+            CACHE_BACKEND="django.core.cache.backends.redis.RedisCache"
+        )
+        self.assertEqual(workers, len(os.sched_getaffinity(0)) * 2 + 1)
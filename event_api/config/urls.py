@@ -2,12 +2,23 @@ from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from .views import DatabasePoolStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("users.urls")),
     path("api/", include("events.urls")),
     path("api/", include("event_registrations.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/db/pool/stats/",
+        DatabasePoolStatsView.as_view(),
+        name="database-pool-stats",
+    ),
+    path(
+        "api/schema/",
+        SpectacularAPIView.as_view(urlconf="config.urls"),
+        name="schema",
+    ),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="schema"),
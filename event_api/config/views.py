@@ -0,0 +1,27 @@
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import pool
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Database connection pool usage."),
+            403: OpenApiResponse(description="Staff access required."),
+        },
+        tags=["Database"],
+        operation_id="database_pool_stats",
+        summary="Database pool statistics",
+        description=(
+            "Returns connections in use, requests waiting for a connection and "
+            "time spent waiting, for the worker process serving the request. "
+            "Staff only."
+        ),
+    )
+    def get(self, request):
+        return Response(pool.stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from events import cache as event_cache
+from events.models import Event
+from event_registrations.models import EventRegistration
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Event.registration_count from the registrations table and fix "
+        "any drift, one batch of events per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of event IDs checked per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted events without fixing them.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        actual = Coalesce(
+            Subquery(
+                EventRegistration.objects.filter(event_id=OuterRef("pk"))
+                .order_by()
+                .values("event_id")
+                .annotate(total=Count("*"))
+                .values("total")
+            ),
+            0,
+        )
+        last_id = Event.objects.aggregate(last=Max("id"))["last"] or 0
+        fixed = 0
+        for start in range(0, last_id + 1, batch_size):
+            with transaction.atomic():
+                drifted = (
+                    Event.objects.filter(id__gte=start, id__lt=start + batch_size)
+                    .annotate(actual_count=actual)
+                    .exclude(registration_count=F("actual_count"))
+                )
+                if dry_run:
+                    for event_id, stored, counted in drifted.values_list(
+                        "id", "registration_count", "actual_count"
+                    ):
+                        self.stdout.write(
+                            f"Event {event_id}: stored {stored}, actual {counted}"
+                        )
+                        fixed += 1
+                    continue
+                event_ids = list(
+                    drifted.select_for_update(of=("self",)).values_list("id", flat=True)
+                )
+                if event_ids:
+                    Event.objects.filter(id__in=event_ids).update(
+                        registration_count=actual, updated_at=Now()
+                    )
+                    event_cache.invalidate_seats(event_ids)
+                    fixed += len(event_ids)
+
+        verb = "Found" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fixed} drifted event(s)."))
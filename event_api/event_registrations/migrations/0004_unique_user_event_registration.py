@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+DELETE_DUPLICATE_REGISTRATIONS = """
+DELETE FROM event_registrations_eventregistration AS duplicate
+USING event_registrations_eventregistration AS original
+WHERE duplicate.user_id = original.user_id
+  AND duplicate.event_id = original.event_id
+  AND duplicate.id > original.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("event_registrations", "0003_initial"),
+        ("events", "0005_event_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATE_REGISTRATIONS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="eventregistration",
+            constraint=models.UniqueConstraint(
+                fields=("user", "event"), name="unique_user_event_registration"
+            ),
+        ),
+    ]
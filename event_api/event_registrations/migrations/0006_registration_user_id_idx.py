@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("event_registrations", "0005_waitlistentry"),
+        ("events", "0007_event_registration_count_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="eventregistration",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="registrations",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventregistration",
+            index=models.Index(fields=["user", "id"], name="registration_user_id_idx"),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("event_registrations", "0006_registration_user_id_idx"),
+        ("events", "0008_event_external_id"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="eventregistration",
+            name="event",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="registrations",
+                to="events.event",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="waitlistentry",
+            name="event",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="waitlist_entries",
+                to="events.event",
+            ),
+        ),
+    ]
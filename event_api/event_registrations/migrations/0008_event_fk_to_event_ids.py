@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+from django.db import migrations
+
+# The events table is partitioned and its primary key is (id, event_date),
+# so the registration tables reference events_event_ids, which has a row
+# per event id, instead. Django still sees db_constraint=False foreign keys
+# to Event and cascades deletes itself.
+ADD_EVENT_FOREIGN_KEYS = """
+ALTER TABLE event_registrations_eventregistration
+    ADD CONSTRAINT event_registrations_eventregistration_event_id_fk_event_ids
+    FOREIGN KEY (event_id) REFERENCES events_event_ids (id)
+    DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE event_registrations_waitlistentry
+    ADD CONSTRAINT event_registrations_waitlistentry_event_id_fk_event_ids
+    FOREIGN KEY (event_id) REFERENCES events_event_ids (id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+DROP_EVENT_FOREIGN_KEYS = """
+ALTER TABLE event_registrations_eventregistration
+    DROP CONSTRAINT event_registrations_eventregistration_event_id_fk_event_ids;
+ALTER TABLE event_registrations_waitlistentry
+    DROP CONSTRAINT event_registrations_waitlistentry_event_id_fk_event_ids;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("event_registrations", "0007_event_fk_without_constraint"),
+        ("events", "0010_event_ids"),
+    ]
+
+    operations = [
+        migrations.RunSQL(ADD_EVENT_FOREIGN_KEYS, DROP_EVENT_FOREIGN_KEYS),
+    ]
@@ -6,11 +6,61 @@ from events.models import Event
 class EventRegistration(models.Model):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="registrations"
+        User, on_delete=models.CASCADE, related_name="registrations", db_index=False
     )
+    # PostgreSQL cannot reference the partitioned events table by id alone,
+    # so the database constraint references events_event_ids instead (see
+    # migration 0008). Django still cascades deletes.
     event = models.ForeignKey(
-        Event, on_delete=models.CASCADE, related_name="registrations"
+        Event,
+        on_delete=models.CASCADE,
+        related_name="registrations",
+        db_constraint=False,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="registration_user_id_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "event"], name="unique_user_event_registration"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.email} registered for {self.event.title}"
+
+
+class WaitlistEntry(models.Model):
+    # Entries are served in id order, so the id doubles as the queue position
+    # and (event, id) is the queue index.
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+        db_index=False,
+    )
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="waitlist_entries",
+        db_index=False,
+        # See EventRegistration.event.
+        db_constraint=False,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event", "id"], name="waitlist_event_position_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "event"], name="unique_user_event_waitlist"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} waitlisted for {self.event.title}"
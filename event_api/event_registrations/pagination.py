@@ -0,0 +1,9 @@
+from django.conf import settings
+
+from events.pagination import KeysetPagination
+
+
+class RegistrationPagination(KeysetPagination):
+    ordering = ("-id",)
+    page_size = settings.REGISTRATIONS_PAGE_SIZE
+    max_page_size = settings.REGISTRATIONS_MAX_PAGE_SIZE
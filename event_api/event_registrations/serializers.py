@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import EventRegistration
+from events.serializers import EventSerializer
+from .models import EventRegistration, WaitlistEntry
 
 
 class EventRegistrationResponseSerializer(serializers.ModelSerializer):
@@ -10,7 +12,51 @@ class EventRegistrationResponseSerializer(serializers.ModelSerializer):
         fields = ["id", "event", "event_title"]
 
 
+class ExpandedEventRegistrationResponseSerializer(EventRegistrationResponseSerializer):
+    event = EventSerializer(read_only=True)
+
+
+class RegistrationFilterSerializer(serializers.Serializer):
+    when = serializers.ChoiceField(
+        choices=["upcoming", "past"],
+        required=False,
+        help_text="Only registrations for upcoming or for past events.",
+    )
+    expand = serializers.ChoiceField(
+        choices=["event"],
+        required=False,
+        help_text="Embed the full event object instead of its ID.",
+    )
+
+
 class CreateEventRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = EventRegistration
         fields = ["event"]
+
+
+class BulkEventRegistrationSerializer(serializers.Serializer):
+    events = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.REGISTRATIONS_BULK_MAX,
+        help_text="IDs of the events to register for.",
+    )
+
+
+class BulkEventRegistrationResponseSerializer(serializers.Serializer):
+    registered = serializers.ListField(child=serializers.IntegerField())
+    already_registered = serializers.ListField(child=serializers.IntegerField())
+    waitlisted = serializers.ListField(child=serializers.IntegerField())
+    not_found = serializers.ListField(child=serializers.IntegerField())
+
+
+class WaitlistEntryResponseSerializer(serializers.ModelSerializer):
+    event_title = serializers.CharField(source="event.title", read_only=True)
+    position = serializers.IntegerField(
+        read_only=True, help_text="1-based place in the event's waitlist."
+    )
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ["id", "event", "event_title", "position", "created_at"]
@@ -0,0 +1,271 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from events import cache as event_cache
+from events.models import Event
+
+from .models import EventRegistration, WaitlistEntry
+
+
+class RegistrationError(Exception):
+    pass
+
+
+class AlreadyRegistered(RegistrationError):
+    pass
+
+
+class AlreadyWaitlisted(RegistrationError):
+    pass
+
+
+def claim_seat(event_id):
+    """
+    Take one seat of an event in a single conditional UPDATE.
+
+    The row lock is held only until the surrounding transaction commits and
+    the capacity check happens inside the UPDATE itself, so concurrent
+    registrations can never oversell. Returns ``False`` when the event is full.
+    """
+    return bool(
+        Event.objects.filter(pk=event_id)
+        .filter(Q(capacity__isnull=True) | Q(registration_count__lt=F("capacity")))
+        .update(registration_count=F("registration_count") + 1, updated_at=Now())
+    )
+
+
+def release_seats(event_id, seats=1):
+    Event.objects.filter(pk=event_id).update(
+        registration_count=F("registration_count") - seats, updated_at=Now()
+    )
+
+
+def register(user_id, event):
+    """
+    Register a user for an event, or put them on its waitlist when it is
+    full, raising ``AlreadyRegistered`` or ``AlreadyWaitlisted``. Returns the
+    registration or the waitlist entry.
+
+    The registration row is inserted before the seat is claimed so that
+    duplicate attempts fail on the unique constraint without ever queueing
+    on the event row lock.
+    """
+    try:
+        with transaction.atomic():
+            registration = EventRegistration.objects.create(
+                user_id=user_id, event=event
+            )
+            if not claim_seat(event.pk):
+                return wait_for_seat(registration)
+            event_cache.invalidate_seats([event.pk])
+    except IntegrityError:
+        raise AlreadyRegistered
+    return registration
+
+
+def wait_for_seat(registration):
+    """
+    Claim a seat for ``registration`` under the event row lock, or replace it
+    with a waitlist entry when there is still none.
+
+    Runs in register's transaction after claim_seat found the event full.
+    unregister takes the same lock, so a cancellation either frees its seat
+    before this looks again or sees the entry and promotes the user. Every
+    user joining the waitlist queues on the lock, so only one statement runs
+    while it is held.
+    """
+    event_id = registration.event_id
+    event = (
+        Event.objects.select_for_update()
+        .only("capacity", "registration_count")
+        .get(pk=event_id)
+    )
+    if event.capacity is None or event.registration_count < event.capacity:
+        claim_seat(event_id)
+        event_cache.invalidate_seats([event_id])
+        return registration
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH removed AS (
+                DELETE FROM {EventRegistration._meta.db_table} WHERE id = %s
+            )
+            INSERT INTO {WaitlistEntry._meta.db_table} (user_id, event_id, created_at)
+            VALUES (%s, %s, now())
+            ON CONFLICT (user_id, event_id) DO NOTHING
+            RETURNING id, created_at
+            """,
+            [registration.pk, registration.user_id, event_id],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        raise AlreadyWaitlisted
+    entry_id, created_at = row
+    return WaitlistEntry(
+        id=entry_id,
+        user_id=registration.user_id,
+        event_id=event_id,
+        created_at=created_at,
+    )
+
+
+def lock_event(event_id):
+    list(Event.objects.select_for_update().filter(pk=event_id).values_list("pk"))
+
+
+def register_many(user_id, event_ids):
+    """
+    Register a user for several existing events using one INSERT and one
+    UPDATE, plus one DELETE and one INSERT when some events are full.
+
+    Events that are fully booked put the user on their waitlist instead.
+    Returns ``(registered, already_registered, waitlisted)`` lists of event IDs.
+    Event rows are locked in ID order, so concurrent batches cannot deadlock.
+    """
+    registrations = EventRegistration._meta.db_table
+    events = Event._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {registrations} (user_id, event_id)
+            SELECT %s::uuid, event_id FROM unnest(%s::integer[]) AS event_id
+            ON CONFLICT (user_id, event_id) DO NOTHING
+            RETURNING event_id
+            """,
+            [str(user_id), list(event_ids)],
+        )
+        inserted = {row[0] for row in cursor.fetchall()}
+        if not inserted:
+            return [], list(event_ids), []
+
+        cursor.execute(
+            f"""
+            UPDATE {events}
+            SET registration_count = registration_count + 1, updated_at = now()
+            WHERE id IN (
+                SELECT id FROM {events}
+                WHERE id = ANY(%s)
+                  AND (capacity IS NULL OR registration_count < capacity)
+                ORDER BY id
+                FOR NO KEY UPDATE
+            )
+            RETURNING id
+            """,
+            [sorted(inserted)],
+        )
+        claimed = {row[0] for row in cursor.fetchall()}
+        if claimed:
+            event_cache.invalidate_seats(claimed)
+
+        full = inserted - claimed
+        if full:
+            EventRegistration.objects.filter(
+                user_id=user_id, event_id__in=full
+            ).delete()
+            WaitlistEntry.objects.bulk_create(
+                [
+                    WaitlistEntry(user_id=user_id, event_id=event_id)
+                    for event_id in sorted(full)
+                ],
+                ignore_conflicts=True,
+            )
+
+    registered = [event_id for event_id in event_ids if event_id in claimed]
+    already_registered = [
+        event_id for event_id in event_ids if event_id not in inserted
+    ]
+    waitlisted = [event_id for event_id in event_ids if event_id in full]
+    return registered, already_registered, waitlisted
+
+
+def promote(event_id, seats):
+    """
+    Move up to ``seats`` users from the head of the event's waitlist into
+    registrations and return how many were promoted.
+
+    Runs inside the caller's transaction. The head is read through the
+    (event, position) index and locked with SKIP LOCKED, so concurrent
+    cancellations promote different users instead of waiting on each other.
+    Seat accounting is left to the caller.
+    """
+    entries = list(
+        WaitlistEntry.objects.select_for_update(skip_locked=True)
+        .filter(event_id=event_id)
+        .order_by("id")
+        .values_list("id", "user_id")[:seats]
+    )
+    if not entries:
+        return 0
+    EventRegistration.objects.bulk_create(
+        [
+            EventRegistration(user_id=user_id, event_id=event_id)
+            for _, user_id in entries
+        ]
+    )
+    WaitlistEntry.objects.filter(id__in=[entry_id for entry_id, _ in entries]).delete()
+    return len(entries)
+
+
+def unregister(registration):
+    """
+    Cancel a registration, handing the seat to the next waitlisted user.
+
+    Only the cancellation that deletes the row frees its seat, so a retried
+    or concurrent cancellation of the same registration does nothing.
+    """
+    with transaction.atomic():
+        deleted, _ = EventRegistration.objects.filter(pk=registration.pk).delete()
+        if not deleted:
+            return
+        lock_event(registration.event_id)
+        if not promote(registration.event_id, 1):
+            release_seats(registration.event_id)
+            event_cache.invalidate_seats([registration.event_id])
+
+
+def fill_free_seats(event_id):
+    """Promote waitlisted users into seats freed by a capacity increase."""
+    with transaction.atomic():
+        event = (
+            Event.objects.select_for_update()
+            .only("capacity", "registration_count")
+            .get(pk=event_id)
+        )
+        if event.capacity is None:
+            seats = WaitlistEntry.objects.filter(event_id=event_id).count()
+        else:
+            seats = event.capacity - event.registration_count
+        if seats <= 0:
+            return 0
+        promoted = promote(event_id, seats)
+        if promoted:
+            Event.objects.filter(pk=event_id).update(
+                registration_count=F("registration_count") + promoted,
+                updated_at=Now(),
+            )
+            event_cache.invalidate_seats([event_id])
+        return promoted
+
+
+def with_waitlist_position(queryset):
+    """
+    Annotate waitlist entries with their 1-based place in the queue.
+
+    A place is the count of the entries ahead of it in the same queue, an
+    index range scan of (event, id): each entry costs O(place), so listing a
+    user's entries costs the sum of their places. A stored place would have
+    to be rewritten for everyone behind each entry that leaves or is
+    promoted, which is the write path under load.
+    """
+    ahead = (
+        WaitlistEntry.objects.filter(
+            event_id=OuterRef("event_id"), id__lt=OuterRef("id")
+        )
+        .order_by()
+        .values("event_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return queryset.annotate(position=Coalesce(Subquery(ahead), 0) + 1)
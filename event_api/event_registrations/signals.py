@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from events import cache as event_cache
+from events.models import Event
+from users.models import User
+
+from . import services
+
+
+@receiver(pre_delete, sender=User)
+def release_seats_of_deleted_user(sender, instance, **kwargs):
+    """
+    Give back the seats held by a user whose registrations are about to be
+    removed by the cascade, then refill them from the waitlists.
+    """
+    events = Event.objects.filter(registrations__user_id=instance.pk)
+    event_ids = list(events.values_list("id", flat=True))
+    if not event_ids:
+        return
+    # A user holds at most one registration per event.
+    Event.objects.filter(id__in=event_ids).update(
+        registration_count=F("registration_count") - 1, updated_at=Now()
+    )
+    event_cache.invalidate_seats(event_ids)
+
+    waitlisted_event_ids = list(
+        Event.objects.filter(id__in=event_ids, waitlist_entries__isnull=False)
+        .distinct()
+        .values_list("id", flat=True)
+    )
+
+    def fill_seats():
+        for event_id in waitlisted_event_ids:
+            services.fill_free_seats(event_id)
+
+    # Refill only after the cascade has removed the user's own waitlist entries.
+    transaction.on_commit(fill_seats)
@@ -1,3 +1,610 @@
-from django.test import TestCase
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.testing import QueryBudgetMixin
+from events import cache as event_cache
+from events.models import Event
+from users.models import Role, User
+
+from . import services
+from .models import EventRegistration, WaitlistEntry
+
+
+class RegistrationCapacityConcurrencyTest(TransactionTestCase):
+    capacity = 50
+    attendees = 300
+    workers = 32
+
+    def setUp(self):
+        organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        self.event = Event.objects.create(
+            title="Ticket drop",
+            event_date=timezone.now(),
+            location="Main hall",
+            organizer="Organizer",
+            author=organizer,
+            capacity=self.capacity,
+        )
+        self.users = User.objects.bulk_create(
+            User(email=f"user{i}@example.com", username=f"user{i}")
+            for i in range(self.attendees)
+        )
+
+    def run_in_parallel(self, request):
+        """
+        Fire ``request(client)`` once per user from ``workers`` threads, each
+        thread holding one database connection for the whole run.
+        """
+
+        def worker(users):
+            client = APIClient()
+            try:
+                results = []
+                for user in users:
+                    client.force_authenticate(user)
+                    results.append(request(client))
+                return results
+            finally:
+                connection.close()
+
+        chunks = [self.users[i :: self.workers] for i in range(self.workers)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return [result for chunk in pool.map(worker, chunks) for result in chunk]
+
+    def test_parallel_registrations_never_oversell(self):
+        started = time.perf_counter()
+        statuses = self.run_in_parallel(
+            lambda client: client.post(
+                "/api/registrations/create/", {"event": self.event.id}
+            ).status_code
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(statuses.count(201), self.capacity)
+        self.assertEqual(statuses.count(202), self.attendees - self.capacity)
+        self.assertEqual(
+            EventRegistration.objects.filter(event=self.event).count(), self.capacity
+        )
+        self.assertEqual(
+            WaitlistEntry.objects.filter(event=self.event).count(),
+            self.attendees - self.capacity,
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, self.capacity)
+        # Generous floor: a regression to table-level locking or retry loops
+        # drops throughput by orders of magnitude, not by a constant factor.
+        self.assertGreater(self.attendees / elapsed, 50)
+
+    def test_parallel_bulk_registrations_never_oversell(self):
+        second = Event.objects.create(
+            title="Second drop",
+            event_date=timezone.now(),
+            location="Main hall",
+            organizer="Organizer",
+            author=self.event.author,
+            capacity=self.capacity,
+        )
+
+        results = self.run_in_parallel(
+            lambda client: client.post(
+                "/api/registrations/create/bulk/",
+                {"events": [second.id, self.event.id]},
+                format="json",
+            ).data
+        )
+
+        for event in (self.event, second):
+            event.refresh_from_db()
+            self.assertEqual(event.registration_count, self.capacity)
+            self.assertEqual(
+                EventRegistration.objects.filter(event=event).count(), self.capacity
+            )
+            self.assertEqual(
+                sum(event.id in result["registered"] for result in results),
+                self.capacity,
+            )
+
+
+class WaitlistRaceTest(TransactionTestCase):
+    def setUp(self):
+        organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        self.event = Event.objects.create(
+            title="Ticket drop",
+            event_date=timezone.now(),
+            location="Main hall",
+            organizer="Organizer",
+            author=organizer,
+            capacity=1,
+        )
+        self.holder, self.user = User.objects.bulk_create(
+            User(email=f"user{i}@example.com", username=f"user{i}") for i in range(2)
+        )
+        self.registration = services.register(self.holder.pk, self.event)
+
+    def test_cancellation_after_full_check(self):
+        # The seat is cancelled between the first claim_seat, which finds the
+        # event full, and the decision to join the waitlist.
+        claim_seat = services.claim_seat
+        calls = []
+
+        def cancel_during_claim(event_id):
+            claimed = claim_seat(event_id)
+            if not calls:
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    pool.submit(self.cancel).result()
+            calls.append(claimed)
+            return claimed
+
+        with mock.patch.object(services, "claim_seat", cancel_during_claim):
+            result = services.register(self.user.pk, self.event)
+
+        self.assertEqual(calls, [False, True])
+        self.assertIsInstance(result, EventRegistration)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def test_cancellation_while_joining_waitlist(self):
+        # The cancellation waits for the waitlist entry and promotes it.
+        wait_for_seat = services.wait_for_seat
+        cancelled = []
+
+        def cancel_before_commit(registration):
+            entry = wait_for_seat(registration)
+            pool = ThreadPoolExecutor(max_workers=1)
+            cancelled.append(pool.submit(self.cancel))
+            time.sleep(0.3)
+            pool.shutdown(wait=False)
+            return entry
+
+        with mock.patch.object(services, "wait_for_seat", cancel_before_commit):
+            result = services.register(self.user.pk, self.event)
+        cancelled[0].result()
+
+        self.assertIsInstance(result, WaitlistEntry)
+        self.assertEqual(
+            list(EventRegistration.objects.values_list("user_id", flat=True)),
+            [self.user.pk],
+        )
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def cancel(self):
+        try:
+            services.unregister(self.registration)
+        finally:
+            connection.close()
+
+
+class RegistrationQueryBudgetTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="user@example.com", username="user")
+        organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now(),
+                location="Main hall",
+                organizer="Organizer",
+                author=organizer,
+                capacity=10,
+                registration_count=1 if i else 0,
+            )
+            for i in range(20)
+        )
+        cls.registrations = EventRegistration.objects.bulk_create(
+            EventRegistration(user=cls.user, event=event) for event in cls.events[1:]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.authenticate(self.client, self.user)
+
+    def test_list(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get("/api/registrations/")
+        self.assertEqual(len(response.data["results"]), len(self.registrations))
+
+    def test_list_expanded(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get("/api/registrations/?expand=event")
+        self.assertEqual(len(response.data["results"]), len(self.registrations))
+
+    def test_create(self):
+        with self.assertQueryBudget(5):
+            response = self.client.post(
+                "/api/registrations/create/", {"event": self.events[0].id}
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_bulk_create(self):
+        with self.assertQueryBudget(5):
+            response = self.client.post(
+                "/api/registrations/create/bulk/",
+                {"events": [event.id for event in self.events]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_delete(self):
+        with self.assertQueryBudget(7):
+            response = self.client.delete(
+                f"/api/registrations/{self.registrations[0].id}/"
+            )
+        self.assertEqual(response.status_code, 204)
+
+
+@override_settings(ROOT_URLCONF="config.asgi_urls")
+class AsyncRegistrationListViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="user@example.com", username="user")
+        organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now(),
+                location="Main hall",
+                organizer="Organizer",
+                author=organizer,
+            )
+            for i in range(3)
+        )
+        EventRegistration.objects.bulk_create(
+            EventRegistration(user=cls.user, event=event) for event in events
+        )
+
+    async def test_list(self):
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get(
+            "/api/registrations/?expand=event&page_size=2",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(body["results"]), 2)
+        self.assertEqual(body["results"][0]["event"]["title"], "Event 2")
+        self.assertIsNotNone(body["next"])
+
+
+class RegistrationCountTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now(),
+                location="Main hall",
+                organizer="Organizer",
+                author=cls.organizer,
+                capacity=2,
+            )
+            for i in range(3)
+        )
+        cls.users = User.objects.bulk_create(
+            User(email=f"user{i}@example.com", username=f"user{i}") for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def counts(self):
+        cache.clear()
+        response = self.client.get("/api/events/?fields=id,registration_count")
+        listed = [event["registration_count"] for event in response.json()["results"]]
+        detailed = [
+            self.client.get(f"/api/events/{event.id}/").data["registration_count"]
+            for event in self.events
+        ]
+        self.assertEqual(listed, detailed)
+        return listed
+
+    def test_counts(self):
+        for user in self.users:
+            self.authenticate(self.client, user)
+            self.client.post("/api/registrations/create/", {"event": self.events[0].id})
+        self.assertEqual(self.counts(), [2, 0, 0])
+
+        self.authenticate(self.client, self.users[0])
+        self.client.post(
+            "/api/registrations/create/bulk/",
+            {"events": [event.id for event in self.events]},
+            format="json",
+        )
+        self.assertEqual(self.counts(), [2, 1, 1])
+
+        registration = EventRegistration.objects.get(
+            user=self.users[0], event=self.events[0]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/registrations/{registration.id}/")
+        # The waitlisted user takes the seat.
+        self.assertEqual(self.counts(), [2, 1, 1])
+        self.assertTrue(
+            EventRegistration.objects.filter(
+                user=self.users[2], event=self.events[0]
+            ).exists()
+        )
+
+    def test_user_delete(self):
+        EventRegistration.objects.bulk_create(
+            EventRegistration(user=user, event=self.events[0])
+            for user in self.users[:2]
+        )
+        EventRegistration.objects.create(user=self.users[0], event=self.events[1])
+        WaitlistEntry.objects.create(user=self.users[2], event=self.events[0])
+        Event.objects.filter(id=self.events[0].id).update(registration_count=2)
+        Event.objects.filter(id=self.events[1].id).update(registration_count=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[0].delete()
+
+        self.assertEqual(self.counts(), [2, 0, 0])
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_reconcile(self):
+        EventRegistration.objects.bulk_create(
+            EventRegistration(user=user, event=self.events[0])
+            for user in self.users[:2]
+        )
+        EventRegistration.objects.create(user=self.users[0], event=self.events[2])
+        # Drift in both directions, in different batches.
+        Event.objects.filter(id=self.events[0].id).update(registration_count=1)
+        Event.objects.filter(id=self.events[1].id).update(registration_count=2)
+        Event.objects.filter(id=self.events[2].id).update(registration_count=1)
+        self.client.get(f"/api/events/{self.events[0].id}/")
+
+        out = io.StringIO()
+        call_command(
+            "reconcile_registration_counts", "--dry-run", batch_size=1, stdout=out
+        )
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                f"Event {self.events[0].id}: stored 1, actual 2",
+                f"Event {self.events[1].id}: stored 2, actual 0",
+                "Found 2 drifted event(s).",
+            ],
+        )
+        self.assertEqual(
+            list(
+                Event.objects.order_by("id").values_list(
+                    "registration_count", flat=True
+                )
+            ),
+            [1, 2, 1],
+        )
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("reconcile_registration_counts", batch_size=1, stdout=out)
+        self.assertEqual(out.getvalue(), "Fixed 2 drifted event(s).\n")
+        self.assertIsNone(cache.get(event_cache.detail_key(self.events[0].id)))
+        self.assertEqual(self.counts(), [2, 0, 1])
+
+
+class WaitlistPositionTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.event, cls.other_event = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now(),
+                location="Main hall",
+                organizer="Organizer",
+                author=organizer,
+                capacity=1,
+                registration_count=1,
+            )
+            for i in range(2)
+        )
+        cls.users = User.objects.bulk_create(
+            User(email=f"user{i}@example.com", username=f"user{i}") for i in range(6)
+        )
+        cls.registration = EventRegistration.objects.create(
+            user=cls.users[0], event=cls.event
+        )
+        EventRegistration.objects.create(user=cls.users[5], event=cls.other_event)
+        # Another queue interleaved with the first one.
+        for user in cls.users[1:5]:
+            WaitlistEntry.objects.create(user=user, event=cls.event)
+            WaitlistEntry.objects.create(user=user, event=cls.other_event)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def positions(self, event):
+        return list(
+            services.with_waitlist_position(
+                WaitlistEntry.objects.filter(event=event).order_by("id")
+            ).values_list("user_id", "position")
+        )
+
+    def test_positions(self):
+        for event in (self.event, self.other_event):
+            self.assertEqual(
+                self.positions(event),
+                [(user.pk, i) for i, user in enumerate(self.users[1:5], 1)],
+            )
+
+    def test_positions_move_up(self):
+        WaitlistEntry.objects.filter(user=self.users[2], event=self.event).delete()
+        services.unregister(self.registration)
+
+        self.assertEqual(
+            self.positions(self.event), [(self.users[3].pk, 1), (self.users[4].pk, 2)]
+        )
+        self.assertTrue(
+            EventRegistration.objects.filter(
+                user=self.users[1], event=self.event
+            ).exists()
+        )
+
+    def test_cancel_twice(self):
+        # Two requests cancelling the same registration, each with its copy.
+        copy = EventRegistration.objects.get(pk=self.registration.pk)
+        services.unregister(self.registration)
+        services.unregister(copy)
+
+        self.assertEqual(
+            list(
+                EventRegistration.objects.filter(event=self.event).values_list(
+                    "user_id", flat=True
+                )
+            ),
+            [self.users[1].pk],
+        )
+        self.assertEqual(len(self.positions(self.event)), 3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def test_list(self):
+        self.authenticate(self.client, self.users[3])
+
+        with self.assertQueryBudget(1):
+            response = self.client.get("/api/registrations/waitlist/")
+
+        self.assertEqual(
+            [(entry["event"], entry["position"]) for entry in response.data],
+            [(self.event.id, 3), (self.other_event.id, 3)],
+        )
+
+    def test_cost(self):
+        # Each place reads only the index entries ahead of it.
+        WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(user=user, event=self.other_event)
+            for user in User.objects.bulk_create(
+                User(email=f"queued{i}@example.com", username=f"queued{i}")
+                for i in range(500)
+            )
+        )
+        entry = WaitlistEntry.objects.get(user=self.users[3], event=self.other_event)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE event_registrations_waitlistentry")
+        queryset = services.with_waitlist_position(
+            WaitlistEntry.objects.filter(pk=entry.pk)
+        )
+
+        plan = json.loads(queryset.explain(format="json", analyze=True))
+
+        scans = list(find_nodes(plan, "Index Name", "waitlist_event_position_idx"))
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(scans[0]["Actual Rows"], 2)
+        self.assertFalse(list(find_nodes(plan, "Node Type", "Seq Scan")))
+        self.assertEqual(queryset.get().position, 3)
+
+
+def find_nodes(plan, key, value):
+    if isinstance(plan, dict):
+        if plan.get(key) == value:
+            yield plan
+        plan = list(plan.values())
+    if isinstance(plan, list):
+        for item in plan:
+            yield from find_nodes(item, key, value)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class RegistrationExportTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.other = User.objects.create(
+            email="other@example.com", username="other", role=Role.ORGANIZER
+        )
+        cls.event = Event.objects.create(
+            title="Event",
+            event_date=timezone.now(),
+            location="Main hall",
+            organizer="Organizer",
+            author=cls.organizer,
+        )
+        cls.attendees = User.objects.bulk_create(
+            User(email=f"user{i}@example.com", username=f"user{i}") for i in range(5)
+        )
+        EventRegistration.objects.bulk_create(
+            EventRegistration(user=user, event=cls.event) for user in cls.attendees
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = f"/api/events/{self.event.id}/registrations/export"
+
+    def test_ndjson(self):
+        self.authenticate(self.client, self.organizer)
+        with self.assertQueryBudget(2):
+            response = self.client.get(f"{self.url}.ndjson")
+            content = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Disposition"],
+            f'attachment; filename="event-{self.event.id}-registrations.ndjson"',
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [(row["user_id"], row["email"]) for row in rows],
+            [(str(user.pk), user.email) for user in self.attendees],
+        )
+        self.assertEqual(list(rows[0]), ["id", "user_id", "email", "username", "phone"])
+
+    def test_csv(self):
+        self.authenticate(self.client, self.organizer)
+        response = self.client.get(f"{self.url}.csv")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,user_id,email,username,phone")
+        self.assertEqual(len(lines), len(self.attendees) + 1)
+
+    def test_only_author(self):
+        self.authenticate(self.client, self.other)
+        response = self.client.get(f"{self.url}.csv")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            response.json(),
+            {"detail": "You do not have permission to export this event."},
+        )
+
+        self.authenticate(self.client, self.attendees[0])
+        self.assertEqual(self.client.get(f"{self.url}.csv").status_code, 403)
+
+        self.authenticate(self.client, self.organizer)
+        missing = f"/api/events/{self.event.id + 1}/registrations/export.csv"
+        response = self.client.get(missing)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"detail": "Event not found."})
+        response = self.client.get(f"{self.url}.xlsx")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"detail": "Unknown export format."})
@@ -2,7 +2,11 @@ from django.urls import path
 from .views import (
     RegistrationListView,
     RegistrationCreateView,
+    RegistrationBulkCreateView,
     RegistrationDeleteView,
+    RegistrationExportView,
+    WaitlistListView,
+    WaitlistDeleteView,
 )
 
 urlpatterns = [
@@ -12,9 +16,25 @@ urlpatterns = [
         RegistrationCreateView.as_view(),
         name="registration-create",
     ),
+    path(
+        "registrations/create/bulk/",
+        RegistrationBulkCreateView.as_view(),
+        name="registration-bulk-create",
+    ),
     path(
         "registrations/<int:registration_id>/",
         RegistrationDeleteView.as_view(),
         name="registration-delete",
     ),
+    path(
+        "events/<int:event_id>/registrations/export.<str:export_format>",
+        RegistrationExportView.as_view(),
+        name="registration-export",
+    ),
+    path("registrations/waitlist/", WaitlistListView.as_view(), name="waitlist-list"),
+    path(
+        "registrations/waitlist/<int:entry_id>/",
+        WaitlistDeleteView.as_view(),
+        name="waitlist-delete",
+    ),
 ]
@@ -1,27 +1,91 @@
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import EventRegistration
+from . import services
+from .models import EventRegistration, WaitlistEntry
+from .pagination import RegistrationPagination
 from .serializers import (
     EventRegistrationResponseSerializer,
+    ExpandedEventRegistrationResponseSerializer,
+    RegistrationFilterSerializer,
     CreateEventRegistrationSerializer,
+    BulkEventRegistrationSerializer,
+    BulkEventRegistrationResponseSerializer,
+    WaitlistEntryResponseSerializer,
 )
 from events.models import Event
+from django.db.models import F
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiResponse
+from config.async_views import AsyncAPIView
+from config.export import (
+    EXPORT_FORMATS,
+    IgnoreClientContentNegotiation,
+    batches,
+    export_response,
+)
+from events.permissions import IsOrganizer
+
+REGISTRATION_EXPORT_FIELDS = ("id", "user_id", "email", "username", "phone")
+
+
+def get_registration_filters(query_params):
+    serializer = RegistrationFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def get_registration_serializer_class(filters):
+    if filters.get("expand") == "event":
+        return ExpandedEventRegistrationResponseSerializer
+    return EventRegistrationResponseSerializer
+
+
+def get_registration_queryset(user_id, filters):
+    queryset = EventRegistration.objects.filter(user_id=user_id).select_related(
+        "event"
+    )
+    if filters.get("expand") == "event":
+        queryset = queryset.defer("event__search_vector")
+    else:
+        queryset = queryset.only("id", "event_id", "event__title")
+
+    when = filters.get("when")
+    if when == "upcoming":
+        queryset = queryset.filter(event__event_date__gte=timezone.now())
+    elif when == "past":
+        queryset = queryset.filter(event__event_date__lt=timezone.now())
+    return queryset
 
 
 class RegistrationListView(generics.ListAPIView):
     serializer_class = EventRegistrationResponseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    read_replica = True
+    pagination_class = RegistrationPagination
+
+    def get_filters(self):
+        if not hasattr(self, "_filters"):
+            self._filters = get_registration_filters(self.request.query_params)
+        return self._filters
+
+    def get_serializer_class(self):
+        return get_registration_serializer_class(self.get_filters())
 
     def get_queryset(self):
-        return EventRegistration.objects.filter(user=self.request.user)
+        return get_registration_queryset(self.request.user.pk, self.get_filters())
 
     @extend_schema(
+        parameters=[RegistrationFilterSerializer],
         tags=["Event Registrations"],
         summary="Get registrations",
-        description="Returns a list of event registrations associated with the authenticated user.",
+        description=(
+            "Returns a page of event registrations associated with the authenticated "
+            "user, newest first. Use the `next` and `previous` links to move between "
+            "pages."
+        ),
         operation_id="list_event_registrations",
         responses={
             200: EventRegistrationResponseSerializer(many=True),
@@ -34,43 +98,182 @@ class RegistrationListView(generics.ListAPIView):
         return self.list(request, *args, **kwargs)
 
 
+class AsyncRegistrationListView(AsyncAPIView):
+    """``RegistrationListView`` on the async ORM, routed under ASGI."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    read_replica = True
+
+    async def get(self, request):
+        filters = get_registration_filters(request.query_params)
+        paginator = RegistrationPagination()
+        registrations = await paginator.apaginate_queryset(
+            get_registration_queryset(request.user.pk, filters), request
+        )
+        serializer_class = get_registration_serializer_class(filters)
+        return paginator.get_paginated_response(
+            serializer_class(registrations, many=True).data
+        )
+
+
+class RegistrationExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    read_replica = True
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    @extend_schema(
+        tags=["Event Registrations"],
+        summary="Export event attendees",
+        description=(
+            "Streams the registrations of an event with each attendee's id, "
+            "email, username and phone as `ndjson` (one JSON object per line) "
+            "or `csv`, in registration order. Gzipped when the request sends "
+            "`Accept-Encoding: gzip`. Only the event's author can export it."
+        ),
+        operation_id="export_event_registrations",
+        responses={
+            200: OpenApiResponse(description="NDJSON or CSV stream of attendees."),
+            403: OpenApiResponse(description="Permission denied."),
+            404: OpenApiResponse(description="Event or export format not found."),
+        },
+    )
+    def get(self, request, event_id, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound("Unknown export format.")
+        author_id = (
+            Event.objects.filter(id=event_id)
+            .values_list("author_id", flat=True)
+            .first()
+        )
+        if author_id is None:
+            raise NotFound("Event not found.")
+        if author_id != request.user.pk:
+            raise PermissionDenied("You do not have permission to export this event.")
+        rows = (
+            EventRegistration.objects.filter(event_id=event_id)
+            .order_by("id")
+            .values(
+                "id",
+                "user_id",
+                email=F("user__email"),
+                username=F("user__username"),
+                phone=F("user__phone"),
+            )
+        )
+        return export_response(
+            request,
+            export_format,
+            REGISTRATION_EXPORT_FIELDS,
+            batches(rows),
+            f"event-{event_id}-registrations",
+        )
+
+
 class RegistrationCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @extend_schema(
         tags=["Event Registrations"],
         summary="Create new registration",
-        description="Registers the authenticated user for a specific event. Prevents duplicate registrations.",
+        description=(
+            "Registers the authenticated user for a specific event. Prevents duplicate "
+            "registrations. When the event is fully booked the user is put on its "
+            "waitlist instead and promoted automatically once a seat frees up."
+        ),
         operation_id="create_event_registration",
         request=CreateEventRegistrationSerializer,
         responses={
             201: EventRegistrationResponseSerializer,
             400: OpenApiResponse(
-                description="User is already registered for this event or invalid data."
+                description="User is already registered or waitlisted for this event, or invalid data."
             ),
             401: OpenApiResponse(
                 description="Authentication credentials were not provided or are invalid."
             ),
-            404: OpenApiResponse(description="Event not found."),
+            202: OpenApiResponse(
+                response=WaitlistEntryResponseSerializer,
+                description="The event is fully booked, the user was put on its waitlist.",
+            ),
         },
     )
     def post(self, request):
         serializer = CreateEventRegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        event = get_object_or_404(Event, id=serializer.validated_data["event"].id)
-
-        if EventRegistration.objects.filter(user=request.user, event=event).exists():
+        try:
+            registration = services.register(
+                request.user.pk, serializer.validated_data["event"]
+            )
+        except services.AlreadyRegistered:
             return Response(
                 {"detail": "You are already registered for this event."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        registration = EventRegistration.objects.create(user=request.user, event=event)
+        except services.AlreadyWaitlisted:
+            return Response(
+                {"detail": "You are already on the waitlist for this event."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if isinstance(registration, WaitlistEntry):
+            return self.waitlisted(registration)
 
         response_serializer = EventRegistrationResponseSerializer(registration)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+    def waitlisted(self, entry):
+        entry = services.with_waitlist_position(
+            WaitlistEntry.objects.select_related("event").filter(pk=entry.pk)
+        ).get()
+        response_serializer = WaitlistEntryResponseSerializer(entry)
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class RegistrationBulkCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Event Registrations"],
+        summary="Register for several events",
+        description=(
+            "Registers the authenticated user for every event in the list. Events "
+            "the user is already registered for are skipped, fully booked events "
+            "put the user on their waitlist and unknown event IDs are reported back."
+        ),
+        operation_id="bulk_create_event_registrations",
+        request=BulkEventRegistrationSerializer,
+        responses={
+            201: BulkEventRegistrationResponseSerializer,
+            200: OpenApiResponse(
+                response=BulkEventRegistrationResponseSerializer,
+                description="Nothing new to register.",
+            ),
+            400: OpenApiResponse(description="Invalid data."),
+            401: OpenApiResponse(
+                description="Authentication credentials were not provided or are invalid."
+            ),
+        },
+    )
+    def post(self, request):
+        serializer = BulkEventRegistrationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event_ids = list(dict.fromkeys(serializer.validated_data["events"]))
+
+        found = set(Event.objects.filter(id__in=event_ids).values_list("id", flat=True))
+        registered, already_registered, waitlisted = services.register_many(
+            request.user.pk, [event_id for event_id in event_ids if event_id in found]
+        )
+        return Response(
+            {
+                "registered": registered,
+                "already_registered": already_registered,
+                "waitlisted": waitlisted,
+                "not_found": [
+                    event_id for event_id in event_ids if event_id not in found
+                ],
+            },
+            status=status.HTTP_201_CREATED if registered else status.HTTP_200_OK,
+        )
+
 
 class RegistrationDeleteView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -78,7 +281,10 @@ class RegistrationDeleteView(APIView):
     @extend_schema(
         tags=["Event Registrations"],
         summary="Delete registration",
-        description="Deletes an existing event registration if it belongs to the authenticated user.",
+        description=(
+            "Deletes an existing event registration if it belongs to the authenticated "
+            "user. The freed seat goes to the first user on the event's waitlist."
+        ),
         operation_id="delete_event_registration",
         responses={
             204: OpenApiResponse(description="Registration deleted successfully."),
@@ -92,13 +298,71 @@ class RegistrationDeleteView(APIView):
         },
     )
     def delete(self, request, registration_id):
-        registration = get_object_or_404(
-            EventRegistration, id=registration_id
-        )
-        if registration.user != request.user:
+        registration = get_object_or_404(EventRegistration, id=registration_id)
+        if registration.user_id != request.user.pk:
             return Response(
                 {"detail": "You do not have permission to delete this registration."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        registration.delete()
+        services.unregister(registration)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class WaitlistListView(generics.ListAPIView):
+    serializer_class = WaitlistEntryResponseSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return services.with_waitlist_position(
+            WaitlistEntry.objects.filter(user_id=self.request.user.pk)
+            .select_related("event")
+            .order_by("id")
+        )
+
+    @extend_schema(
+        tags=["Event Registrations"],
+        summary="Get waitlist entries",
+        description=(
+            "Returns the waitlists the authenticated user is on, with their current "
+            "position in each queue."
+        ),
+        operation_id="list_waitlist_entries",
+        responses={
+            200: WaitlistEntryResponseSerializer(many=True),
+            401: OpenApiResponse(
+                description="Authentication credentials were not provided or are invalid."
+            ),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class WaitlistDeleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=["Event Registrations"],
+        summary="Leave waitlist",
+        description="Removes the authenticated user from an event's waitlist.",
+        operation_id="delete_waitlist_entry",
+        responses={
+            204: OpenApiResponse(description="Waitlist entry deleted successfully."),
+            403: OpenApiResponse(
+                description="Permission denied. You cannot delete someone else's waitlist entry."
+            ),
+            404: OpenApiResponse(description="Waitlist entry not found."),
+            401: OpenApiResponse(
+                description="Authentication credentials were not provided or are invalid."
+            ),
+        },
+    )
+    def delete(self, request, entry_id):
+        entry = get_object_or_404(WaitlistEntry, id=entry_id)
+        if entry.user_id != request.user.pk:
+            return Response(
+                {"detail": "You do not have permission to delete this waitlist entry."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        entry.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,120 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from config import replicas
+
+LIST_VERSION_KEY = "events:list:version"
+HITS_KEY = "events:cache:hits"
+MISSES_KEY = "events:cache:misses"
+
+
+def get_cache():
+    return caches[settings.EVENTS_CACHE_ALIAS]
+
+
+def list_key(request):
+    """
+    Key for a rendered list page.
+
+    List pages are versioned rather than deleted one by one: any write bumps
+    ``LIST_VERSION_KEY`` and every previously cached page becomes unreachable.
+    """
+    version = get_cache().get_or_set(LIST_VERSION_KEY, 1, timeout=None)
+    return f"events:list:{version}:{_list_digest(request)}"
+
+
+async def alist_key(request):
+    version = await get_cache().aget_or_set(LIST_VERSION_KEY, 1, timeout=None)
+    return f"events:list:{version}:{_list_digest(request)}"
+
+
+def detail_key(event_id):
+    return f"events:detail:{event_id}"
+
+
+def fetch(key):
+    # Users pinned to the primary skip the cache: an entry filled from a
+    # lagging replica could predate their own write. Their response then
+    # replaces that entry.
+    data = None if replicas.is_pinned() else get_cache().get(key)
+    _incr(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+async def afetch(key):
+    data = None if replicas.is_pinned() else await get_cache().aget(key)
+    await _aincr(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def store(key, data):
+    get_cache().set(key, data, timeout=settings.EVENTS_CACHE_TIMEOUT)
+
+
+async def astore(key, data):
+    await get_cache().aset(key, data, timeout=settings.EVENTS_CACHE_TIMEOUT)
+
+
+def invalidate_list():
+    transaction.on_commit(_bump_list_version)
+
+
+def invalidate_events(event_ids):
+    keys = [detail_key(event_id) for event_id in event_ids]
+
+    def invalidate():
+        get_cache().delete_many(keys)
+        _bump_list_version()
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_seats(event_ids):
+    """
+    Drop the cached details of events whose registration count changed.
+
+    List pages keep the old counts until they expire: bumping the list
+    version on every registration would empty the list cache under load.
+    """
+    keys = [detail_key(event_id) for event_id in event_ids]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def stats():
+    counters = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def _list_digest(request):
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return hashlib.sha1(f"{request.get_host()}?{params}".encode()).hexdigest()
+
+
+def _bump_list_version():
+    _incr(LIST_VERSION_KEY)
+
+
+def _incr(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None) or cache.incr(key)
+
+
+async def _aincr(key):
+    cache = get_cache()
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, timeout=None) or await cache.aincr(key)
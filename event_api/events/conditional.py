@@ -0,0 +1,47 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def compute_validators(rows):
+    """
+    Build a strong ETag and a Last-Modified timestamp from ``(id, updated_at)``
+    pairs, so a representation can be validated without serializing it.
+    """
+    digest = hashlib.sha1()
+    last_modified = None
+    for event_id, updated_at in rows:
+        digest.update(f"{event_id}:{updated_at.isoformat()};".encode())
+        timestamp = int(updated_at.timestamp())
+        if last_modified is None or timestamp > last_modified:
+            last_modified = timestamp
+    return f'"{digest.hexdigest()}"', last_modified
+
+
+def compute_etag(rows):
+    """
+    ETag alone, for lists. An event leaving a list, deleted or moved to
+    another page, changes its rows but not their latest ``updated_at``, so a
+    Last-Modified would validate a stale copy.
+    """
+    etag, _ = compute_validators(rows)
+    return etag
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` preconditions, returning a
+    304 (or 412) response when they apply and ``None`` otherwise.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
@@ -0,0 +1,35 @@
+from django.contrib.postgres.search import SearchQuery
+
+from .serializers import EventFilterSerializer
+
+# Query parameter -> ORM lookup. Every lookup is served by an index on Event.
+EVENT_FILTER_LOOKUPS = {
+    "date_from": "event_date__gte",
+    "date_to": "event_date__lte",
+    "location": "location",
+    "location_prefix": "location__startswith",
+    "organizer": "organizer",
+    "organizer_prefix": "organizer__startswith",
+    "author": "author_id",
+}
+
+
+def filter_events(queryset, query_params):
+    serializer = EventFilterSerializer(data=query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    queryset = queryset.filter(
+        **{
+            EVENT_FILTER_LOOKUPS[name]: value
+            for name, value in params.items()
+            if name in EVENT_FILTER_LOOKUPS
+        }
+    )
+    if params.get("q"):
+        queryset = queryset.filter(
+            search_vector=SearchQuery(
+                params["q"], config="pg_catalog.english", search_type="websearch"
+            )
+        )
+    return queryset
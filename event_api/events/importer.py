@@ -0,0 +1,490 @@
+"""
+Bulk import of events from CSV or NDJSON files.
+
+Rows are streamed into a temporary staging table with ``COPY``, checked
+there in a few set-based statements, and the valid ones are merged into
+``events_event``, updating the author's events with the same
+``external_id``. Only one chunk of the file is held in memory at a time.
+"""
+
+import codecs
+import csv
+import io
+import json
+from itertools import islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from event_registrations.services import fill_free_seats
+
+from . import cache as event_cache
+from .models import Event
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+IMPORT_COLUMNS = (
+    "external_id",
+    "title",
+    "description",
+    "event_date",
+    "location",
+    "organizer",
+    "capacity",
+)
+REQUIRED_COLUMNS = {"external_id", "title", "event_date", "location", "organizer"}
+MAX_LENGTHS = {
+    field.name: field.max_length
+    for field in Event._meta.get_fields()
+    if field.name in IMPORT_COLUMNS and getattr(field, "max_length", None)
+}
+MAX_CAPACITY = 2147483647
+
+MESSAGES = {
+    "required": "This field is required.",
+    "max_length": "Ensure this field has no more than {} characters.",
+    "datetime": (
+        "Datetime has wrong format. Use one of these formats instead: "
+        "YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z]."
+    ),
+    "integer": "A valid integer is required.",
+    "min_value": "Ensure this value is greater than or equal to 0.",
+    "max_value": f"Ensure this value is less than or equal to {MAX_CAPACITY}.",
+    "below_registrations": (
+        "Capacity cannot be lower than the number of registered attendees."
+    ),
+    "repeated": "Repeated in a later row, which replaces this one.",
+    "nested": "Not a valid string.",
+}
+
+
+class ImportFormatError(Exception):
+    """The file cannot be read at all, e.g. required columns are missing."""
+
+
+class RowErrors:
+    """Rejected rows as ``(line, errors)``, keeping only the first ones."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self.items = []
+
+    def add(self, line, errors):
+        self.count += 1
+        if len(self.items) < self.limit:
+            self.items.append((line, errors))
+
+
+def csv_records(lines):
+    """``(line number, row)`` of a UTF-8 CSV file."""
+    reader = csv.reader(codecs.iterdecode(lines, "utf-8-sig"))
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except UnicodeDecodeError:
+        raise ImportFormatError(f"Line {reader.line_num + 1} is not valid UTF-8.")
+    except csv.Error as exc:
+        raise ImportFormatError(f"Line {reader.line_num}: {exc}.")
+
+
+def parse_csv(lines, errors):
+    """
+    ``(columns, rows)`` of a CSV file with a header row. Columns are matched
+    by name, in any order; unknown ones are ignored.
+    """
+    records = csv_records(lines)
+    _, header = next(records, (0, []))
+    header = [name.strip().lower() for name in header]
+    missing = REQUIRED_COLUMNS.difference(header)
+    if missing:
+        raise ImportFormatError(f"Missing columns: {', '.join(sorted(missing))}.")
+    columns = [name for name in IMPORT_COLUMNS if name in header]
+    pick = itemgetter(*(header.index(name) for name in columns))
+    width = len(header)
+
+    def rows():
+        for line, row in records:
+            if len(row) == width:
+                yield (line, *pick(row))
+            elif row:
+                message = f"Expected {width} columns, found {len(row)}."
+                errors.add(line, {"non_field_errors": [message]})
+
+    return columns, rows()
+
+
+def parse_ndjson(lines, errors):
+    """``(columns, rows)`` of a file with one JSON object per line."""
+    loads = json.loads if orjson is None else orjson.loads
+
+    def rows():
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                item = loads(line)
+            except ValueError:
+                errors.add(line_number, {"non_field_errors": ["Invalid JSON."]})
+                continue
+            if not isinstance(item, dict):
+                errors.add(
+                    line_number, {"non_field_errors": ["Expected a JSON object."]}
+                )
+                continue
+            values = [item.get(name) for name in IMPORT_COLUMNS]
+            nested = {
+                name: [MESSAGES["nested"]]
+                for name, value in zip(IMPORT_COLUMNS, values)
+                if isinstance(value, (dict, list))
+            }
+            if nested:
+                errors.add(line_number, nested)
+                continue
+            yield (line_number, *values)
+
+    return IMPORT_COLUMNS, rows()
+
+
+IMPORT_FORMATS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+def import_events(lines, import_format, author_id):
+    """
+    Import events for ``author_id`` from ``lines``, an iterable of the
+    file's lines as bytes, in ``import_format``.
+
+    Returns the number of events created and updated, the number of
+    rejected rows and the errors of the first ``EVENTS_IMPORT_MAX_ERRORS``
+    of them, by line number. Rejected rows do not stop the others from
+    being imported.
+    """
+    errors = RowErrors(settings.EVENTS_IMPORT_MAX_ERRORS)
+    columns, rows = IMPORT_FORMATS[import_format](lines, errors)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING_TABLE)
+            copy_rows(cursor, columns, rows)
+            cursor.execute(LOCK_AUTHOR, [str(author_id)])
+            cursor.execute(LOCK_EVENTS, {"author_id": author_id})
+            cursor.execute(CHECK_ROWS, check_params(author_id))
+            cursor.execute(CREATE_UPDATED_TABLE)
+            cursor.execute(UPDATE_ROWS)
+            cursor.execute(INSERT_ROWS, {"author_id": author_id})
+            cursor.execute(COUNT_ROWS)
+            imported, updated, rejected = cursor.fetchone()
+            cursor.execute(ROW_ERRORS, {"limit": errors.limit})
+            rejected_rows = [
+                (line, field_errors(json.loads(row))) for line, row in cursor.fetchall()
+            ]
+            waitlisted_ids = []
+            if updated:
+                cursor.execute(WAITLISTED_IDS)
+                waitlisted_ids = [row[0] for row in cursor.fetchall()]
+        if updated:
+            invalidate_updated()
+        if imported:
+            event_cache.invalidate_list()
+    # Seats freed by a higher or removed capacity go to the waitlist, one
+    # event per transaction like EventUpdateView.
+    for event_id in waitlisted_ids:
+        fill_free_seats(event_id)
+
+    first_errors = sorted(errors.items + rejected_rows, key=itemgetter(0))
+    return {
+        "created": imported - updated,
+        "updated": updated,
+        "failed": errors.count + rejected,
+        "errors": [
+            {"line": line, "errors": row_errors}
+            for line, row_errors in first_errors[: errors.limit]
+        ],
+    }
+
+
+def copy_rows(cursor, columns, rows):
+    """``COPY`` ``rows`` into the staging table, a chunk at a time."""
+    sql = f"COPY events_import (line, {', '.join(columns)}) FROM STDIN (FORMAT csv)"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    chunk_size = settings.EVENTS_IMPORT_CHUNK_SIZE
+    with cursor.copy(sql) as copy:
+        while chunk := list(islice(rows, chunk_size)):
+            writer.writerows(chunk)
+            copy.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+
+def field_errors(messages):
+    """``{"field": "message"}`` from ``CHECK_ROWS`` as DRF-style errors."""
+    return {name: [messages[name]] for name in IMPORT_COLUMNS if name in messages}
+
+
+def check_params(author_id):
+    params = {
+        "author_id": author_id,
+        "max_capacity": MAX_CAPACITY,
+        **MESSAGES,
+    }
+    for name, max_length in MAX_LENGTHS.items():
+        params[f"{name}_max_length"] = max_length
+        params[f"{name}_too_long"] = MESSAGES["max_length"].format(max_length)
+    return params
+
+
+def invalidate_updated():
+    """Drop the cached details of updated events, a chunk at a time."""
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(UPDATED_IDS)
+        while event_ids := [row[0] for row in cursor.fetchmany(10000)]:
+            event_cache.invalidate_events(event_ids)
+
+
+CREATE_STAGING_TABLE = """
+CREATE TEMPORARY TABLE events_import (
+    line bigint NOT NULL,
+    external_id text,
+    title text,
+    description text,
+    event_date text,
+    location text,
+    organizer text,
+    capacity text
+) ON COMMIT DROP
+"""
+
+# Every staged row with its typed values, the id of the author's event with
+# the same external_id, and its errors as {"field": "message"}, NULL when it
+# is valid. Each field reports its first failing check, like DRF. Dates must
+# start like ISO 8601 ones, so that words PostgreSQL takes as timestamps,
+# such as "now" or "tomorrow", are rejected.
+CHECK_ROWS = """
+CREATE TEMPORARY TABLE events_import_checked ON COMMIT DROP AS
+SELECT
+    line,
+    external_id,
+    title,
+    description,
+    event_date,
+    location,
+    organizer,
+    capacity,
+    existing_id,
+    existing_event_date,
+    CASE WHEN coalesce(
+        external_id_error,
+        title_error,
+        description_error,
+        event_date_error,
+        location_error,
+        organizer_error,
+        capacity_error
+    ) IS NOT NULL THEN jsonb_strip_nulls(jsonb_build_object(
+        'external_id', external_id_error,
+        'title', title_error,
+        'description', description_error,
+        'event_date', event_date_error,
+        'location', location_error,
+        'organizer', organizer_error,
+        'capacity', capacity_error
+    )) END AS errors
+FROM (
+    SELECT
+        *,
+        CASE
+            WHEN external_id IS NULL THEN %(required)s
+            WHEN length(external_id) > %(external_id_max_length)s
+                THEN %(external_id_too_long)s
+            WHEN line < max(line) OVER (PARTITION BY external_id)
+                THEN %(repeated)s
+        END AS external_id_error,
+        CASE
+            WHEN title IS NULL THEN %(required)s
+            WHEN length(title) > %(title_max_length)s THEN %(title_too_long)s
+        END AS title_error,
+        CASE
+            WHEN length(description) > %(description_max_length)s
+                THEN %(description_too_long)s
+        END AS description_error,
+        CASE
+            WHEN raw_event_date IS NULL THEN %(required)s
+            WHEN event_date IS NULL THEN %(datetime)s
+        END AS event_date_error,
+        CASE
+            WHEN location IS NULL THEN %(required)s
+            WHEN length(location) > %(location_max_length)s
+                THEN %(location_too_long)s
+        END AS location_error,
+        CASE
+            WHEN organizer IS NULL THEN %(required)s
+            WHEN length(organizer) > %(organizer_max_length)s
+                THEN %(organizer_too_long)s
+        END AS organizer_error,
+        CASE
+            WHEN raw_capacity IS NULL THEN NULL
+            WHEN capacity IS NOT NULL THEN CASE
+                WHEN capacity < registration_count THEN %(below_registrations)s
+            END
+            WHEN raw_capacity ~ '^-[0-9]+$' THEN %(min_value)s
+            WHEN raw_capacity ~ '^[0-9]+$' THEN %(max_value)s
+            ELSE %(integer)s
+        END AS capacity_error
+    FROM (
+        SELECT
+            staged.line,
+            staged.external_id,
+            staged.title,
+            staged.description,
+            staged.event_date AS raw_event_date,
+            CASE
+                WHEN staged.event_date LIKE '____-__-__T__:__%%'
+                    OR staged.event_date LIKE '____-__-__ __:__%%'
+                THEN events_import_timestamptz(staged.event_date)
+            END AS event_date,
+            staged.location,
+            staged.organizer,
+            staged.capacity AS raw_capacity,
+            CASE WHEN staged.capacity ~ '^[0-9]{1,10}$' THEN
+                CASE WHEN staged.capacity::bigint <= %(max_capacity)s
+                    THEN staged.capacity::integer
+                END
+            END AS capacity,
+            event.id AS existing_id,
+            event.event_date AS existing_event_date,
+            event.registration_count
+        FROM (
+            SELECT
+                line,
+                nullif(btrim(external_id, E' \\t\\r\\n'), '') AS external_id,
+                nullif(btrim(title, E' \\t\\r\\n'), '') AS title,
+                nullif(btrim(description, E' \\t\\r\\n'), '') AS description,
+                nullif(btrim(event_date, E' \\t\\r\\n'), '') AS event_date,
+                nullif(btrim(location, E' \\t\\r\\n'), '') AS location,
+                nullif(btrim(organizer, E' \\t\\r\\n'), '') AS organizer,
+                nullif(btrim(capacity, E' \\t\\r\\n'), '') AS capacity
+            FROM events_import
+        ) AS staged
+        LEFT JOIN events_event AS event
+            ON event.author_id = %(author_id)s
+            AND event.external_id = staged.external_id
+    ) AS typed
+) AS checked
+"""
+
+CREATE_UPDATED_TABLE = """
+CREATE TEMPORARY TABLE events_import_updated (id integer NOT NULL) ON COMMIT DROP
+"""
+
+# events_event is partitioned by event_date, which a unique index must
+# include, so staged rows are matched to the author's events by CHECK_ROWS,
+# under the author's import lock, instead of ON CONFLICT. Matching on the
+# current event_date as well lets each update look in a single partition.
+# The updated events are recorded, to count them and refill their seats.
+UPDATE_ROWS = """
+WITH updated AS (
+UPDATE events_event AS event SET
+    title = checked.title,
+    description = checked.description,
+    event_date = checked.event_date,
+    location = checked.location,
+    organizer = checked.organizer,
+    capacity = checked.capacity,
+    updated_at = now()
+FROM events_import_checked AS checked
+WHERE checked.errors IS NULL
+    AND event.id = checked.existing_id
+    AND event.event_date = checked.existing_event_date
+RETURNING event.id
+)
+INSERT INTO events_import_updated SELECT id FROM updated
+"""
+
+INSERT_ROWS = """
+INSERT INTO events_event (
+    author_id,
+    external_id,
+    title,
+    description,
+    event_date,
+    location,
+    organizer,
+    capacity,
+    registration_count,
+    updated_at
+)
+SELECT
+    %(author_id)s,
+    external_id,
+    title,
+    description,
+    event_date,
+    location,
+    organizer,
+    capacity,
+    0,
+    now()
+FROM events_import_checked
+WHERE errors IS NULL AND existing_id IS NULL
+ORDER BY line
+"""
+
+# Imports of an author's events run one at a time, so that two imports of
+# the same file cannot both create its events.
+LOCK_AUTHOR = """
+SELECT pg_advisory_xact_lock(hashtextextended('events.importer:' || %s, 0))
+"""
+
+# Lock the author's events named in the file, in id order, before CHECK_ROWS
+# reads them: a date, capacity or registration count changed between the
+# check and the update would otherwise make the update skip the row or
+# break the capacity constraint.
+LOCK_EVENTS = """
+SELECT count(*) FROM (
+    SELECT event.id
+    FROM events_event AS event
+    WHERE event.author_id = %(author_id)s
+        AND event.external_id IN (
+            SELECT btrim(external_id, E' \\t\\r\\n') FROM events_import
+        )
+    ORDER BY event.id
+    FOR NO KEY UPDATE
+) AS locked
+"""
+
+COUNT_ROWS = """
+SELECT
+    count(*) FILTER (WHERE errors IS NULL),
+    (SELECT count(*) FROM events_import_updated),
+    count(*) FILTER (WHERE errors IS NOT NULL)
+FROM events_import_checked
+"""
+
+ROW_ERRORS = """
+SELECT line, errors
+FROM events_import_checked
+WHERE errors IS NOT NULL
+ORDER BY line
+LIMIT %(limit)s
+"""
+
+UPDATED_IDS = """
+SELECT id FROM events_import_updated
+"""
+
+# Updated events with free seats and users waiting for them.
+WAITLISTED_IDS = """
+SELECT event.id
+FROM events_import_updated AS updated
+JOIN events_event AS event ON event.id = updated.id
+WHERE (event.capacity IS NULL OR event.registration_count < event.capacity)
+    AND EXISTS (
+        SELECT FROM event_registrations_waitlistentry AS entry
+        WHERE entry.event_id = event.id
+    )
+ORDER BY event.id
+"""
@@ -0,0 +1,65 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importer import IMPORT_FORMATS, ImportFormatError, import_events
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import events from a CSV or NDJSON file for an author, creating new "
+        "events and updating the author's events with the same external_id. "
+        "Rows with errors are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument(
+            "--author", required=True, help="Email of the events' author."
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(IMPORT_FORMATS),
+            help="File format; defaults to the file extension.",
+        )
+
+    def handle(self, *args, path, author, format, **options):
+        import_format = format or Path(path).suffix.lstrip(".").lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("Pass --format for files without a known extension.")
+        author_id = (
+            User.objects.filter(email=author).values_list("id", flat=True).first()
+        )
+        if author_id is None:
+            raise CommandError(f"No user with email {author}.")
+
+        started = time.perf_counter()
+        try:
+            if path == "-":
+                result = import_events(sys.stdin.buffer, import_format, author_id)
+            else:
+                with open(path, "rb") as lines:
+                    result = import_events(lines, import_format, author_id)
+        except ImportFormatError as exc:
+            raise CommandError(f"Cannot import {path}: {exc}")
+        elapsed = time.perf_counter() - started
+
+        for error in result["errors"]:
+            messages = "; ".join(
+                f"{field}: {' '.join(field_messages)}"
+                for field, field_messages in error["errors"].items()
+            )
+            self.stderr.write(f"Line {error['line']}: {messages}")
+        if result["failed"] > len(result["errors"]):
+            self.stderr.write(
+                f"... and {result['failed'] - len(result['errors'])} more rejected rows."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result['created']}, updated {result['updated']} and "
+                f"rejected {result['failed']} event(s) in {elapsed:.1f}s."
+            )
+        )
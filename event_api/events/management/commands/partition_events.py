@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from events.partitions import (
+    add_months,
+    archive_partitions,
+    create_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the events table from the current "
+        "month to --ahead months later, and optionally archive or drop the "
+        "partitions of months more than --archive-older-than months before it. "
+        "Run it at least monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.EVENTS_PARTITION_MONTHS_AHEAD,
+            help="Months after the current one to create partitions for.",
+        )
+        parser.add_argument(
+            "--archive-older-than",
+            type=int,
+            metavar="MONTHS",
+            help=(
+                "Move the partitions of months more than MONTHS before the "
+                f"current one to the {settings.EVENTS_ARCHIVE_SCHEMA} schema."
+            ),
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop archived partitions and their registrations instead.",
+        )
+
+    def handle(self, *args, ahead, archive_older_than, drop, **options):
+        if ahead < 0 or (archive_older_than is not None and archive_older_than < 0):
+            raise CommandError("Pass a number of months of 0 or more.")
+        if drop and archive_older_than is None:
+            raise CommandError("--drop needs --archive-older-than.")
+
+        this_month = month_start(timezone.now())
+        created = create_partitions(this_month, add_months(this_month, ahead))
+        self.stdout.write(
+            f"Created {len(created)} partition(s){': ' if created else '.'}"
+            f"{', '.join(created)}"
+        )
+        if archive_older_than is not None:
+            before = add_months(this_month, -archive_older_than)
+            archived = archive_partitions(before, drop=drop)
+            action = "Dropped" if drop else "Archived"
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{action} {len(archived)} partition(s) of events before "
+                    f"{before:%Y-%m}{': ' if archived else '.'}{', '.join(archived)}"
+                )
+            )
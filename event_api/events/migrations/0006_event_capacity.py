@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_REGISTRATION_COUNT = """
+UPDATE events_event
+SET registration_count = counts.total
+FROM (
+    SELECT event_id, count(*) AS total
+    FROM event_registrations_eventregistration
+    GROUP BY event_id
+) AS counts
+WHERE counts.event_id = events_event.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_updated_at"),
+        ("event_registrations", "0004_unique_user_event_registration"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="capacity",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="registration_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_REGISTRATION_COUNT, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("capacity__isnull", True),
+                    ("registration_count__lte", models.F("capacity")),
+                    _connector="OR",
+                ),
+                name="event_registration_count_within_capacity",
+            ),
+        ),
+    ]
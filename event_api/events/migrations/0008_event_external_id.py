@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Used by events.importer to check staged values: a cast that returns NULL
+# instead of aborting the import on out-of-range dates such as 2025-02-30.
+IMPORT_TIMESTAMPTZ_FUNCTION = """
+CREATE FUNCTION events_import_timestamptz(value text) RETURNS timestamptz
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::timestamptz;
+EXCEPTION WHEN data_exception THEN
+    RETURN NULL;
+END;
+$$;
+"""
+
+DROP_IMPORT_TIMESTAMPTZ_FUNCTION = """
+DROP FUNCTION IF EXISTS events_import_timestamptz(text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_event_registration_count_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="external_id",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="event",
+            constraint=models.UniqueConstraint(
+                fields=("author", "external_id"), name="event_author_external_id_uniq"
+            ),
+        ),
+        migrations.RunSQL(
+            IMPORT_TIMESTAMPTZ_FUNCTION, DROP_IMPORT_TIMESTAMPTZ_FUNCTION
+        ),
+    ]
@@ -0,0 +1,174 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Creates the partition of events_event for the month of ``month``, in UTC,
+# unless it exists, moving that month's events out of the default partition.
+# Returns whether it was created. Used by events.partitions.
+CREATE_PARTITION_FUNCTION = """
+CREATE FUNCTION events_event_create_partition(month date) RETURNS boolean
+LANGUAGE plpgsql AS $$
+DECLARE
+    first_day date := date_trunc('month', month::timestamp);
+    partition_name text := 'events_event_p' || to_char(first_day, 'YYYY_MM');
+    lower_bound timestamptz := first_day::timestamp AT TIME ZONE 'UTC';
+    upper_bound timestamptz :=
+        (first_day + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE events_event INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM events_event_default'
+        ' WHERE event_date >= %L AND event_date < %L RETURNING *)'
+        ' INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE events_event ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    RETURN true;
+END;
+$$;
+"""
+
+EVENT_INDEXES = """
+CREATE INDEX event_date_id_idx ON events_event (event_date, id);
+CREATE INDEX event_registration_count_idx
+    ON events_event (registration_count, id);
+CREATE INDEX event_author_date_id_idx ON events_event (author_id, event_date, id);
+CREATE INDEX event_location_date_id_idx
+    ON events_event (location, event_date, id);
+CREATE INDEX event_location_prefix_idx
+    ON events_event (location varchar_pattern_ops);
+CREATE INDEX event_organizer_date_id_idx
+    ON events_event (organizer, event_date, id);
+CREATE INDEX event_organizer_prefix_idx
+    ON events_event (organizer varchar_pattern_ops);
+CREATE INDEX event_search_vector_idx ON events_event USING gin (search_vector);
+ALTER TABLE events_event
+    ADD CONSTRAINT events_event_author_id_417d5c68_fk_users_user_id
+    FOREIGN KEY (author_id) REFERENCES users_user (id)
+    DEFERRABLE INITIALLY DEFERRED;
+CREATE TRIGGER events_event_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON events_event
+    FOR EACH ROW EXECUTE FUNCTION
+    tsvector_update_trigger(search_vector, 'pg_catalog.english', title, description);
+"""
+
+# events_event becomes a table partitioned by month of event_date, with a
+# default partition for dates without one. A primary key of a partitioned
+# table must include the partition key, so it is (id, event_date), ids come
+# from a sequence and the registration tables no longer have a foreign key
+# to it (see event_registrations 0007). Partitions are created from the
+# earliest event's month to 3 months ahead; the partition_events command
+# keeps creating them.
+PARTITION_EVENTS = (
+    """
+ALTER TABLE events_event RENAME TO events_event_unpartitioned;
+ALTER TABLE events_event_unpartitioned
+    RENAME CONSTRAINT events_event_pkey TO events_event_unpartitioned_pkey;
+ALTER TABLE events_event_unpartitioned
+    DROP CONSTRAINT event_author_external_id_uniq;
+DROP TRIGGER events_event_search_vector_update ON events_event_unpartitioned;
+DROP INDEX
+    event_date_id_idx,
+    event_registration_count_idx,
+    event_author_date_id_idx,
+    event_location_date_id_idx,
+    event_location_prefix_idx,
+    event_organizer_date_id_idx,
+    event_organizer_prefix_idx,
+    event_search_vector_idx;
+
+CREATE TABLE events_event (
+    LIKE events_event_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (event_date);
+CREATE TABLE events_event_default PARTITION OF events_event DEFAULT;
+"""
+    + CREATE_PARTITION_FUNCTION
+    + """
+SELECT events_event_create_partition(month::date)
+FROM generate_series(
+    date_trunc(
+        'month',
+        coalesce(
+            (SELECT min(event_date) FROM events_event_unpartitioned), now()
+        ) AT TIME ZONE 'UTC'
+    ),
+    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+    interval '1 month'
+) AS month;
+
+INSERT INTO events_event SELECT * FROM events_event_unpartitioned;
+DROP TABLE events_event_unpartitioned;
+
+CREATE SEQUENCE events_event_id_seq AS integer OWNED BY events_event.id;
+SELECT setval('events_event_id_seq', coalesce(max(id), 0) + 1, false)
+FROM events_event;
+ALTER TABLE events_event
+    ALTER COLUMN id SET DEFAULT nextval('events_event_id_seq');
+ALTER TABLE events_event
+    ADD CONSTRAINT events_event_pkey PRIMARY KEY (id, event_date);
+CREATE INDEX event_author_external_id_idx
+    ON events_event (author_id, external_id);
+"""
+    + EVENT_INDEXES
+)
+
+# Back to a single table; archived partitions are left where they are.
+UNPARTITION_EVENTS = """
+CREATE TABLE events_event_unpartitioned (
+    LIKE events_event INCLUDING CONSTRAINTS
+);
+INSERT INTO events_event_unpartitioned SELECT * FROM events_event;
+DROP TABLE events_event;
+DROP FUNCTION events_event_create_partition(date);
+ALTER TABLE events_event_unpartitioned RENAME TO events_event;
+
+ALTER TABLE events_event
+    ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(
+    pg_get_serial_sequence('events_event', 'id'), coalesce(max(id), 0) + 1, false
+)
+FROM events_event;
+ALTER TABLE events_event ADD CONSTRAINT events_event_pkey PRIMARY KEY (id);
+ALTER TABLE events_event
+    ADD CONSTRAINT event_author_external_id_uniq UNIQUE (author_id, external_id);
+""" + EVENT_INDEXES
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0008_event_external_id"),
+        ("event_registrations", "0007_event_fk_without_constraint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_EVENTS, UNPARTITION_EVENTS),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name="event",
+                    name="event_author_external_id_uniq",
+                ),
+                migrations.AddIndex(
+                    model_name="event",
+                    index=models.Index(
+                        fields=["author", "external_id"],
+                        name="event_author_external_id_idx",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+from importlib import import_module
+
+from django.db import migrations
+
+partitioning = import_module("events.migrations.0009_partition_by_event_date")
+
+# One row per event id, kept by triggers on events_event. The partitioned
+# table's keys must include event_date, so this table holds what it cannot
+# enforce: the registration tables' foreign keys reference its id (see
+# event_registrations 0008), and it keeps external_id unique per author.
+CREATE_EVENT_IDS = """
+CREATE TABLE events_event_ids (
+    id integer NOT NULL PRIMARY KEY,
+    author_id uuid NOT NULL,
+    external_id varchar(255) NULL,
+    CONSTRAINT event_author_external_id_uniq UNIQUE (author_id, external_id)
+);
+INSERT INTO events_event_ids (id, author_id, external_id)
+SELECT id, author_id, external_id FROM events_event;
+
+CREATE FUNCTION events_event_ids_upsert() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO events_event_ids (id, author_id, external_id)
+    VALUES (NEW.id, NEW.author_id, NEW.external_id)
+    ON CONFLICT (id) DO UPDATE
+    SET author_id = EXCLUDED.author_id, external_id = EXCLUDED.external_id;
+    RETURN NULL;
+END;
+$$;
+
+-- An UPDATE moving an event to another partition runs as a DELETE and an
+-- INSERT, so the id is only removed once no partition has the event.
+CREATE FUNCTION events_event_ids_delete() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM events_event_ids AS ids
+    WHERE ids.id = OLD.id
+        AND NOT EXISTS (SELECT FROM events_event WHERE id = OLD.id);
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION events_event_ids_truncate() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM events_event_ids;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER events_event_ids_upsert
+    AFTER INSERT OR UPDATE OF author_id, external_id ON events_event
+    FOR EACH ROW EXECUTE FUNCTION events_event_ids_upsert();
+CREATE TRIGGER events_event_ids_delete
+    AFTER DELETE ON events_event
+    FOR EACH ROW EXECUTE FUNCTION events_event_ids_delete();
+CREATE TRIGGER events_event_ids_truncate
+    AFTER TRUNCATE ON events_event
+    FOR EACH STATEMENT EXECUTE FUNCTION events_event_ids_truncate();
+
+-- As in 0009, plus the ids of the moved events: the DELETE from the default
+-- partition removes them, and the foreign keys, deferred and NO ACTION,
+-- accept them back before the end of the transaction.
+CREATE OR REPLACE FUNCTION events_event_create_partition(month date)
+RETURNS boolean
+LANGUAGE plpgsql AS $$
+DECLARE
+    first_day date := date_trunc('month', month::timestamp);
+    partition_name text := 'events_event_p' || to_char(first_day, 'YYYY_MM');
+    lower_bound timestamptz := first_day::timestamp AT TIME ZONE 'UTC';
+    upper_bound timestamptz :=
+        (first_day + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE events_event INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM events_event_default'
+        ' WHERE event_date >= %L AND event_date < %L RETURNING *)'
+        ' INSERT INTO %I SELECT * FROM moved',
+        lower_bound, upper_bound, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE events_event ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, lower_bound, upper_bound
+    );
+    EXECUTE format(
+        'INSERT INTO events_event_ids (id, author_id, external_id)'
+        ' SELECT id, author_id, external_id FROM %I',
+        partition_name
+    );
+    RETURN true;
+END;
+$$;
+"""
+
+DROP_EVENT_IDS = """
+DROP TRIGGER events_event_ids_upsert ON events_event;
+DROP TRIGGER events_event_ids_delete ON events_event;
+DROP TRIGGER events_event_ids_truncate ON events_event;
+DROP FUNCTION events_event_ids_upsert();
+DROP FUNCTION events_event_ids_delete();
+DROP FUNCTION events_event_ids_truncate();
+DROP TABLE events_event_ids;
+""" + partitioning.CREATE_PARTITION_FUNCTION.replace(
+    "CREATE FUNCTION", "CREATE OR REPLACE FUNCTION"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0009_partition_by_event_date"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_EVENT_IDS, DROP_EVENT_IDS),
+    ]
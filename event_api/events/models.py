@@ -1,8 +1,12 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from users.models import User
 
 class Event(models.Model):
+    # Stored in monthly range partitions of event_date, with (id, event_date)
+    # as the primary key in the database; see events.partitions.
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=255)
     description = models.CharField(max_length=255, blank=True, null=True)
@@ -10,8 +14,77 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     organizer = models.CharField(max_length=100)
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="created_events"
+        User, on_delete=models.CASCADE, related_name="created_events", db_index=False
     )
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    # Confirmed seats, maintained by event_registrations.services and
+    # reconciled by the reconcile_registration_counts command.
+    registration_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # The event's key in the system it was imported from, unique per author;
+    # imports update the event with the same key instead of adding another.
+    # The partitioned table cannot enforce that, so the
+    # event_author_external_id_uniq constraint of events_event_ids does.
+    external_id = models.CharField(
+        max_length=255, null=True, blank=True, editable=False
+    )
+    # Maintained by the events_event_search_vector_update trigger.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_date", "id"], name="event_date_id_idx"),
+            models.Index(
+                fields=["registration_count", "id"],
+                name="event_registration_count_idx",
+            ),
+            models.Index(
+                fields=["author", "event_date", "id"], name="event_author_date_id_idx"
+            ),
+            models.Index(
+                fields=["location", "event_date", "id"],
+                name="event_location_date_id_idx",
+            ),
+            models.Index(
+                fields=["location"],
+                name="event_location_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(
+                fields=["organizer", "event_date", "id"],
+                name="event_organizer_date_id_idx",
+            ),
+            models.Index(
+                fields=["organizer"],
+                name="event_organizer_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            GinIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            models.Index(
+                fields=["author", "external_id"], name="event_author_external_id_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(capacity__isnull=True)
+                | models.Q(registration_count__lte=models.F("capacity")),
+                name="event_registration_count_within_capacity",
+            ),
+        ]
+
+    # Columns maintained by in-database updates; a full save() of an instance
+    # loaded earlier must not overwrite them with stale values.
+    DATABASE_MAINTAINED_FIELDS = ("registration_count", "search_vector")
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DATABASE_MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -0,0 +1,241 @@
+import base64
+import binascii
+import json
+from urllib import parse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over a strict ``ordering``.
+
+    The last ordering field must be unique. Each page is fetched with a
+    ``WHERE (a, b) > (x, y) ... LIMIT n`` style predicate instead of an
+    OFFSET, so the cost of a page does not grow with scroll depth as long as
+    an index matching ``ordering`` exists.
+    """
+
+    ordering = ("id",)
+    # Optional named alternatives to ``ordering`` the client can pick with
+    # ``ordering_query_param``; each one needs a matching index.
+    orderings = {}
+    ordering_query_param = "ordering"
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        rows = [row async for row in self.get_page_queryset(queryset, request)]
+        return self.paginate_rows(rows)
+
+    def paginate_rows(self, rows):
+        """Split the fetched rows into the page and the look-ahead row."""
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        return self.page
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the ordered, sliced queryset for the requested page, including
+        one look-ahead row used to detect whether another page exists.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        values, self.reverse = self.decode_cursor(request, queryset.model)
+        self.has_cursor = values is not None
+
+        order_by = [self._directed(field, self.reverse) for field in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, self.reverse))
+        return queryset[: self.page_size + 1]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+        if self.orderings:
+            parameters.append(
+                {
+                    "name": self.ordering_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Sort order of the results.",
+                    "schema": {"type": "string", "enum": list(self.orderings)},
+                }
+            )
+        return parameters
+
+    def get_ordering(self, request):
+        name = request.query_params.get(self.ordering_query_param)
+        if not self.orderings or name is None:
+            return self.ordering
+        if name not in self.orderings:
+            raise APIValidationError(
+                {
+                    self.ordering_query_param: [
+                        f"Unsupported ordering. Choose one of: {', '.join(self.orderings)}."
+                    ]
+                }
+            )
+        return self.orderings[name]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def keyset_filter(self, values, reverse):
+        """
+        Build the lexicographic "row comes after ``values``" predicate.
+
+        The leading ``>=`` on the first field lets the planner start an index
+        range scan at the cursor position instead of filtering the whole index.
+        """
+        fields = [field.lstrip("-") for field in self.ordering]
+        lookups = [self._lookup(field, reverse) for field in self.ordering]
+
+        after = Q()
+        for i, (field, lookup) in enumerate(zip(fields, lookups)):
+            equal = {name: value for name, value in zip(fields[:i], values[:i])}
+            after |= Q(**equal, **{f"{field}__{lookup}": values[i]})
+        return Q(**{f"{fields[0]}__{lookups[0]}e": values[0]}) & after
+
+    def encode_cursor(self, row, reverse):
+        values = [self._row_value(row, field.lstrip("-")) for field in self.ordering]
+        payload = {"v": [self._to_json(value) for value in values]}
+        if reverse:
+            payload["r"] = 1
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+        url = replace_query_param(self.base_url, self.cursor_query_param, cursor)
+        if self.page_size_query_param not in self.request.query_params:
+            url = remove_query_param(url, self.page_size_query_param)
+        return url
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parse.unquote(encoded)))
+            raw_values = payload["v"]
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            binascii.Error,
+            ValidationError,
+        ):
+            raise APIValidationError(
+                {self.cursor_query_param: [self.invalid_cursor_message]}
+            )
+        return values, bool(payload.get("r"))
+
+    @staticmethod
+    def _row_value(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    @staticmethod
+    def _to_json(value):
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _directed(field, reverse):
+        descending = field.startswith("-")
+        name = field.lstrip("-")
+        return f"-{name}" if descending != reverse else name
+
+    @staticmethod
+    def _lookup(field, reverse):
+        descending = field.startswith("-")
+        return "lt" if descending != reverse else "gt"
+
+
+class EventPagination(KeysetPagination):
+    ordering = ("event_date", "id")
+    orderings = {
+        "event_date": ("event_date", "id"),
+        "-event_date": ("-event_date", "-id"),
+        "registration_count": ("registration_count", "id"),
+        "-registration_count": ("-registration_count", "-id"),
+    }
+    page_size = settings.EVENTS_PAGE_SIZE
+    max_page_size = settings.EVENTS_MAX_PAGE_SIZE
@@ -0,0 +1,191 @@
+"""
+Monthly range partitions of ``events_event`` by ``event_date``.
+
+Each month, in UTC, has a partition named ``events_event_pYYYY_MM``; events
+in months without one are kept in ``events_event_default``. Queries on a
+range of ``event_date``, such as upcoming events, only read the partitions
+of the months in range. ``create_partitions`` adds months ahead of time and
+``archive_partitions`` takes past months, with their registrations, out of
+the table.
+
+The registration tables' foreign keys reference ``events_event_ids``, which
+triggers keep at one row per event id (see events migration 0010).
+"""
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from event_registrations.models import EventRegistration, WaitlistEntry
+
+from . import cache as event_cache
+from .models import Event
+
+PARTITION_NAME = re.compile(r"^events_event_p(\d{4})_(\d{2})$")
+
+LIST_PARTITIONS = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+WHERE pg_inherits.inhparent = 'events_event'::regclass
+"""
+
+# The ids of the events in events_event, referenced by the registration
+# tables; detaching a partition leaves its events' ids to delete.
+EVENT_IDS = "events_event_ids"
+
+FOREIGN_KEYS = """
+SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'
+"""
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"events_event_p{month:%Y_%m}"
+
+
+def partitions():
+    """``{first day of the month: name}`` of the monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(LIST_PARTITIONS)
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def create_partitions(first, last):
+    """
+    Create the missing partitions of the months from ``first`` to ``last``,
+    both included, moving their events out of the default partition.
+    Returns the names of the partitions created.
+    """
+    created = []
+    month, last = month_start(first), month_start(last)
+    with transaction.atomic(), connection.cursor() as cursor:
+        while month <= last:
+            cursor.execute("SELECT events_event_create_partition(%s)", [month])
+            if cursor.fetchone()[0]:
+                created.append(partition_name(month))
+            month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(before, drop=False):
+    """
+    Detach the partitions of the months before ``before`` and move them to
+    ``EVENTS_ARCHIVE_SCHEMA`` along with the registrations and waitlist
+    entries of their events, or drop all of them with ``drop``. Returns the
+    names of the partitions taken out.
+
+    Detaching a partition locks the whole events table: every event read
+    and registration waits until the transaction ends. So the registrations
+    and waitlist entries are moved first, ``EVENTS_ARCHIVE_CHUNK_SIZE`` rows
+    per transaction, and the short transaction that detaches the partition
+    only moves those added since. An interrupted run can be started again.
+
+    Archived events are no longer served by the API; the archive keeps no
+    foreign keys, so their authors and attendees can still be deleted.
+    """
+    quote = connection.ops.quote_name
+    schema = quote(settings.EVENTS_ARCHIVE_SCHEMA)
+    chunk_size = settings.EVENTS_ARCHIVE_CHUNK_SIZE
+    archived = []
+    for month, name in sorted(partitions().items()):
+        if month >= month_start(before):
+            break
+        related = [
+            (table, None if drop else f"{schema}.{quote(f'{name}_{suffix}')}")
+            for table, suffix in (
+                (EventRegistration._meta.db_table, "registrations"),
+                (WaitlistEntry._meta.db_table, "waitlist"),
+            )
+        ]
+        with connection.cursor() as cursor:
+            if not drop:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                for table, archive in related:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {archive} (LIKE {quote(table)})"
+                    )
+            for table, archive in related:
+                while True:
+                    with transaction.atomic():
+                        if not move_related(cursor, table, name, archive, chunk_size):
+                            break
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"ALTER TABLE {quote(Event._meta.db_table)} "
+                    f"DETACH PARTITION {quote(name)}"
+                )
+                invalidate_archived(name)
+                for table, archive in related:
+                    move_related(cursor, table, name, archive)
+                cursor.execute(
+                    f"DELETE FROM {EVENT_IDS} "
+                    f"WHERE id IN (SELECT id FROM {quote(name)})"
+                )
+                if drop:
+                    cursor.execute(f"DROP TABLE {quote(name)}")
+                else:
+                    cursor.execute(FOREIGN_KEYS, [name])
+                    for (constraint,) in cursor.fetchall():
+                        cursor.execute(
+                            f"ALTER TABLE {quote(name)} "
+                            f"DROP CONSTRAINT {quote(constraint)}"
+                        )
+                    # The default draws from events_event's id sequence.
+                    cursor.execute(
+                        f"ALTER TABLE {quote(name)} ALTER COLUMN id DROP DEFAULT"
+                    )
+                    cursor.execute(f"ALTER TABLE {quote(name)} SET SCHEMA {schema}")
+        archived.append(name)
+    return archived
+
+
+def move_related(cursor, table, name, archive, limit=None):
+    """
+    Move up to ``limit`` rows of ``table`` that belong to the events of
+    partition ``name`` to ``archive``, or delete them when it is ``None``.
+    Returns the number of rows.
+    """
+    quote = connection.ops.quote_name
+    rows = (
+        f"SELECT id FROM {quote(table)} "
+        f"WHERE event_id IN (SELECT id FROM {quote(name)})"
+    )
+    if limit is not None:
+        rows += f" LIMIT {int(limit)}"
+    delete = f"DELETE FROM {quote(table)} WHERE id IN ({rows})"
+    if archive is None:
+        cursor.execute(delete)
+    else:
+        cursor.execute(
+            f"WITH moved AS ({delete} RETURNING *) "
+            f"INSERT INTO {archive} SELECT * FROM moved"
+        )
+    return cursor.rowcount
+
+
+def invalidate_archived(name):
+    """Drop the cached details of the events of partition ``name``."""
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {connection.ops.quote_name(name)}")
+        while event_ids := [row[0] for row in cursor.fetchmany(10000)]:
+            event_cache.invalidate_events(event_ids)
+    event_cache.invalidate_list()
@@ -1,4 +1,8 @@
-from rest_framework import serializers
+from functools import cache
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from .models import Event
 
 
@@ -12,9 +16,114 @@ class EventSerializer(serializers.ModelSerializer):
             "event_date",
             "location",
             "organizer",
+            "capacity",
+            "registration_count",
             "author",
         ]
-        read_only_fields = ["id", "author"]
+        read_only_fields = ["id", "registration_count", "author"]
+
+
+EVENT_FIELDS = tuple(EventSerializer.Meta.fields)
+
+# Fields whose ``to_representation`` returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class EventRowSerializer:
+    """
+    Read-only ``EventSerializer`` output for ``values_list()`` rows.
+
+    Skips building model instances and DRF's per-field dispatch: rows are
+    zipped with the field names, and only values whose representation
+    differs from the database value (datetimes) go through a converter.
+    Rows may carry extra trailing columns, e.g. for pagination.
+    """
+
+    def __init__(self, fields=EVENT_FIELDS):
+        self.fields = tuple(fields)
+        declared = declared_fields()
+        self.converted = [
+            (name, declared[name])
+            for name in self.fields
+            if not isinstance(declared[name], PASSTHROUGH_FIELDS)
+        ]
+
+    def columns(self, extra=()):
+        """``values_list()`` arguments: the fields, then any ``extra`` ones."""
+        return [*self.fields, *(name for name in extra if name not in self.fields)]
+
+    def to_representation(self, rows):
+        fields = self.fields
+        converters = [(name, converter(field)) for name, field in self.converted]
+        data = []
+        for row in rows:
+            item = dict(zip(fields, row))
+            for name, convert in converters:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            data.append(item)
+        return data
+
+
+def converter(field):
+    """
+    ``field.to_representation``, with the work that does not depend on the
+    value done once. For every datetime DRF looks up the current time zone,
+    a context-local read that costs more than formatting the value.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        field_timezone = getattr(field, "timezone", None) or field.default_timezone()
+        if (
+            output_format is not None
+            and output_format.lower() == ISO_8601
+            and field_timezone is not None
+        ):
+
+            def convert(value):
+                value = value.astimezone(field_timezone).isoformat()
+                return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+            return convert
+    return field.to_representation
+
+
+@cache
+def declared_fields():
+    # Building a ModelSerializer's fields is costly; the fields themselves
+    # keep no per-request state.
+    return EventSerializer().fields
+
+
+def event_fields(query_params):
+    """
+    Fields requested with ``?fields=a,b``, in ``EventSerializer`` order, or
+    all of them.
+    """
+    requested = {
+        name.strip()
+        for name in query_params.get("fields", "").split(",")
+        if name.strip()
+    }
+    unknown = requested.difference(EVENT_FIELDS)
+    if unknown:
+        raise ValidationError(
+            {
+                "fields": [
+                    f"Unknown fields: {', '.join(sorted(unknown))}. "
+                    f"Choose from: {', '.join(EVENT_FIELDS)}."
+                ]
+            }
+        )
+    if not requested:
+        return EVENT_FIELDS
+    return tuple(name for name in EVENT_FIELDS if name in requested)
 
 
 class EventCreateSerializer(serializers.ModelSerializer):
@@ -26,6 +135,7 @@ class EventCreateSerializer(serializers.ModelSerializer):
             "event_date",
             "location",
             "organizer",
+            "capacity",
         ]
 
 
@@ -38,4 +148,74 @@ class EventUpdateSerializer(serializers.ModelSerializer):
             "event_date",
             "location",
             "organizer",
+            "capacity",
         ]
+
+    def validate_capacity(self, value):
+        if value is not None and value < self.instance.registration_count:
+            raise serializers.ValidationError(
+                "Capacity cannot be lower than the number of registered attendees."
+            )
+        return value
+
+
+class EventFilterSerializer(serializers.Serializer):
+    date_from = serializers.DateTimeField(
+        required=False, help_text="Only events on or after this date."
+    )
+    date_to = serializers.DateTimeField(
+        required=False, help_text="Only events on or before this date."
+    )
+    location = serializers.CharField(
+        required=False, max_length=255, help_text="Exact location."
+    )
+    location_prefix = serializers.CharField(
+        required=False, max_length=255, help_text="Location starts with this value."
+    )
+    organizer = serializers.CharField(
+        required=False, max_length=100, help_text="Exact organizer."
+    )
+    organizer_prefix = serializers.CharField(
+        required=False, max_length=100, help_text="Organizer starts with this value."
+    )
+    author = serializers.UUIDField(required=False, help_text="Author user ID.")
+    q = serializers.CharField(
+        required=False,
+        max_length=200,
+        help_text="Full-text search over title and description.",
+    )
+    fields = serializers.CharField(
+        required=False,
+        help_text=(
+            "Comma-separated fields to return, e.g. `id,title,event_date`. "
+            "Defaults to all fields."
+        ),
+    )
+
+
+class EventBulkCreateResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField(help_text="Position of the item in the request.")
+    id = serializers.IntegerField(required=False, help_text="ID of the created event.")
+    errors = serializers.DictField(
+        required=False, help_text="Validation errors of a rejected item."
+    )
+
+
+class EventBulkCreateResponseSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = EventBulkCreateResultSerializer(many=True)
+
+
+class EventImportErrorSerializer(serializers.Serializer):
+    line = serializers.IntegerField(help_text="Line number of the rejected row.")
+    errors = serializers.DictField(help_text="Validation errors of the row.")
+
+
+class EventImportResponseSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = EventImportErrorSerializer(
+        many=True, help_text="The first rejected rows, in file order."
+    )
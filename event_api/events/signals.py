@@ -0,0 +1,16 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from users.models import User
+
+from . import cache as event_cache
+from .models import Event
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_author_events(sender, instance, **kwargs):
+    event_ids = list(
+        Event.objects.filter(author_id=instance.pk).values_list("id", flat=True)
+    )
+    if event_ids:
+        event_cache.invalidate_events(event_ids)
@@ -1,3 +1,1347 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from config import replicas
+from config.testing import QueryBudgetMixin
+from users.models import Role, User
+
+from event_registrations import services
+from event_registrations.models import EventRegistration, WaitlistEntry
+
+from . import cache as event_cache
+from .filters import filter_events
+from .importer import MESSAGES, import_events
+from .models import Event
+from .pagination import EventPagination
+from .partitions import (
+    add_months,
+    archive_partitions,
+    create_partitions,
+    month_start,
+    partition_name,
+)
+from .serializers import EventSerializer
+
+
+class EventQueryBudgetTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now() + timedelta(days=i),
+                location="Main hall",
+                organizer="Organizer",
+                author=cls.author,
+            )
+            for i in range(20)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+
+    def test_list(self):
+        with self.assertQueryBudget(2):
+            response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_detail(self):
+        with self.assertQueryBudget(2):
+            response = self.client.get(f"/api/events/{self.events[0].id}/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_update(self):
+        event = self.events[0]
+        # SELECT ... FOR UPDATE and UPDATE, in a savepoint under TestCase.
+        with self.assertQueryBudget(4):
+            response = self.client.put(
+                f"/api/events/{event.id}/update/",
+                {
+                    "title": "Renamed",
+                    "event_date": event.event_date.isoformat(),
+                    "location": event.location,
+                    "organizer": event.organizer,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete(self):
+        with self.assertQueryBudget(4):
+            response = self.client.delete(f"/api/events/{self.events[0].id}/delete/")
+        self.assertEqual(response.status_code, 204)
+
+    @override_settings(SQL_INSTRUMENTATION=True)
+    def test_instrumentation_headers(self):
+        client = APIClient()
+        self.authenticate(client, self.author)
+        with self.assertQueryBudget(2):
+            response = client.get("/api/events/")
+        self.assertEqual(response["X-DB-Queries"], "2")
+        self.assertEqual(response["X-DB-Duplicate-Queries"], "0")
+        self.assertIn("X-DB-Time-Ms", response)
+        self.assertIn("X-CPU-Time-Ms", response)
+
+
+class EventCacheTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.attendee = User.objects.create(
+            email="attendee@example.com", username="attendee"
+        )
+        cls.event = Event.objects.create(
+            title="Event",
+            event_date=timezone.now() + timedelta(days=1),
+            location="Main hall",
+            organizer="Organizer",
+            capacity=10,
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+        self.list_url = "/api/events/"
+        self.detail_url = f"/api/events/{self.event.id}/"
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.list_version = cache.get(event_cache.LIST_VERSION_KEY)
+
+    def assertCached(self, detail=True, list_version=None):
+        self.assertEqual(
+            cache.get(event_cache.detail_key(self.event.id)) is not None, detail
+        )
+        self.assertEqual(
+            cache.get(event_cache.LIST_VERSION_KEY), list_version or self.list_version
+        )
+
+    def write(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(response.status_code, 300, response.content)
+        return response
+
+    def test_reads_are_cached(self):
+        self.assertCached()
+        with self.assertQueryBudget(0):
+            self.assertEqual(self.client.get(self.detail_url).status_code, 200)
+            self.assertEqual(self.client.get(self.list_url).status_code, 200)
+
+    def test_create(self):
+        self.write(
+            "post",
+            "/api/events/create/",
+            {
+                "title": "New",
+                "event_date": (timezone.now() + timedelta(days=2)).isoformat(),
+                "location": "Main hall",
+                "organizer": "Organizer",
+            },
+        )
+
+        self.assertCached(list_version=self.list_version + 1)
+        titles = [
+            event["title"] for event in self.client.get(self.list_url).data["results"]
+        ]
+        self.assertEqual(titles, ["Event", "New"])
+
+    def test_update(self):
+        self.write(
+            "put",
+            f"/api/events/{self.event.id}/update/",
+            {
+                "title": "Renamed",
+                "event_date": self.event.event_date.isoformat(),
+                "location": self.event.location,
+                "organizer": self.event.organizer,
+            },
+        )
+
+        self.assertCached(detail=False, list_version=self.list_version + 1)
+        self.assertEqual(self.client.get(self.detail_url).data["title"], "Renamed")
+        self.assertEqual(
+            self.client.get(self.list_url).data["results"][0]["title"], "Renamed"
+        )
+
+    def test_delete(self):
+        invalidate_events = event_cache.invalidate_events
+        deleted_first = []
+
+        def check_deleted(event_ids):
+            deleted_first.append(not Event.objects.filter(id__in=event_ids).exists())
+            invalidate_events(event_ids)
+
+        with mock.patch.object(event_cache, "invalidate_events", check_deleted):
+            self.write("delete", f"/api/events/{self.event.id}/delete/")
+
+        # Outside a transaction the invalidation runs when it is called.
+        self.assertEqual(deleted_first, [True])
+        self.assertCached(detail=False, list_version=self.list_version + 1)
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+        self.assertEqual(self.client.get(self.list_url).data["results"], [])
+
+    def test_registration(self):
+        self.authenticate(self.client, self.attendee)
+        self.write("post", "/api/registrations/create/", {"event": self.event.id})
+
+        # Lists keep the old count until they expire.
+        self.assertCached(detail=False)
+        self.assertEqual(self.client.get(self.detail_url).data["registration_count"], 1)
+        self.assertEqual(
+            self.client.get(self.list_url).data["results"][0]["registration_count"], 0
+        )
+
+    def test_pinned_requests_skip_cache(self):
+        key = event_cache.detail_key(self.event.id)
+        entry = cache.get(key)
+        cache.set(key, {**entry, "data": {**entry["data"], "title": "Stale"}})
+        state = replicas.RoutingState()
+        token = replicas._state.set(state)
+        self.addCleanup(replicas._state.reset, token)
+
+        state.pinned = True
+        self.assertIsNone(event_cache.fetch(key))
+        self.assertEqual(self.client.get(self.detail_url).data["title"], "Event")
+        # The fresh response replaces the entry for everyone else.
+        state.pinned = False
+        self.assertEqual(event_cache.fetch(key)["data"]["title"], "Event")
+
+
+class EventConditionalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.events = [
+            Event.objects.create(
+                title=f"Event {i}",
+                event_date=timezone.now() + timedelta(days=i + 1),
+                location="Main hall",
+                organizer="Organizer",
+                author=cls.author,
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, url, **headers):
+        # Not cached, so each response reflects the database.
+        cache.clear()
+        return self.client.get(url, headers=headers)
+
+    def test_not_modified(self):
+        for url in ["/api/events/", f"/api/events/{self.events[0].id}/"]:
+            with self.subTest(url=url):
+                etag = self.get(url)["ETag"]
+
+                response = self.get(url, if_none_match=etag)
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+
+    def test_precondition_failed(self):
+        response = self.get("/api/events/", if_match='"stale"')
+
+        self.assertEqual(response.status_code, 412)
+
+    def test_etag_changes(self):
+        event = self.events[0]
+        list_etag = self.get("/api/events/")["ETag"]
+        detail_etag = self.get(f"/api/events/{event.id}/")["ETag"]
+
+        event.title = "Renamed"
+        event.save()
+
+        response = self.get("/api/events/", if_none_match=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], list_etag)
+        response = self.get(f"/api/events/{event.id}/", if_none_match=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], detail_etag)
+
+    def test_list_has_no_last_modified(self):
+        response = self.get("/api/events/")
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        # The latest updated_at of the list stays the same.
+        self.events[0].delete()
+
+        response = self.get(
+            "/api/events/", if_modified_since=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        response = self.get("/api/events/", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_last_modified(self):
+        url = f"/api/events/{self.events[0].id}/"
+        last_modified = self.get(url)["Last-Modified"]
+
+        response = self.get(url, if_modified_since=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class EventBulkCreateTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.user = User.objects.create(email="user@example.com", username="user")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+
+    def item(self, title, days=1, **fields):
+        return {
+            "title": title,
+            "event_date": (timezone.now() + timedelta(days=days)).isoformat(),
+            "location": "Main hall",
+            "organizer": "Organizer",
+            **fields,
+        }
+
+    def post(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/events/create/bulk/", items, format="json")
+
+    def test_all_valid(self):
+        items = [self.item(f"Event {i}", days=i + 1) for i in range(5)]
+
+        with self.assertQueryBudget(3):
+            response = self.post(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (5, 0))
+        events = Event.objects.order_by("event_date")
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [event.id for event in events],
+        )
+        self.assertEqual(
+            [result["index"] for result in response.data["results"]], list(range(5))
+        )
+        self.assertEqual({event.author_id for event in events}, {self.author.id})
+
+    def test_item_errors(self):
+        items = [
+            self.item("Valid"),
+            self.item("", capacity=-1),
+            "not an object",
+            self.item("Also valid", days=2),
+        ]
+
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 2))
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3])
+        self.assertIn("id", results[0])
+        self.assertEqual(set(results[1]["errors"]), {"title", "capacity"})
+        self.assertIn("non_field_errors", results[2]["errors"])
+        self.assertIn("id", results[3])
+        self.assertEqual(
+            sorted(Event.objects.values_list("title", flat=True)),
+            ["Also valid", "Valid"],
+        )
+
+    def test_all_invalid(self):
+        response = self.post([self.item("")])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data["created"], response.data["failed"]), (0, 1))
+        self.assertFalse(Event.objects.exists())
+
+    def test_not_a_list(self):
+        response = self.post(self.item("Single"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Event.objects.exists())
+
+    @override_settings(EVENTS_BULK_CREATE_MAX=3)
+    def test_limit(self):
+        response = self.post([self.item(f"Event {i}") for i in range(3)])
+        self.assertEqual(response.status_code, 201)
+
+        response = self.post([self.item(f"Event {i}") for i in range(4)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("3", str(response.data["detail"]))
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_requires_organizer(self):
+        self.authenticate(self.client, self.user)
+
+        response = self.post([self.item("Event")])
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalidates_list(self):
+        self.assertEqual(self.client.get("/api/events/").data["results"], [])
+        version = cache.get(event_cache.LIST_VERSION_KEY)
+
+        self.post([self.item("Invalid", capacity=-1)])
+        self.assertEqual(cache.get(event_cache.LIST_VERSION_KEY), version)
+
+        self.post([self.item("Event")])
+        self.assertEqual(cache.get(event_cache.LIST_VERSION_KEY), version + 1)
+        response = self.client.get("/api/events/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [event["title"] for event in response.data["results"]], ["Event"]
+        )
+
+
+class EventCapacityUpdateTest(QueryBudgetMixin, TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        self.event = Event.objects.create(
+            title="Event",
+            event_date=timezone.now() + timedelta(days=1),
+            location="Main hall",
+            organizer="Organizer",
+            capacity=2,
+            author=self.author,
+        )
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+
+    def put(self, **fields):
+        return self.client.put(
+            f"/api/events/{self.event.id}/update/",
+            {
+                "title": self.event.title,
+                "event_date": self.event.event_date.isoformat(),
+                "location": self.event.location,
+                "organizer": self.event.organizer,
+                "capacity": self.event.capacity,
+                **fields,
+            },
+            format="json",
+        )
+
+    def during_registration(self, request):
+        """
+        Run ``request`` while another transaction holds a claimed seat that
+        it commits half a second later.
+        """
+        claimed = threading.Event()
+
+        def register():
+            try:
+                with transaction.atomic():
+                    Event.objects.filter(id=self.event.id).update(
+                        registration_count=F("registration_count") + 1
+                    )
+                    claimed.set()
+                    time.sleep(0.5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=register)
+        thread.start()
+        claimed.wait()
+        try:
+            return request()
+        finally:
+            thread.join()
+
+    def test_capacity_below_registrations(self):
+        Event.objects.filter(id=self.event.id).update(registration_count=2)
+
+        response = self.put(capacity=1)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("capacity", response.data)
+
+    def test_capacity_below_concurrent_registration(self):
+        response = self.during_registration(lambda: self.put(capacity=0))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("capacity", response.data)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.capacity, self.event.registration_count), (2, 1))
+
+    def test_keeps_concurrent_registration(self):
+        response = self.during_registration(lambda: self.put(title="Renamed"))
+
+        self.assertEqual(response.status_code, 200)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, "Renamed")
+        self.assertEqual(self.event.registration_count, 1)
+
+
+class EventFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                description="Description" if i % 2 else None,
+                event_date=timezone.now() + timedelta(days=i),
+                location="Main hall",
+                organizer="Organizer",
+                capacity=10 if i % 2 else None,
+                author=cls.author,
+            )
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_matches_model_serializer(self):
+        response = self.client.get("/api/events/")
+
+        events = Event.objects.order_by("event_date", "id")
+        expected = JSONRenderer().render(EventSerializer(events, many=True).data)
+        self.assertEqual(response.json()["results"], json.loads(expected))
+
+    def test_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/events/?fields=title,id&page_size=2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [list(event) for event in response.json()["results"]],
+            [["id", "title"], ["id", "title"]],
+        )
+        self.assertNotIn('"description"', queries[-1]["sql"])
+
+        next_page = self.client.get(response.json()["next"])
+        self.assertEqual(len(next_page.json()["results"]), 2)
+        self.assertNotEqual(
+            next_page.json()["results"][0]["id"], response.json()["results"][0]["id"]
+        )
+
+    def test_unknown_fields(self):
+        response = self.client.get("/api/events/?fields=title,password")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["fields"][0])
+
+
+class EventFilterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.other = User.objects.create(
+            email="other@example.com", username="other", role=Role.ORGANIZER
+        )
+        cls.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        rows = [
+            ("Jazz concert", "Live jazz band", "Main hall", "City Arts", cls.author),
+            ("Rock concerts", None, "Main stage", "City Arts Club", cls.author),
+            ("Python meetup", "Talks about testing", "Library", "PyUG", cls.other),
+            (
+                "Chess evening",
+                "Jazz in the background",
+                "Main",
+                "Chess club",
+                cls.other,
+            ),
+        ]
+        cls.events = [
+            Event.objects.create(
+                title=title,
+                description=description,
+                event_date=cls.start + timedelta(days=i),
+                location=location,
+                organizer=organizer,
+                author=author,
+            )
+            for i, (title, description, location, organizer, author) in enumerate(rows)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def titles(self, query):
+        response = self.client.get("/api/events/", query)
+        self.assertEqual(response.status_code, 200)
+        return [event["title"] for event in response.json()["results"]]
+
+    def test_filters(self):
+        cases = [
+            ({"location": "Main"}, ["Chess evening"]),
+            (
+                {"location_prefix": "Main"},
+                ["Jazz concert", "Rock concerts", "Chess evening"],
+            ),
+            ({"organizer": "City Arts"}, ["Jazz concert"]),
+            ({"organizer_prefix": "City"}, ["Jazz concert", "Rock concerts"]),
+            ({"author": self.other.id}, ["Python meetup", "Chess evening"]),
+            (
+                {
+                    "date_from": (self.start + timedelta(days=1)).isoformat(),
+                    "date_to": (self.start + timedelta(days=2)).isoformat(),
+                },
+                ["Rock concerts", "Python meetup"],
+            ),
+            (
+                {"location_prefix": "Main", "author": self.other.id},
+                ["Chess evening"],
+            ),
+        ]
+        for query, expected in cases:
+            with self.subTest(query=query):
+                self.assertEqual(self.titles(query), expected)
+
+    def test_invalid_filter(self):
+        response = self.client.get("/api/events/", {"date_from": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("date_from", response.json())
+
+    def test_search(self):
+        cases = [
+            ("concert", ["Jazz concert", "Rock concerts"]),
+            ("jazz", ["Jazz concert", "Chess evening"]),
+            ("jazz -chess", ["Jazz concert"]),
+            ('"live jazz"', ["Jazz concert"]),
+            ("tested", ["Python meetup"]),
+            ("opera", []),
+        ]
+        for q, expected in cases:
+            with self.subTest(q=q):
+                self.assertEqual(self.titles({"q": q}), expected)
+
+    def test_search_keeps_ordering(self):
+        self.assertEqual(
+            self.titles({"q": "jazz", "ordering": "-event_date"}),
+            ["Chess evening", "Jazz concert"],
+        )
+
+    def test_search_vector_maintained(self):
+        def search(q):
+            return list(
+                filter_events(Event.objects.all(), {"q": q}).values_list(
+                    "id", flat=True
+                )
+            )
+
+        event = self.events[2]
+        event.title = "Django sprint"
+        event.save()
+        self.assertEqual(search("sprint"), [event.id])
+        self.assertEqual(search("meetup"), [])
+
+        Event.objects.filter(id=event.id).update(description="Pairing on tickets")
+        self.assertEqual(search("ticket"), [event.id])
+        self.assertEqual(search("testing"), [])
+
+        Event.objects.filter(id=event.id).update(description=None)
+        self.assertEqual(search("ticket"), [])
+        self.assertEqual(search("django"), [event.id])
+
+
+class EventPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        # Pairs of events share an event_date and triples a registration_count,
+        # so every page boundary has to be broken by id.
+        cls.events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=start + timedelta(days=i // 2),
+                location="Main hall",
+                organizer="Organizer",
+                capacity=10,
+                registration_count=i // 3,
+                author=cls.author,
+            )
+            for i in range(11)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, url, link="next"):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            pages.append(page)
+            ids.append([event["id"] for event in page["results"]])
+            url = page[link]
+        return ids, pages
+
+    def test_orderings(self):
+        orderings = {
+            "event_date": lambda event: (event.event_date, event.id),
+            "-event_date": lambda event: (event.event_date, event.id),
+            "registration_count": lambda event: (event.registration_count, event.id),
+            "-registration_count": lambda event: (event.registration_count, event.id),
+        }
+        for ordering, key in orderings.items():
+            with self.subTest(ordering=ordering):
+                expected = [
+                    event.id
+                    for event in sorted(
+                        self.events, key=key, reverse=ordering.startswith("-")
+                    )
+                ]
+                ids, pages = self.walk(f"/api/events/?ordering={ordering}&page_size=3")
+
+                self.assertEqual(sum(ids, []), expected)
+                self.assertEqual([len(page) for page in ids], [3, 3, 3, 2])
+                self.assertIsNone(pages[0]["previous"])
+
+    def test_previous(self):
+        ids, pages = self.walk("/api/events/?ordering=registration_count&page_size=4")
+
+        back, back_pages = self.walk(pages[-1]["previous"], link="previous")
+
+        self.assertEqual(back, ids[-2::-1])
+        self.assertIsNotNone(back_pages[0]["next"])
+        self.assertIn("ordering=registration_count", back_pages[0]["next"])
+        self.assertIn("page_size=4", back_pages[0]["next"])
+
+    def test_malformed_cursor(self):
+        cursors = [
+            "not-base64!",
+            "bm90IGpzb24=",
+            "eyJ2IjpbMV19",
+            "eyJ2IjpbIngiLDFdfQ==",
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f"/api/events/?cursor={cursor}")
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["cursor"], ["Invalid cursor"])
+
+    def test_unknown_ordering(self):
+        response = self.client.get("/api/events/?ordering=title")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.json())
+
+    def test_page_size(self):
+        # max_page_size is read from settings at import time.
+        max_page_size = EventPagination.max_page_size
+        EventPagination.max_page_size = 4
+        self.addCleanup(setattr, EventPagination, "max_page_size", max_page_size)
+        for page_size, expected in [("100", 4), ("2", 2), ("0", 11), ("x", 11)]:
+            with self.subTest(page_size=page_size):
+                response = self.client.get(f"/api/events/?page_size={page_size}")
+
+                self.assertEqual(len(response.json()["results"]), expected)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=3)
+class EventExportTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.other = User.objects.create(
+            email="other@example.com", username="other", role=Role.ORGANIZER
+        )
+        cls.user = User.objects.create(email="user@example.com", username="user")
+        Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                description='Multi-line, "quoted"\ntext' if i % 2 else None,
+                event_date=timezone.now() + timedelta(days=i),
+                location="Main hall",
+                organizer="Organizer",
+                author=cls.author if i < 7 else cls.other,
+            )
+            for i in range(10)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+
+    def export(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content), response
+
+    def test_ndjson(self):
+        with self.assertQueryBudget(1):
+            content, response = self.export("/api/events/export.ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="events.ndjson"'
+        )
+        events = Event.objects.order_by("id")
+        expected = JSONRenderer().render(EventSerializer(events, many=True).data)
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()], json.loads(expected)
+        )
+
+    def test_csv(self):
+        content, response = self.export(
+            f"/api/events/export.csv?author={self.other.pk}&fields=title,id,description"
+        )
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0], ["id", "title", "description"])
+        events = Event.objects.filter(author=self.other).order_by("id")
+        self.assertEqual(
+            rows[1:],
+            [[str(event.id), event.title, event.description or ""] for event in events],
+        )
+
+    def test_empty_csv_has_header(self):
+        content, _ = self.export("/api/events/export.csv?location=Nowhere&fields=id")
+
+        self.assertEqual(content, b"id\r\n")
+
+    def test_gzip(self):
+        plain, response = self.export("/api/events/export.ndjson")
+        self.assertNotIn("Content-Encoding", response)
+
+        compressed, response = self.export(
+            "/api/events/export.ndjson", accept_encoding="gzip, deflate, br"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_errors(self):
+        response = self.client.get(
+            "/api/events/export.xml", headers={"accept": "text/csv"}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/api/events/export.csv?fields=password")
+        self.assertEqual(response.status_code, 400)
+
+        self.authenticate(self.client, self.user)
+        response = self.client.get("/api/events/export.csv")
+        self.assertEqual(response.status_code, 403)
+
+
+class EventImportTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.other = User.objects.create(
+            email="other@example.com", username="other", role=Role.ORGANIZER
+        )
+        cls.event = Event.objects.create(
+            title="Old title",
+            event_date=timezone.now(),
+            location="Main hall",
+            organizer="Organizer",
+            capacity=10,
+            registration_count=5,
+            author=cls.author,
+            external_id="ext-1",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.authenticate(self.client, self.author)
+
+    def post(self, import_format, body):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"/api/events/import.{import_format}",
+                body.encode(),
+                content_type="text/plain",
+            )
+
+    def test_csv(self):
+        self.client.get(f"/api/events/{self.event.id}/")
+
+        response = self.post(
+            "csv",
+            "External_ID,title,event_date,location,organizer,capacity,notes\n"
+            "ext-1,New title,2030-01-01T10:00:00Z,Main hall,Org,20,x\n"
+            'ext-2,"Multi-line\ntitle",2030-01-02 10:00+02:00,Hall,Org,,x\n'
+            "ext-3,  ,2030-02-30T10:00,Hall,Org,-1,x\n"
+            "ext-4,Today,today,Hall,Org,many,x\n"
+            "ext-5,Ragged\n"
+            "ext-6,First,2030-01-03T10:00,Hall,Org,,x\n"
+            "ext-6,Second,2030-01-03T10:00,Hall,Org,,x\n",
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [response.data[key] for key in ("created", "updated", "failed")], [2, 1, 4]
+        )
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "line": 5,
+                    "errors": {
+                        "title": ["This field is required."],
+                        "event_date": [MESSAGES["datetime"]],
+                        "capacity": [MESSAGES["min_value"]],
+                    },
+                },
+                {
+                    "line": 6,
+                    "errors": {
+                        "event_date": [MESSAGES["datetime"]],
+                        "capacity": [MESSAGES["integer"]],
+                    },
+                },
+                {
+                    "line": 7,
+                    "errors": {"non_field_errors": ["Expected 7 columns, found 2."]},
+                },
+                {"line": 8, "errors": {"external_id": [MESSAGES["repeated"]]}},
+            ],
+        )
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.title, self.event.capacity), ("New title", 20))
+        self.assertEqual(self.event.registration_count, 5)
+        imported = Event.objects.get(author=self.author, external_id="ext-2")
+        self.assertEqual(imported.title, "Multi-line\ntitle")
+        self.assertEqual(imported.event_date.isoformat(), "2030-01-02T08:00:00+00:00")
+        self.assertEqual(
+            Event.objects.get(author=self.author, external_id="ext-6").title, "Second"
+        )
+        detail = self.client.get(f"/api/events/{self.event.id}/")
+        self.assertEqual(detail.data["title"], "New title")
+
+    def test_ndjson(self):
+        lines = [
+            {
+                "external_id": "ext-1",
+                "title": "Other author's key",
+                "event_date": "2030-01-01T10:00:00Z",
+                "location": "Hall",
+                "organizer": "Org",
+                "capacity": 3,
+            },
+            {"external_id": "ext-2", "title": {"nested": True}},
+        ]
+        body = "\n".join(map(json.dumps, lines)) + "\n\nnot json\n[1]\n"
+        self.authenticate(self.client, self.other)
+
+        response = self.post("ndjson", body)
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {"line": 2, "errors": {"title": [MESSAGES["nested"]]}},
+                {"line": 4, "errors": {"non_field_errors": ["Invalid JSON."]}},
+                {
+                    "line": 5,
+                    "errors": {"non_field_errors": ["Expected a JSON object."]},
+                },
+            ],
+        )
+        self.assertEqual(
+            Event.objects.filter(external_id="ext-1").count(), 2, "keys are per author"
+        )
+
+    def test_capacity_below_registrations(self):
+        response = self.post(
+            "csv",
+            "external_id,title,event_date,location,organizer,capacity\n"
+            "ext-1,Old title,2030-01-01T10:00:00Z,Main hall,Organizer,4\n",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"][0]["errors"],
+            {"capacity": [MESSAGES["below_registrations"]]},
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.capacity, 10)
+
+    def test_fills_waitlist(self):
+        raised, unlimited = [
+            Event.objects.create(
+                title="Limited",
+                event_date=timezone.now(),
+                location="Main hall",
+                organizer="Organizer",
+                capacity=1,
+                registration_count=1,
+                author=self.author,
+                external_id=external_id,
+            )
+            for external_id in ("ext-2", "ext-3")
+        ]
+        attendees = [
+            User.objects.create(email=f"attendee{i}@example.com", username=f"a{i}")
+            for i in range(3)
+        ]
+        for event in (raised, unlimited):
+            EventRegistration.objects.create(user=attendees[0], event=event)
+            for attendee in attendees[1:]:
+                WaitlistEntry.objects.create(user=attendee, event=event)
+
+        response = self.post(
+            "csv",
+            "external_id,title,event_date,location,organizer,capacity\n"
+            "ext-2,Limited,2030-01-01T10:00:00Z,Main hall,Organizer,2\n"
+            "ext-3,Limited,2030-01-01T10:00:00Z,Main hall,Organizer,\n",
+        )
+
+        self.assertEqual(response.data["updated"], 2)
+        raised.refresh_from_db()
+        unlimited.refresh_from_db()
+        self.assertEqual(
+            (raised.registration_count, unlimited.registration_count), (2, 3)
+        )
+        self.assertEqual(
+            list(WaitlistEntry.objects.values_list("event_id", "user_id")),
+            [(raised.id, attendees[2].id)],
+        )
+
+    @override_settings(EVENTS_IMPORT_CHUNK_SIZE=2, EVENTS_IMPORT_MAX_ERRORS=2)
+    def test_reports_first_errors(self):
+        rows = "".join(f"ext-{i},,,,\n" for i in range(5))
+        response = self.post(
+            "csv", "external_id,title,event_date,location,organizer\n" + rows
+        )
+
+        self.assertEqual(response.data["failed"], 5)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 3])
+
+    def test_unreadable_files(self):
+        response = self.post("csv", "title,event_date\nParty,2030-01-01T10:00\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["detail"],
+            "Missing columns: external_id, location, organizer.",
+        )
+
+        response = self.client.post(
+            "/api/events/import.csv",
+            b"external_id,title,event_date,location,organizer\n\xff\n",
+            content_type="text/csv",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "Line 2 is not valid UTF-8.")
+        self.assertFalse(Event.objects.exclude(pk=self.event.pk).exists())
+
+    def test_errors(self):
+        self.assertEqual(self.post("xlsx", "").status_code, 404)
+
+        user = User.objects.create(email="user@example.com", username="user")
+        self.authenticate(self.client, user)
+        self.assertEqual(self.post("csv", "").status_code, 403)
+
+
+class EventImportLockTest(TransactionTestCase):
+    def test_date_changed_during_import(self):
+        author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        event_date = timezone.now().replace(day=15, hour=10)
+        event = Event.objects.create(
+            title="Old title",
+            event_date=event_date,
+            location="Main hall",
+            organizer="Organizer",
+            author=author,
+            external_id="ext-1",
+        )
+        locked = threading.Event()
+
+        def move():
+            try:
+                with transaction.atomic():
+                    Event.objects.filter(id=event.id).update(
+                        event_date=event_date + timedelta(hours=1)
+                    )
+                    locked.set()
+                    time.sleep(0.5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=move)
+        thread.start()
+        locked.wait()
+        try:
+            result = import_events(
+                [
+                    b"external_id,title,event_date,location,organizer\n",
+                    b"ext-1,New title,2030-01-01T10:00:00Z,Main hall,Organizer\n",
+                ],
+                "csv",
+                author.pk,
+            )
+        finally:
+            thread.join()
+
+        self.assertEqual((result["created"], result["updated"]), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.title, "New title")
+
+
+@override_settings(ROOT_URLCONF="config.asgi_urls")
+class EventPartitionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.attendee = User.objects.create(
+            email="attendee@example.com", username="attendee"
+        )
+        cls.this_month = month_start(timezone.now())
+        create_partitions(add_months(cls.this_month, -3), cls.this_month)
+
+    def create_event(self, event_date):
+        return Event.objects.create(
+            title="Event",
+            event_date=event_date,
+            location="Main hall",
+            organizer="Organizer",
+            author=self.author,
+        )
+
+    def in_month(self, month):
+        return timezone.now().replace(year=month.year, month=month.month, day=15)
+
+    def event_ids(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM events_event_ids ORDER BY id")
+            return [row[0] for row in cursor.fetchall()]
+
+    def partition_of(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text FROM events_event WHERE id = %s",
+                [event.id],
+            )
+            return cursor.fetchone()[0]
+
+    def test_upcoming_events_skip_past_partitions(self):
+        queryset = filter_events(Event.objects.all(), {"date_from": timezone.now()})
+        plan = queryset.explain()
+
+        self.assertIn(partition_name(self.this_month), plan)
+        self.assertIn("events_event_default", plan)
+        self.assertNotIn(partition_name(add_months(self.this_month, -1)), plan)
+
+    def test_create_partitions(self):
+        later = add_months(self.this_month, 60)
+        event = self.create_event(self.in_month(later))
+        self.assertEqual(self.partition_of(event), "events_event_default")
+
+        EventRegistration.objects.create(user=self.attendee, event=event)
+
+        created = create_partitions(self.this_month, later)
+
+        self.assertEqual(created[-1], partition_name(later))
+        self.assertEqual(self.partition_of(event), partition_name(later))
+        self.assertEqual(create_partitions(self.this_month, later), [])
+        self.assertEqual(self.event_ids(), [event.id])
+        connection.check_constraints()
+
+    def test_archive_partitions(self):
+        old_month = add_months(self.this_month, -2)
+        old = self.create_event(self.in_month(old_month))
+        current = self.create_event(self.in_month(self.this_month))
+        for event in (old, current):
+            EventRegistration.objects.create(user=self.attendee, event=event)
+
+        # Fire the deferred foreign key checks of the inserts above, which
+        # would otherwise block detaching in the test's transaction.
+        connection.check_constraints()
+        with self.captureOnCommitCallbacks(execute=True):
+            archived = archive_partitions(add_months(self.this_month, -1))
+
+        self.assertIn(partition_name(old_month), archived)
+        self.assertNotIn(partition_name(self.this_month), archived)
+        self.assertFalse(Event.objects.filter(id=old.id).exists())
+        self.assertEqual(
+            list(EventRegistration.objects.values_list("event_id", flat=True)),
+            [current.id],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT event_id FROM events_archive."
+                f"{partition_name(old_month)}_registrations"
+            )
+            self.assertEqual(cursor.fetchall(), [(old.id,)])
+
+        self.assertEqual(self.event_ids(), [current.id])
+        connection.check_constraints()
+
+        # Django cascades deletes of live events to their registrations.
+        current.delete()
+        self.assertFalse(EventRegistration.objects.exists())
+        self.assertEqual(self.event_ids(), [])
+
+        EventRegistration.objects.create(user=self.attendee, event_id=old.id)
+        with self.assertRaises(IntegrityError):
+            connection.check_constraints()
+
+    @override_settings(EVENTS_ARCHIVE_CHUNK_SIZE=2)
+    def test_archive_moves_registrations_before_detaching(self):
+        old_month = add_months(self.this_month, -2)
+        old = self.create_event(self.in_month(old_month))
+        for i in range(3):
+            user = User.objects.create(email=f"user{i}@example.com", username=f"u{i}")
+            EventRegistration.objects.create(user=user, event=old)
+
+        connection.check_constraints()
+        with CaptureQueriesContext(connection) as queries:
+            archive_partitions(add_months(self.this_month, -1), drop=True)
+
+        name = partition_name(old_month)
+        statements = [query["sql"] for query in queries if name in query["sql"]]
+        detach = next(i for i, sql in enumerate(statements) if "DETACH" in sql)
+        # 2 + 1 registrations, then none, and no waitlist entries.
+        self.assertEqual(
+            sum("LIMIT 2" in sql for sql in statements[:detach]),
+            3 + 1,
+        )
+        self.assertFalse(any("LIMIT" in sql for sql in statements[detach:]))
+        self.assertFalse(EventRegistration.objects.exists())
+        connection.check_constraints()
+
+    def test_registrations_need_an_event(self):
+        missing_id = self.create_event(self.in_month(self.this_month)).id + 1
+
+        services.register_many(self.attendee.id, [missing_id])
+
+        with self.assertRaises(IntegrityError):
+            connection.check_constraints()
+
+    def test_moving_an_event_keeps_its_id(self):
+        event = self.create_event(self.in_month(self.this_month))
+        EventRegistration.objects.create(user=self.attendee, event=event)
+
+        Event.objects.filter(id=event.id).update(
+            event_date=self.in_month(add_months(self.this_month, -1))
+        )
+
+        self.assertEqual(
+            self.partition_of(event), partition_name(add_months(self.this_month, -1))
+        )
+        self.assertEqual(self.event_ids(), [event.id])
+        connection.check_constraints()
+
+    def test_external_id_unique_per_author(self):
+        def create(month):
+            return Event.objects.create(
+                title="Event",
+                event_date=self.in_month(month),
+                location="Main hall",
+                organizer="Organizer",
+                author=self.author,
+                external_id="ext-1",
+            )
+
+        create(self.this_month)
+        with self.assertRaises(IntegrityError):
+            create(add_months(self.this_month, -1))
+
+
+class AsyncEventViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(
+            email="organizer@example.com", username="organizer", role=Role.ORGANIZER
+        )
+        cls.events = Event.objects.bulk_create(
+            Event(
+                title=f"Event {i}",
+                event_date=timezone.now() + timedelta(days=i),
+                location="Main hall",
+                organizer="Organizer",
+                author=cls.author,
+            )
+            for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_matches_sync_view(self):
+        client = AsyncClient()
+        response = async_to_sync(client.get)("/api/events/?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        with override_settings(ROOT_URLCONF="config.urls"):
+            cache.clear()
+            expected = APIClient().get("/api/events/?page_size=2")
+        self.assertEqual(response.json(), expected.json())
+
+        cached = async_to_sync(client.get)(
+            "/api/events/?page_size=2", headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_detail(self):
+        event = self.events[0]
+        response = await AsyncClient().get(f"/api/events/{event.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], event.title)
+        missing = await AsyncClient().get("/api/events/0/")
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json(), {"detail": "Event not found."})
+
+    async def test_invalid_token(self):
+        response = await AsyncClient().get(
+            "/api/events/", headers={"Authorization": "Bearer nonsense"}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
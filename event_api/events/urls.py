@@ -2,19 +2,39 @@ from django.urls import path
 from .views import (
     EventListView,
     EventDetailView,
+    EventExportView,
+    EventImportView,
     EventCreateView,
+    EventBulkCreateView,
     EventUpdateView,
     EventDeleteView,
+    EventCacheStatsView,
 )
 
 urlpatterns = [
     path("events/", EventListView.as_view(), name="event-list"),
     path("events/<int:event_id>/", EventDetailView.as_view(), name="event-detail"),
+    path(
+        "events/export.<str:export_format>",
+        EventExportView.as_view(),
+        name="event-export",
+    ),
+    path(
+        "events/import.<str:import_format>",
+        EventImportView.as_view(),
+        name="event-import",
+    ),
     path("events/create/", EventCreateView.as_view(), name="event-create"),
+    path(
+        "events/create/bulk/", EventBulkCreateView.as_view(), name="event-bulk-create"
+    ),
     path(
         "events/<int:event_id>/update/", EventUpdateView.as_view(), name="event-update"
     ),
     path(
         "events/<int:event_id>/delete/", EventDeleteView.as_view(), name="event-delete"
     ),
+    path(
+        "events/cache/stats/", EventCacheStatsView.as_view(), name="event-cache-stats"
+    ),
 ]
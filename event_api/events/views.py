@@ -1,53 +1,276 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import generics, status, permissions
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
+from . import cache as event_cache
+from .conditional import (
+    compute_etag,
+    compute_validators,
+    conditional_response,
+    set_validators,
+)
+from .filters import filter_events
+from .importer import IMPORT_FORMATS, ImportFormatError, import_events
+from .pagination import EventPagination
 from .permissions import IsOrganizer
-from .serializers import EventCreateSerializer, EventSerializer, EventUpdateSerializer
+from .serializers import (
+    EventBulkCreateResponseSerializer,
+    EventCreateSerializer,
+    EventFilterSerializer,
+    EventImportResponseSerializer,
+    EventRowSerializer,
+    EventSerializer,
+    EventUpdateSerializer,
+    event_fields,
+)
 from .models import Event
+from config.async_views import AsyncAPIView
+from config.export import (
+    EXPORT_FORMATS,
+    IgnoreClientContentNegotiation,
+    batches,
+    export_response,
+)
+from event_registrations.services import fill_free_seats
 
 
-class EventListView(APIView):
+class EventListView(generics.ListAPIView):
+    serializer_class = EventSerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True
+    pagination_class = EventPagination
+
+    def get_queryset(self):
+        return filter_events(
+            Event.objects.defer("search_vector"), self.request.query_params
+        )
 
     @extend_schema(
-        responses={
-            200: OpenApiResponse(
-                response=EventSerializer(many=True), description="List of all events."
-            )
-        },
+        parameters=[EventFilterSerializer],
         tags=["Events"],
         operation_id="list_events",
         summary="Get list of events",
-        description="Returns a list of all available events. Publicly accessible.",
+        description=(
+            "Returns a page of events ordered by event date. Use the `next` and "
+            "`previous` links to move between pages. Results can be filtered by "
+            "date range, location, organizer and author, and searched with `q`. "
+            "Use `fields` to return only some fields. Supports conditional "
+            "requests with `If-None-Match`. Publicly accessible."
+        ),
     )
-    def get(self, request):
-        events = Event.objects.all()
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        serializer = EventRowSerializer(event_fields(request.query_params))
+        key = event_cache.list_key(request)
+        cached = event_cache.fetch(key)
+        if cached is None:
+            page = self.paginator.get_page_queryset(self.get_queryset(), request)
+            etag = compute_etag(page.values_list("id", "updated_at"))
+        else:
+            etag = cached["etag"]
+
+        not_modified = conditional_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+
+        if cached is None:
+            # Only the requested columns, plus the ordering ones for the
+            # cursor, and no model instances.
+            columns = serializer.columns(
+                field.lstrip("-") for field in self.paginator.ordering
+            )
+            rows = self.paginator.paginate_rows(
+                list(page.values_list(*columns, named=True))
+            )
+            response = self.paginator.get_paginated_response(
+                serializer.to_representation(rows)
+            )
+            event_cache.store(key, {"data": response.data, "etag": etag})
+            response["X-Cache"] = "MISS"
+        else:
+            response = Response(cached["data"], headers={"X-Cache": "HIT"})
+        return set_validators(response, etag, None)
+
+
+class AsyncEventListView(AsyncAPIView):
+    """``EventListView`` on the async ORM, routed under ASGI."""
+
+    permission_classes = [permissions.AllowAny]
+    read_replica = True
+
+    async def get(self, request):
+        paginator = EventPagination()
+        serializer = EventRowSerializer(event_fields(request.query_params))
+        key = await event_cache.alist_key(request)
+        cached = await event_cache.afetch(key)
+        if cached is None:
+            queryset = filter_events(
+                Event.objects.defer("search_vector"), request.query_params
+            )
+            page = paginator.get_page_queryset(queryset, request)
+            etag = compute_etag(
+                [row async for row in page.values_list("id", "updated_at")]
+            )
+        else:
+            etag = cached["etag"]
+
+        not_modified = conditional_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+
+        if cached is None:
+            columns = serializer.columns(
+                field.lstrip("-") for field in paginator.ordering
+            )
+            rows = paginator.paginate_rows(
+                [row async for row in page.values_list(*columns, named=True)]
+            )
+            data = paginator.get_paginated_response(
+                serializer.to_representation(rows)
+            ).data
+            await event_cache.astore(key, {"data": data, "etag": etag})
+            response = Response(data, headers={"X-Cache": "MISS"})
+        else:
+            response = Response(cached["data"], headers={"X-Cache": "HIT"})
+        return set_validators(response, etag, None)
 
 
 class EventDetailView(APIView):
     permission_classes = [permissions.AllowAny]
+    read_replica = True
 
     @extend_schema(
         responses={
             200: OpenApiResponse(
                 response=EventSerializer, description="Event details."
             ),
+            304: OpenApiResponse(description="Event not modified."),
             404: OpenApiResponse(description="Event not found."),
         },
         tags=["Events"],
         operation_id="get_event_detail",
         summary="Get single event",
-        description="Returns detailed information about a specific event by ID.",
+        description=(
+            "Returns detailed information about a specific event by ID. Supports "
+            "conditional requests with `If-None-Match` and `If-Modified-Since`."
+        ),
     )
     def get(self, request, event_id):
-        event = get_object_or_404(Event, id=event_id)
-        serializer = EventSerializer(event)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        key = event_cache.detail_key(event_id)
+        cached = event_cache.fetch(key)
+        if cached is None:
+            updated_at = (
+                Event.objects.filter(id=event_id)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+            if updated_at is None:
+                raise NotFound("Event not found.")
+            etag, last_modified = compute_validators([(event_id, updated_at)])
+        else:
+            etag, last_modified = cached["etag"], cached["last_modified"]
+
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if cached is None:
+            event = get_object_or_404(Event.objects.defer("search_vector"), id=event_id)
+            data = EventSerializer(event).data
+            event_cache.store(
+                key, {"data": data, "etag": etag, "last_modified": last_modified}
+            )
+            response = Response(data, headers={"X-Cache": "MISS"})
+        else:
+            response = Response(cached["data"], headers={"X-Cache": "HIT"})
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncEventDetailView(AsyncAPIView):
+    """``EventDetailView`` on the async ORM, routed under ASGI."""
+
+    permission_classes = [permissions.AllowAny]
+    read_replica = True
+
+    async def get(self, request, event_id):
+        key = event_cache.detail_key(event_id)
+        cached = await event_cache.afetch(key)
+        if cached is None:
+            updated_at = await (
+                Event.objects.filter(id=event_id)
+                .values_list("updated_at", flat=True)
+                .afirst()
+            )
+            if updated_at is None:
+                raise NotFound("Event not found.")
+            etag, last_modified = compute_validators([(event_id, updated_at)])
+        else:
+            etag, last_modified = cached["etag"], cached["last_modified"]
+
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if cached is None:
+            event = await (
+                Event.objects.defer("search_vector").filter(id=event_id).afirst()
+            )
+            if event is None:
+                raise NotFound("Event not found.")
+            data = EventSerializer(event).data
+            await event_cache.astore(
+                key, {"data": data, "etag": etag, "last_modified": last_modified}
+            )
+            response = Response(data, headers={"X-Cache": "MISS"})
+        else:
+            response = Response(cached["data"], headers={"X-Cache": "HIT"})
+        return set_validators(response, etag, last_modified)
+
+
+class EventExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    read_replica = True
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    @extend_schema(
+        parameters=[EventFilterSerializer],
+        responses={
+            200: OpenApiResponse(description="NDJSON or CSV stream of events."),
+            400: OpenApiResponse(description="Invalid filters or fields."),
+            403: OpenApiResponse(description="User is not an organizer."),
+            404: OpenApiResponse(description="Unknown export format."),
+        },
+        tags=["Events"],
+        operation_id="export_events",
+        summary="Export events",
+        description=(
+            "Streams every event matching the list filters, e.g. `author`, as "
+            "`ndjson` (one JSON object per line) or `csv`, in id order. Use "
+            "`fields` to export only some fields. Gzipped when the request "
+            "sends `Accept-Encoding: gzip`. Organizer permission required."
+        ),
+    )
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound("Unknown export format.")
+        serializer = EventRowSerializer(event_fields(request.query_params))
+        queryset = filter_events(Event.objects.all(), request.query_params)
+        rows = queryset.order_by("id").values_list(*serializer.columns())
+        return export_response(
+            request,
+            export_format,
+            serializer.fields,
+            map(serializer.to_representation, batches(rows)),
+            "events",
+        )
 
 
 class EventCreateView(APIView):
@@ -70,10 +293,143 @@ class EventCreateView(APIView):
     def post(self, request):
         serializer = EventCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(author=request.user)
+        serializer.save(author_id=request.user.pk)
+        event_cache.invalidate_list()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class EventBulkCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+
+    @extend_schema(
+        request=EventCreateSerializer(many=True),
+        responses={
+            201: OpenApiResponse(
+                response=EventBulkCreateResponseSerializer,
+                description="All events created successfully.",
+            ),
+            207: OpenApiResponse(
+                response=EventBulkCreateResponseSerializer,
+                description="Some events were created, others were rejected.",
+            ),
+            400: OpenApiResponse(description="Invalid input data."),
+            403: OpenApiResponse(description="User is not an organizer."),
+        },
+        tags=["Events"],
+        operation_id="bulk_create_events",
+        summary="Create events in bulk",
+        description=(
+            "Creates many events in one request. Accepts an array of event "
+            "payloads, validates each item, inserts the valid ones in a single "
+            "transaction and returns a result (created ID or validation errors) "
+            "for every item, in request order. Organizer permission required."
+        ),
+    )
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Expected a list of events."})
+        if len(items) > settings.EVENTS_BULK_CREATE_MAX:
+            raise ValidationError(
+                {
+                    "detail": "Cannot create more than "
+                    f"{settings.EVENTS_BULK_CREATE_MAX} events per request."
+                }
+            )
+
+        # A single serializer instance is reused so its fields are built once
+        # rather than once per item.
+        validator = EventCreateSerializer()
+        results, events = [], []
+        for index, item in enumerate(items):
+            try:
+                validated_data = validator.run_validation(item)
+            except ValidationError as exc:
+                results.append({"index": index, "errors": exc.detail})
+                continue
+            event = Event(**validated_data, author_id=request.user.pk)
+            results.append({"index": index, "event": event})
+            events.append(event)
+
+        with transaction.atomic():
+            Event.objects.bulk_create(
+                events, batch_size=settings.EVENTS_BULK_CREATE_BATCH_SIZE
+            )
+            if events:
+                event_cache.invalidate_list()
+
+        for result in results:
+            if "event" in result:
+                result["id"] = result.pop("event").id
+
+        created, failed = len(events), len(items) - len(events)
+        if not failed:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": created, "failed": failed, "results": results},
+            status=response_status,
+        )
+
+
+class EventImportView(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizer]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    @extend_schema(
+        request={
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={
+            200: OpenApiResponse(
+                response=EventImportResponseSerializer,
+                description="All rows were imported.",
+            ),
+            207: OpenApiResponse(
+                response=EventImportResponseSerializer,
+                description="Some rows were imported, others were rejected.",
+            ),
+            400: OpenApiResponse(
+                response=EventImportResponseSerializer,
+                description="Every row was rejected, or the file cannot be read.",
+            ),
+            403: OpenApiResponse(description="User is not an organizer."),
+            404: OpenApiResponse(description="Unknown import format."),
+        },
+        tags=["Events"],
+        operation_id="import_events",
+        summary="Import events from a file",
+        description=(
+            "Imports the request body, a `csv` file with a header row or an "
+            "`ndjson` file with one event object per line, as events of the "
+            "authenticated organizer. Rows need an `external_id`: rows whose "
+            "`external_id` matches one of the organizer's events update it, the "
+            "others create events. Rows with errors are skipped and reported "
+            "with their line numbers. The file is streamed to the database, so "
+            "use the `import_events` command for files too large for one request."
+        ),
+    )
+    def post(self, request, import_format):
+        if import_format not in IMPORT_FORMATS:
+            raise NotFound("Unknown import format.")
+        try:
+            result = import_events(request.stream or [], import_format, request.user.pk)
+        except ImportFormatError as exc:
+            raise ValidationError({"detail": str(exc)})
+
+        if not result["failed"]:
+            response_status = status.HTTP_200_OK
+        elif result["created"] or result["updated"]:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
+
 class EventUpdateView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizer]
 
@@ -93,15 +449,24 @@ class EventUpdateView(APIView):
         description="Allows event authors to update their events. Organizer permission required.",
     )
     def put(self, request, event_id):
-        event = get_object_or_404(Event, id=event_id)
-        if event.author != request.user:
-            return Response(
-                {"detail": "You do not have permission to update this event."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-        serializer = EventUpdateSerializer(event, data=request.data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # The row stays locked until the update commits, so the capacity is
+        # validated against the current registration count and nothing else
+        # is overwritten: concurrent registrations wait for the new capacity
+        # instead of breaking its constraint.
+        with transaction.atomic():
+            event = get_object_or_404(Event.objects.select_for_update(), id=event_id)
+            if event.author_id != request.user.pk:
+                return Response(
+                    {"detail": "You do not have permission to update this event."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            previous_capacity = event.capacity
+            serializer = EventUpdateSerializer(event, data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        if event.capacity != previous_capacity:
+            fill_free_seats(event.id)
+        event_cache.invalidate_events([event.id])
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -121,10 +486,30 @@ class EventDeleteView(APIView):
     )
     def delete(self, request, event_id):
         event = get_object_or_404(Event, id=event_id)
-        if event.author != request.user:
+        if event.author_id != request.user.pk:
             return Response(
                 {"detail": "You do not have permission to delete this event."},
                 status=status.HTTP_403_FORBIDDEN,
             )
         event.delete()
+        # After the delete: without a transaction the invalidation runs at
+        # once, and a read before the delete would cache the event again.
+        event_cache.invalidate_events([event_id])
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EventCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Event cache hit/miss counters."),
+            403: OpenApiResponse(description="Staff access required."),
+        },
+        tags=["Events"],
+        operation_id="event_cache_stats",
+        summary="Event cache statistics",
+        description="Returns hit/miss counters of the event response cache. Staff only.",
+    )
+    def get(self, request):
+        return Response(event_cache.stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,91 @@
+from django.utils.functional import cached_property
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from . import cache as user_cache
+from .models import User
+from .revocation import revoked_tokens
+
+
+class ClaimsUser(TokenUser):
+    """
+    ``request.user`` built from the token claims, without a database query.
+    Use ``users.cache.get_user`` when the full row is needed.
+    """
+
+    # Shared state from users.cache.get_state.
+    state = None
+
+    @cached_property
+    def id(self):
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token["role"]
+
+    @cached_property
+    def is_active(self):
+        return self.token["is_active"]
+
+    @cached_property
+    def is_staff(self):
+        return self.token["is_staff"]
+
+    def __eq__(self, other):
+        if not isinstance(other, (TokenUser, User)):
+            return NotImplemented
+        return self.pk == other.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+def has_claims(validated_token):
+    return all(claim in validated_token for claim in user_cache.CLAIMS)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authenticate from the role and status claims signed into the token.
+
+    Instead of loading the user, the claims are compared with the state
+    ``users.cache.publish`` shares when a user is saved, so a token issued
+    before a deactivation or a role change is rejected. A state missing from
+    the cache is loaded from the database; the cache must be shared by every
+    process (see ``users.checks``). Tokens without the claims fall back to
+    the database lookup. Tokens revoked at logout are rejected through
+    ``users.revocation``.
+    """
+
+    def get_user(self, validated_token):
+        if revoked_tokens.is_revoked(validated_token):
+            raise self.revoked()
+        if not has_claims(validated_token):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        return self.claims_user(validated_token, user_cache.get_state(user_id))
+
+    def claims_user(self, validated_token, state):
+        if any(state[claim] != validated_token[claim] for claim in user_cache.CLAIMS):
+            raise exceptions.AuthenticationFailed(
+                "Token claims are out of date", code="token_outdated"
+            )
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+        user.state = state
+        return user
+
+    def revoked(self):
+        return exceptions.AuthenticationFailed(
+            "Token has been revoked", code="token_revoked"
+        )
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+CLAIMS = ("role", "is_active", "is_staff")
+STATE_KEY = "users:state:{}"
+
+
+def get_cache():
+    return caches[settings.USERS_CACHE_ALIAS]
+
+
+def claims(user):
+    return {claim: getattr(user, claim) for claim in CLAIMS}
+
+
+def state(user):
+    return {**claims(user), "updated_at": user.updated_at}
+
+
+def state_timeout():
+    # Older tokens have expired by the time the entry does.
+    return api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+
+
+def publish(user_id, user_state):
+    """
+    Share a user's current claims with every process. Tokens signed with
+    other values are rejected, and in-process copies older than
+    ``updated_at`` are reloaded.
+    """
+    get_cache().set(STATE_KEY.format(user_id), user_state, timeout=state_timeout())
+    local_users.discard(user_id)
+
+
+def share(user):
+    """
+    Share the state of a user just read from the database, unless a process
+    already published one: that one is at least as recent.
+    """
+    get_cache().add(STATE_KEY.format(user.pk), state(user), timeout=state_timeout())
+
+
+def get_state(user_id):
+    """
+    Shared state of a user. A missing entry, expired or evicted, is loaded
+    from the database and shared again, so it never lets an outdated token
+    through.
+    """
+    user_state = get_cache().get(STATE_KEY.format(user_id))
+    if user_state is None:
+        user = User.objects.filter(pk=user_id).first()
+        user_state = _share_loaded(user_id, user)
+    return user_state
+
+
+async def aget_state(user_id):
+    user_state = await get_cache().aget(STATE_KEY.format(user_id))
+    if user_state is None:
+        user = await User.objects.filter(pk=user_id).afirst()
+        user_state = _share_loaded(user_id, user)
+    return user_state
+
+
+def _share_loaded(user_id, user):
+    if user is None:
+        # Deleted: rejected like a deactivated user.
+        return {"role": None, "is_active": False, "is_staff": False}
+    share(user)
+    # The row is current, so spare get_user another query.
+    local_users.set(user.pk, user)
+    return state(user)
+
+
+def get_user(user):
+    """
+    Full ``User`` row for an authenticated ``request.user``, from the
+    in-process cache when it is still current. Treat the result as read-only:
+    it is shared between requests.
+    """
+    if isinstance(user, User):
+        return user
+    cached = _cached(user)
+    if cached is None:
+        cached = User.objects.get(pk=user.pk)
+        local_users.set(user.pk, cached)
+    return cached
+
+
+async def aget_user(user):
+    if isinstance(user, User):
+        return user
+    cached = _cached(user)
+    if cached is None:
+        cached = await User.objects.aget(pk=user.pk)
+        local_users.set(user.pk, cached)
+    return cached
+
+
+def _cached(token_user):
+    cached = local_users.get(token_user.pk)
+    if cached is None or claims(cached) != claims(token_user):
+        return None
+    state = token_user.state
+    if state is not None and cached.updated_at < state["updated_at"]:
+        return None
+    return cached
+
+
+class LocalUserCache:
+    """Thread-safe LRU of ``User`` rows whose entries expire after ``ttl``."""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_users = LocalUserCache(settings.USERS_CACHE_TTL, settings.USERS_CACHE_MAX_SIZE)
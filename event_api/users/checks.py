@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_users_cache(app_configs, **kwargs):
+    """
+    Deactivations and role changes reach the other processes only through
+    ``USERS_CACHE_ALIAS``, so with several processes it must be shared.
+    """
+    if settings.SERVER_PROCESSES <= 1:
+        return []
+    if not isinstance(caches[settings.USERS_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        Error(
+            f"The {settings.USERS_CACHE_ALIAS!r} cache is local to each process, "
+            f"but {settings.SERVER_PROCESSES} processes serve requests: tokens "
+            "of a user deactivated in one of them would still be accepted by "
+            "the others.",
+            hint="Set CACHE_BACKEND to a shared cache, such as Redis.",
+            id="users.E001",
+        )
+    ]
@@ -1,10 +1,11 @@
 import uuid
+from functools import partial
 from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin,
     BaseUserManager,
 )
-from django.db import models
+from django.db import models, transaction
 from django.utils.timezone import now
 
 
@@ -25,7 +26,31 @@ class TimestampedModel(models.Model):
         super().save(*args, **kwargs)
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Update, and publish the new claims of the users updated: no signal
+        is sent, so tokens would otherwise keep the old role or status.
+        """
+        # users.cache imports this module.
+        from . import cache as user_cache
+
+        if not kwargs.keys() & set(user_cache.CLAIMS):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.select_for_update().values_list("pk", flat=True))
+            updated = super().update(**kwargs)
+            users = self.model._base_manager.using(self.db).filter(pk__in=user_ids)
+            for user in users:
+                transaction.on_commit(
+                    partial(user_cache.publish, user.pk, user_cache.state(user)),
+                    using=self.db,
+                )
+        return updated
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("Users must have an email address")
@@ -61,3 +86,14 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """Access token revoked before it expires, e.g. at logout."""
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=now, db_index=True)
+
+    def __str__(self):
+        return self.jti
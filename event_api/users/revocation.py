@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+# Incremental syncs re-read revocations this far back, for transactions that
+# committed after a later one was read and for clock skew between hosts.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """
+    Set of strings in a fixed bit array: never a false negative, and false
+    positives at about ``error_rate`` once ``capacity`` keys are added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        ln2 = math.log(2)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / ln2**2))
+        self.hashes = max(1, round(self.size / capacity * ln2))
+        self.bits = bytearray(-(-self.size // 8))
+
+    def _positions(self, key):
+        # Double hashing on the built-in string hash, which is randomized per
+        # process (fine for a filter that never leaves it) and cached on the
+        # string.
+        value = hash(key)
+        position, step = value % self.size, value >> 32 | 1
+        for _ in range(self.hashes):
+            yield position
+            position = (position + step) % self.size
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        # _positions unrolled for the request path: most keys that were
+        # never added stop at the first clear bit.
+        size, bits = self.size, self.bits
+        value = hash(key)
+        position = value % size
+        if not bits[position >> 3] >> (position & 7) & 1:
+            return False
+        step = value >> 32 | 1
+        for _ in range(self.hashes - 1):
+            position = (position + step) % size
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+
+class RevocationList:
+    """
+    Ids of revoked access tokens, checked on every request without I/O.
+
+    A Bloom filter in each process answers "not revoked" for almost every
+    token; only its hits are confirmed against the ``RevokedToken`` table.
+    Revocations made in this process apply at once, those of other
+    processes after the next sync, at most ``TOKEN_REVOCATION_SYNC_SECONDS``
+    later.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._filter = None
+        self._since = None
+        self._synced_at = self._rebuilt_at = -math.inf
+
+    def needs_sync(self):
+        elapsed = time.monotonic() - self._synced_at
+        return elapsed >= settings.TOKEN_REVOCATION_SYNC_SECONDS
+
+    def sync(self):
+        """
+        Add revocations saved since the last sync, or rebuild the filter
+        from the unexpired ones every ``TOKEN_REVOCATION_REBUILD_SECONDS``.
+        """
+        with self._lock:
+            if not self.needs_sync():
+                return
+            synced_at, since = time.monotonic(), timezone.now()
+            # The primary, so a lagging replica cannot hide a revocation.
+            tokens = RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+            rebuild = synced_at - self._rebuilt_at
+            if (
+                self._filter is None
+                or rebuild >= settings.TOKEN_REVOCATION_REBUILD_SECONDS
+            ):
+                jtis = list(
+                    tokens.filter(expires_at__gt=since).values_list("jti", flat=True)
+                )
+                bloom = BloomFilter(
+                    max(settings.TOKEN_REVOCATION_CAPACITY, 2 * len(jtis)),
+                    settings.TOKEN_REVOCATION_ERROR_RATE,
+                )
+                self._rebuilt_at = synced_at
+            else:
+                jtis = tokens.filter(
+                    revoked_at__gte=self._since - SYNC_OVERLAP
+                ).values_list("jti", flat=True)
+                bloom = self._filter
+            for jti in jtis:
+                bloom.add(jti)
+            self._filter, self._since, self._synced_at = bloom, since, synced_at
+
+    def is_revoked(self, validated_token):
+        if self.needs_sync():
+            self.sync()
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti is None or jti not in self._filter:
+            return False
+        return self._exact(jti).exists()
+
+    async def ais_revoked(self, validated_token):
+        if self.needs_sync():
+            await sync_to_async(self.sync)()
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti is None or jti not in self._filter:
+            return False
+        return await self._exact(jti).aexists()
+
+    def revoke(self, validated_token):
+        """Reject ``validated_token`` from now until it expires."""
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti is None:
+            return
+        expires_at = datetime_from_epoch(validated_token["exp"])
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+        )
+        # Expired tokens fail validation before they are looked up here.
+        RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def _exact(self, jti):
+        return RevokedToken.objects.using(DEFAULT_DB_ALIAS).filter(jti=jti)
+
+
+revoked_tokens = RevocationList()
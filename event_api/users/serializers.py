@@ -26,3 +26,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 
 class TokenSerializer(serializers.Serializer):
     access_token = serializers.CharField()
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField()
@@ -0,0 +1,22 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def publish_user_state(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(user_cache.publish, instance.pk, user_cache.state(instance))
+    )
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    # The primary key is cleared once the delete completes, so capture it now.
+    user_state = {**user_cache.state(instance), "is_active": False}
+    transaction.on_commit(partial(user_cache.publish, instance.pk, user_state))
@@ -1,3 +1,361 @@
-from django.test import TestCase
+import tempfile
+import uuid
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.testing import QueryBudgetMixin
+
+from . import cache as user_cache
+from . import tokens
+from .checks import check_users_cache
+from .models import RevokedToken, Role, User
+from .revocation import BloomFilter, revoked_tokens
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local_users.clear()
+        self.user = User.objects.create(email="user@example.com", username="user")
+        self.client = APIClient()
+        self.authenticate(self.client, self.user)
+
+    def test_me(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get("/api/users/me")
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertQueryBudget(0):
+            response = self.client.get("/api/users/me")
+        self.assertEqual(response.json()["email"], self.user.email)
+
+    def test_organizer_check(self):
+        with self.assertQueryBudget(0):
+            response = self.client.post("/api/events/create/", {}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local_users.clear()
+        self.user = User.objects.create(email="user@example.com", username="user")
+        self.client = APIClient()
+
+    def get_me(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client.get("/api/users/me")
+
+    def test_role_change_rejects_older_tokens(self):
+        token = tokens.AccessToken.for_user(self.user)
+        self.assertEqual(self.get_me(token).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = Role.ORGANIZER
+            self.user.save()
+
+        self.assertEqual(self.get_me(token).status_code, 401)
+        self.assertEqual(
+            self.get_me(tokens.AccessToken.for_user(self.user)).status_code, 200
+        )
+
+    def test_deactivation_rejects_tokens(self):
+        token = tokens.AccessToken.for_user(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_deletion_rejects_tokens(self):
+        token = tokens.AccessToken.for_user(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_profile_change_refreshes_cached_user(self):
+        token = tokens.AccessToken.for_user(self.user)
+        self.get_me(token)
+
+        # Saved by another process: this one only sees the shared state.
+        User.objects.filter(pk=self.user.pk).update(
+            username="renamed", updated_at=timezone.now()
+        )
+        self.user.refresh_from_db()
+        user_cache.get_cache().set(
+            user_cache.STATE_KEY.format(self.user.pk), user_cache.state(self.user)
+        )
+
+        self.assertEqual(self.get_me(token).json()["username"], "renamed")
+
+    def test_missing_state_is_loaded(self):
+        token = tokens.AccessToken.for_user(self.user)
+
+        # Deactivated while the state entry was evicted.
+        with self.captureOnCommitCallbacks():
+            self.user.is_active = False
+            self.user.save()
+        cache.delete(user_cache.STATE_KEY.format(self.user.pk))
+
+        self.assertEqual(self.get_me(token).status_code, 401)
+        self.assertFalse(user_cache.get_state(self.user.pk)["is_active"])
+
+    def test_missing_state_of_deleted_user(self):
+        token = tokens.AccessToken.for_user(self.user)
+
+        with self.captureOnCommitCallbacks():
+            self.user.delete()
+        cache.clear()
+
+        self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_queryset_update_rejects_tokens(self):
+        token = tokens.AccessToken.for_user(self.user)
+        self.assertEqual(self.get_me(token).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = User.objects.filter(pk=self.user.pk).update(role=Role.ORGANIZER)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.get_me(token).status_code, 401)
+        self.user.refresh_from_db()
+        self.assertEqual(
+            self.get_me(tokens.AccessToken.for_user(self.user)).status_code, 200
+        )
+
+    def test_tokens_without_claims(self):
+        response = self.get_me(AccessToken.for_user(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["email"], self.user.email)
+
+
+class SharedUserCacheTest(TestCase):
+    def setUp(self):
+        location = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(
+            override_settings(
+                CACHES={
+                    "default": {
+                        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                        "LOCATION": location,
+                    }
+                }
+            )
+        )
+        user_cache.local_users.clear()
+        self.user = User.objects.create(email="user@example.com", username="user")
+        self.client = APIClient()
+
+    def test_deactivation_in_another_process(self):
+        token = tokens.AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get("/api/users/me").status_code, 200)
+
+        # Another process has its own instance of the cache.
+        other = caches.create_connection(settings.USERS_CACHE_ALIAS)
+        self.assertIsNot(other, user_cache.get_cache())
+        self.user.is_active = False
+        other.set(
+            user_cache.STATE_KEY.format(self.user.pk), user_cache.state(self.user)
+        )
+
+        self.assertEqual(self.client.get("/api/users/me").status_code, 401)
+
+    def test_check(self):
+        self.assertEqual(check_users_cache(None), [])
+        with self.settings(SERVER_PROCESSES=3):
+            self.assertEqual(check_users_cache(None), [])
+            with self.settings(
+                CACHES={
+                    "default": {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+                    }
+                }
+            ):
+                errors = check_users_cache(None)
+        self.assertEqual([error.id for error in errors], ["users.E001"])
+
+
+class RefreshTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local_users.clear()
+        self.user = User.objects.create_user(
+            email="user@example.com", username="user", password="password"
+        )
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post(
+            "/api/auth/login",
+            {"username": self.user.email, "password": "password"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refresh(self, refresh_token):
+        return self.client.post(
+            "/api/auth/refresh", {"refresh_token": refresh_token}, format="json"
+        )
+
+    def get_me(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client.get("/api/users/me")
+
+    def test_refresh(self):
+        tokens = self.login()
+
+        response = self.refresh(tokens["refresh_token"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["refresh_token"], tokens["refresh_token"])
+        self.assertEqual(self.get_me(response.json()["access_token"]).status_code, 200)
+
+    def test_refresh_token_is_single_use(self):
+        refresh_token = self.login()["refresh_token"]
+        rotated = self.refresh(refresh_token).json()["refresh_token"]
+
+        self.assertEqual(self.refresh(refresh_token).status_code, 401)
+        self.assertEqual(self.refresh(rotated).status_code, 200)
+
+    def test_refresh_signs_current_claims(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = Role.ORGANIZER
+            self.user.save()
+        self.assertEqual(self.get_me(tokens["access_token"]).status_code, 401)
+
+        access_token = self.refresh(tokens["refresh_token"]).json()["access_token"]
+
+        self.assertEqual(self.get_me(access_token).status_code, 200)
+        self.assertEqual(AccessToken(access_token)["role"], Role.ORGANIZER)
+
+    def test_deactivated_user_cannot_refresh(self):
+        refresh_token = self.login()["refresh_token"]
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.refresh(refresh_token).status_code, 401)
+
+    def test_invalid_token(self):
+        self.assertEqual(self.refresh("invalid").status_code, 401)
+        self.assertEqual(self.refresh(self.login()["access_token"]).status_code, 401)
+        self.assertEqual(
+            self.client.post("/api/auth/refresh", {}, format="json").status_code, 400
+        )
+
+
+class LogoutRevocationTest(TestCase):
+    def setUp(self):
+        revoked_tokens.clear()
+        self.user = User.objects.create(email="user@example.com", username="user")
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def test_logout_revokes_token(self):
+        client = self.client_for(tokens.AccessToken.for_user(self.user))
+        other = self.client_for(tokens.AccessToken.for_user(self.user))
+
+        self.assertEqual(client.get("/api/auth/logout").status_code, 200)
+
+        self.assertEqual(client.get("/api/users/me").status_code, 401)
+        self.assertEqual(other.get("/api/users/me").status_code, 200)
+
+    def test_logout_blacklists_refresh_token(self):
+        refresh = tokens.RefreshToken.for_user(self.user)
+        client = self.client_for(refresh.access_token)
+
+        response = client.post(
+            "/api/auth/logout", {"refresh_token": str(refresh)}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get("/api/users/me").status_code, 401)
+        response = APIClient().post(
+            "/api/auth/refresh", {"refresh_token": str(refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(TOKEN_REVOCATION_SYNC_SECONDS=0)
+    def test_revocation_by_another_process(self):
+        token = tokens.AccessToken.for_user(self.user)
+        client = self.client_for(token)
+        self.assertEqual(client.get("/api/users/me").status_code, 200)
+
+        RevokedToken.objects.create(
+            jti=token["jti"], expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertEqual(client.get("/api/users/me").status_code, 401)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [uuid.uuid4().hex for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(ROOT_URLCONF="config.asgi_urls")
+class AsyncMeViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="user@example.com", username="user")
+
+    async def test_me(self):
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get(
+            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["email"], self.user.email)
+
+    async def test_outdated_claims(self):
+        token = tokens.AccessToken.for_user(self.user)
+        token["role"] = Role.ORGANIZER
+        await user_cache.get_cache().aset(
+            user_cache.STATE_KEY.format(self.user.pk), user_cache.state(self.user)
+        )
+        response = await AsyncClient().get(
+            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_missing_state_is_loaded(self):
+        token = tokens.AccessToken.for_user(self.user)
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        await user_cache.get_cache().adelete(user_cache.STATE_KEY.format(self.user.pk))
+        response = await AsyncClient().get(
+            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_revoked_token(self):
+        token = tokens.AccessToken.for_user(self.user)
+        await sync_to_async(revoked_tokens.revoke)(token)
+        response = await AsyncClient().get(
+            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_requires_authentication(self):
+        response = await AsyncClient().get("/api/users/me")
+        self.assertEqual(response.status_code, 401)
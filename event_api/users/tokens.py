@@ -0,0 +1,69 @@
+from django.db import transaction
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .cache import claims, share
+from .models import User
+
+
+class UserClaimsMixin:
+    """
+    Sign the user's role and status into the token, so requests can be
+    authorized from the token alone (see ``ClaimsJWTAuthentication``).
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in claims(user).items():
+            token[claim] = value
+        # Share the state the claims are checked against now, rather than
+        # load it again on the token's first request.
+        share(user)
+        return token
+
+
+class RefreshToken(UserClaimsMixin, tokens.RefreshToken):
+    pass
+
+
+class AccessToken(UserClaimsMixin, tokens.AccessToken):
+    pass
+
+
+def rotate(raw_token):
+    """
+    Exchange a refresh token for a new one signed with the user's current
+    claims, without checking a password. The old token is blacklisted and
+    can only be exchanged once, even by concurrent requests.
+    """
+    refresh = RefreshToken(raw_token)
+    user = User.objects.filter(
+        **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]},
+        is_active=True,
+    ).first()
+    if user is None:
+        raise TokenError("No active account found for the given token.")
+
+    with transaction.atomic():
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=refresh[api_settings.JTI_CLAIM],
+            defaults={
+                "user": user,
+                "token": raw_token,
+                "created_at": refresh.current_time,
+                "expires_at": datetime_from_epoch(refresh["exp"]),
+            },
+        )
+        # The unique token column makes a concurrent exchange of the same
+        # token wait for this one and then find it blacklisted.
+        _, created = BlacklistedToken.objects.get_or_create(token=outstanding)
+        if not created:
+            raise TokenError("Token is blacklisted")
+        return RefreshToken.for_user(user)
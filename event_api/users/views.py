@@ -3,19 +3,24 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
+from . import cache as user_cache
 from .models import User
+from .revocation import revoked_tokens
 from .serializers import (
+    RefreshTokenSerializer,
     UserCreateSerializer,
     UserResponseSerializer,
     UserUpdateSerializer,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken, rotate
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiResponse,
     inline_serializer,
 )
+from config.async_views import AsyncAPIView
 
 
 class SignUpView(APIView):
@@ -54,20 +59,18 @@ class TokenResponseSerializer(serializers.Serializer):
     ),
     responses={
         200: OpenApiResponse(
-            response=inline_serializer(
-                name="LoginResponse",
-                fields={
-                    "access_token": serializers.CharField(),
-                },
-            ),
-            description="Returns JWT access token.",
+            response=TokenResponseSerializer,
+            description="Returns JWT access and refresh tokens.",
         ),
         401: OpenApiResponse(description="Invalid credentials."),
     },
     tags=["Users: Authentication"],
     operation_id="user_login",
     summary="User login to get JWT tokens",
-    description="Logs in a user using email and password. Returns a JWT access token.",
+    description=(
+        "Logs in a user using email and password. Returns a JWT access token "
+        "and a refresh token to get new access tokens without the password."
+    ),
 )
 class LoginView(APIView):
     authentication_classes = []
@@ -84,31 +87,98 @@ class LoginView(APIView):
             )
 
         refresh = RefreshToken.for_user(user)
-        return Response(
-            {"access_token": str(refresh.access_token)}, status=status.HTTP_200_OK
-        )
+        return Response(token_pair(refresh), status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    request=RefreshTokenSerializer,
+    responses={
+        200: OpenApiResponse(
+            response=TokenResponseSerializer,
+            description="Returns new JWT access and refresh tokens.",
+        ),
+        400: OpenApiResponse(description="Validation error."),
+        401: OpenApiResponse(description="Invalid, expired or used refresh token."),
+    },
+    tags=["Users: Authentication"],
+    operation_id="user_refresh",
+    summary="Refresh JWT tokens",
+    description=(
+        "Exchanges a refresh token for a new access and refresh token, "
+        "carrying the user's current role. Each refresh token can be used once."
+    ),
+)
+class RefreshView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            refresh = rotate(serializer.validated_data["refresh_token"])
+        except TokenError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(token_pair(refresh), status=status.HTTP_200_OK)
+
+
+def token_pair(refresh):
+    return {"access_token": str(refresh.access_token), "refresh_token": str(refresh)}
+
+
+LOGOUT_RESPONSES = {
+    200: OpenApiResponse(description="Successfully logged out."),
+    401: OpenApiResponse(description="Invalid or revoked token."),
+}
 
 
 class LogoutView(APIView):
     @extend_schema(
-        responses={
-            200: OpenApiResponse(description="Successfully logged out."),
-        },
+        responses=LOGOUT_RESPONSES,
         tags=["Users: Authentication"],
         operation_id="user_logout",
         summary="User logout",
-        description="Clears the JWT cookie (if any) and logs out the user.",
+        description=(
+            "Revokes the access token the request is authenticated with and "
+            "clears the JWT cookie (if any)."
+        ),
     )
     def get(self, request):
+        if request.auth is not None:
+            revoked_tokens.revoke(request.auth)
         response = Response(
             {"detail": "Successfully logged out"}, status=status.HTTP_200_OK
         )
         response.delete_cookie("access_token")
         return response
 
+    @extend_schema(
+        request=inline_serializer(
+            name="LogoutRequest",
+            fields={"refresh_token": serializers.CharField(required=False)},
+        ),
+        responses=LOGOUT_RESPONSES,
+        tags=["Users: Authentication"],
+        operation_id="user_logout_all_tokens",
+        summary="User logout, including the refresh token",
+        description=(
+            "Like GET, and also blacklists the given refresh token so it "
+            "cannot be exchanged for new tokens."
+        ),
+    )
+    def post(self, request):
+        raw_token = request.data.get("refresh_token")
+        if raw_token:
+            try:
+                RefreshToken(raw_token).blacklist()
+            except TokenError:
+                pass
+        return self.get(request)
+
 
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    read_replica = True
 
     @extend_schema(
         responses={
@@ -121,10 +191,21 @@ class MeView(APIView):
         description="Returns the profile information of the currently authenticated user.",
     )
     def get(self, request):
-        serializer = UserResponseSerializer(request.user)
+        serializer = UserResponseSerializer(user_cache.get_user(request.user))
         return Response(serializer.data)
 
 
+class AsyncMeView(AsyncAPIView):
+    """``MeView`` on the async ORM, routed under ASGI."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    read_replica = True
+
+    async def get(self, request):
+        user = await user_cache.aget_user(request.user)
+        return Response(UserResponseSerializer(user).data)
+
+
 class UpdateUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -146,7 +227,7 @@ class UpdateUserView(APIView):
     )
     def put(self, request, id):
         user = self.get_object(id)
-        if request.user != user:
+        if user.pk != request.user.pk:
             return Response(
                 {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
             )
@@ -169,7 +250,7 @@ class UpdateUserView(APIView):
     )
     def delete(self, request, id):
         user = self.get_object(id)
-        if request.user != user:
+        if user.pk != request.user.pk:
             return Response(
                 {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
             )